@@ -12,10 +12,56 @@ from utils import Status, RobotStatus
 # Bootstrap-Erweiterung für tkinter
 import ttkbootstrap as ttkb
 # Pillow
-from PIL import ImageTk, Image, ImageOps
+from PIL import ImageTk, Image
 # OpenCV
 import cv2 as cv
 
+############################################################
+# Konstanten                                               #
+############################################################
+
+# Größe (Breite, Höhe), in die die Bilder der Greifsteuerung bzw. der Parameter-Seite eingepasst werden
+CONTROLLER_IMAGE_SIZE = (1280, 960)
+PARAMETERS_IMAGE_SIZE = (605, 525)
+
+# Angezeigte Bearbeitungsschritte der Laufzeit-Messwerte (Reihenfolge wie im Ablauf, fehlende werden ausgelassen)
+METRIC_STAGES = {
+    'capture': "Aufnahme",
+    'wait_preprocess': "Warten Vorverarb.",
+    'undistort': "Entzerren",
+    'color': "Farbe",
+    'blur': "Weichzeichnen",
+    'threshold': "Schwellwert",
+    'mask': "Maske",
+    'tiles': "Streifen",
+    'wait_analysis': "Warten Analyse",
+    'find_contours': "Konturen",
+    'filter': "Filtern",
+    'tracking': "Verfolgung",
+    'wait_render': "Warten Overlay",
+    'overlay': "Overlay",
+    'hit_map': "Trefferkarte",
+    'wait_result': "Warten GUI",
+    'set_images': "Bilder anzeigen",
+    'tick': "Controller-Takt"
+}
+
+# Angezeigte Abschnitte des letzten Greifvorgangs (vom Aufnehmen des Bildes bis der Roboter wieder wartet)
+PICK_SEGMENTS = {
+    'detection': "Bilderkennung",
+    'delivery': "Übergabe",
+    'selection': "Auswahl",
+    'command': "Befehl",
+    'response': "Roboter-Antwort",
+    'grabbing': "Greifen",
+    'moving_place': "Zur Ablage",
+    'placing': "Ablegen",
+    'moving_camera': "Zur Kamerapos.",
+    'frame_age': "Bildalter (Klick)",
+    'total': "Gesamt"
+}
+
+
 ############################################################
 # Klassenübergreifende Funktionen                          #
 ############################################################
@@ -29,6 +75,21 @@ def status_to_bootstyle(status):
         case Status.ERROR:
             return 'danger'
 
+def fit_image(img, size):
+    # Seitenverhältnis beibehalten und in size (Breite, Höhe) einpassen (wie ImageOps.contain)
+    height, width = img.shape[:2]
+    scale = min(size[0] / width, size[1] / height)
+    fitted_size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    
+    # Verkleinern mit Flächen-Interpolation (mittelt über alle Pixel -> kein Flimmern), Vergrößern linear
+    if fitted_size != (width, height):
+        img = cv.resize(img, fitted_size, interpolation=cv.INTER_AREA if scale < 1 else cv.INTER_LINEAR)
+    
+    # Graustufenbilder direkt, Farbbilder von BGR nach RGB (erst nach dem Verkleinern -> weniger Pixel)
+    if img.ndim == 2:
+        return img
+    return cv.cvtColor(img, cv.COLOR_BGR2RGB)
+
 
 ############################################################
 # Kombinierte Widgets                                      #
@@ -118,22 +179,50 @@ class LabeledScale(ttkb.LabelFrame):
         # Diskretisierten und begrenzten Wert zurückgeben
         return value
 
+# ImagePanel:
+# Ein Bildpanel, das OpenCV-Bilder (BGR oder Graustufen) in eine feste Größe
+# eingepasst anzeigt und sein PhotoImage dabei wiederverwendet
+class ImagePanel(ttkb.Label):
+    
+    def __init__(self, parent, size):
+        # Label initialisieren
+        ttkb.Label.__init__(self, parent)
+        
+        # Variablen initialisieren
+        self._size = size
+        self._mode = None
+        self.image = None
+    
+    def show_image(self, img):
+        # Auf Panelgröße bringen und in ein PIL-Bild umwandeln (ohne Kopie)
+        img = Image.fromarray(fit_image(img, self._size))
+        
+        # Gleiche Größe und Farbtiefe -> Pixel nur in das angezeigte PhotoImage kopieren
+        if self.image is not None and img.mode == self._mode and img.size == (self.image.width(), self.image.height()):
+            self.image.paste(img)
+            return
+        
+        # Sonst (erstes Bild, andere Auflösung) neu anlegen
+        self.image = ImageTk.PhotoImage(img)
+        self._mode = img.mode
+        self.configure(image=self.image)
+
 # LabeledImagePanel:
 # Ein Bildpanel mit einer beschrifteten Umrandung
 class LabeledImagePanel(ttkb.LabelFrame):
     
-    def __init__(self, parent, title):
+    def __init__(self, parent, title, size):
         # LabelFrame initialisieren
         ttkb.LabelFrame.__init__(self, parent, text=title)
         
         # Bildpanel erstellen und plazieren
-        self._panel = ttkb.Label(self)
+        self._panel = ImagePanel(self, size)
         self._panel.pack(padx=5, pady=5)
     
-    def set_image(self, img):
-        # Bild auf panel anwenden
-        self._panel.configure(image=img)
-        self._panel.image = img
+    def show_image(self, img):
+        # Bild auf panel anwenden (nicht angeforderte Bilder sind None -> altes Bild bleibt stehen)
+        if img is not None:
+            self._panel.show_image(img)
 
 # LabeledEntry:
 # Ein Label mit Eingabefeld daneben
@@ -225,7 +314,7 @@ class ControllerPage(ttkb.Frame):
         self._status_label = ttkb.Label(self._status_wrapper, text="Status:", font=('Arial', 20))
         self._status_text_label = ttkb.Label(self._status_wrapper, text="Unbekannt", font=('Arial', 20), bootstyle='warning')
 
-        self._image_panel = ttkb.Label(self)
+        self._image_panel = ImagePanel(self, CONTROLLER_IMAGE_SIZE)
         
         self._object_info_frame = ttkb.LabelFrame(self, text="Objekt")
         self._object_info_section1 = ttkb.Label(self._object_info_frame, text="Bild-Koordinaten", bootstyle='inverse-dark', anchor='center')
@@ -328,15 +417,17 @@ class ControllerPage(ttkb.Frame):
     
     ##### Anzeige-Aktualisierungs-Funktionen #####
     
-    def update_images(self, img_raw, img_overlay):
+    def get_image_subscriptions(self):
+        # Es wird entweder das Overlay oder das Kamerabild angezeigt
         if self._enable_overlay:
-            img_overlay = ImageTk.PhotoImage(ImageOps.contain(img_overlay, (1280, 960)))
-            self._image_panel.configure(image=img_overlay)
-            self._image_panel.image = img_overlay
-        else:
-            img_raw = ImageTk.PhotoImage(ImageOps.contain(img_raw, (1280, 960)))
-            self._image_panel.configure(image=img_raw)
-            self._image_panel.image = img_raw
+            return {'overlay'}
+        return {'raw'}
+    
+    def update_images(self, img_raw, img_overlay):
+        # Nur das angezeigte Bild umwandeln (nicht angeforderte Bilder sind None -> altes Bild bleibt stehen)
+        img = img_overlay if self._enable_overlay else img_raw
+        if img is not None:
+            self._image_panel.show_image(img)
     
     def update_status(self, objectDetection_status, rob_status):
         # Zwischen Overlay und Kamerabild wechseln
@@ -392,6 +483,13 @@ class DetectionParametersPage(ttkb.Frame):
         # Callback-Funktionen als None initialisieren
         self._update_cv_parameters_func = None
         self._save_cv_parameters_func = None
+        self._freeze_frame_changed_func = None
+        
+        # Noch nicht gesendete Slider-Änderung (mehrere Bewegungen werden zur neuesten zusammengefasst)
+        self._pending_parameters_update = None
+        
+        # Parameter ohne Slider (z.B. Entzerrungs-Modus) merken, damit sie erhalten bleiben
+        self._parameters = {}
         
         # Frame (links) für das Bilder-Grid erstellen
         self._left_frame = ttkb.LabelFrame(self, bootstyle='dark',text="Vorschau")
@@ -403,10 +501,10 @@ class DetectionParametersPage(ttkb.Frame):
         self._left_frame.columnconfigure(1, weight=1)
         
         # Bildpanels erstellen
-        self._image_panel_raw = LabeledImagePanel(self._left_frame, title="(1) Kamerabild")
-        self._image_panel_blur = LabeledImagePanel(self._left_frame, title="(2) Entzerrung und Weichzeichnen")
-        self._image_panel_binary = LabeledImagePanel(self._left_frame, title="(3) Schwellwert")
-        self._image_panel_overlay = LabeledImagePanel(self._left_frame, title="(4) Umrisserkennung")
+        self._image_panel_raw = LabeledImagePanel(self._left_frame, title="(1) Kamerabild", size=PARAMETERS_IMAGE_SIZE)
+        self._image_panel_blur = LabeledImagePanel(self._left_frame, title="(2) Entzerrung und Weichzeichnen", size=PARAMETERS_IMAGE_SIZE)
+        self._image_panel_binary = LabeledImagePanel(self._left_frame, title="(3) Schwellwert", size=PARAMETERS_IMAGE_SIZE)
+        self._image_panel_overlay = LabeledImagePanel(self._left_frame, title="(4) Umrisserkennung", size=PARAMETERS_IMAGE_SIZE)
         
         # Process-Labels erstellen
         self._label_process_12 = ttkb.Label(self._right_frame, text="1 -> 2", bootstyle='inverse-dark', anchor='center')
@@ -434,6 +532,10 @@ class DetectionParametersPage(ttkb.Frame):
                                      from_=0, to=0.1, increment=0.005,
                                      on_value_change=self._on_parameters_change)
         
+        # Schalter für den Standbild-Modus (Parameter am eingefrorenen Bild einstellen)
+        self._freeze_frame = ttkb.BooleanVar(value=False)
+        self._freeze_frame_switch = ttkb.Checkbutton(self._right_frame, text="Standbild", bootstyle='round-toggle', variable=self._freeze_frame, command=self._on_freeze_frame_toggled)
+        
         # Knopf zum Speichern der Parameter
         self._save_parameters_button = ttkb.Button(self._right_frame, text="Parameter speichern", command=self._on_save_parameters_pressed)
         
@@ -453,6 +555,7 @@ class DetectionParametersPage(ttkb.Frame):
         self._slider_4.pack(padx=10, pady=5, side='top')
         self._slider_5.pack(padx=10, pady=5, side='top')
         self._save_parameters_button.pack(padx=5, pady=5, side='bottom', fill='x')
+        self._freeze_frame_switch.pack(padx=10, pady=5, side='bottom', anchor='w')
         
         # Frames (links & rechts) plazieren
         self._right_frame.pack(padx=20, pady=(10,20), side='right', fill='y')
@@ -468,9 +571,20 @@ class DetectionParametersPage(ttkb.Frame):
         # Callback-Funktion zuweisen
         self._save_cv_parameters_func = func
     
+    def bind_freeze_frame_changed_func(self, func):
+        # Callback-Funktion zuweisen
+        self._freeze_frame_changed_func = func
+    
     ##### Event-Funktionen #####
     
     def _on_parameters_change(self):
+        # Nur einmal pro Zeitfenster senden (die neueste Sliderstellung wird erst beim Senden ausgelesen)
+        if self._pending_parameters_update is None:
+            self._pending_parameters_update = self.after(30, self._send_parameters)
+    
+    def _send_parameters(self):
+        self._pending_parameters_update = None
+        
         # Slider auslesen und zu Parametern zusammenfassen
         parameters = self._compile_parameters()
         
@@ -478,6 +592,11 @@ class DetectionParametersPage(ttkb.Frame):
         if not self._update_cv_parameters_func == None:
             self._update_cv_parameters_func(parameters)
     
+    def _on_freeze_frame_toggled(self):
+        # Applikation entscheidet (abhängig von der sichtbaren Seite), ob eingefroren wird
+        if not self._freeze_frame_changed_func == None:
+            self._freeze_frame_changed_func()
+    
     def _on_save_parameters_pressed(self):
         # Slider auslesen und zu Parametern zusammenfassen
         parameters = self._compile_parameters()
@@ -488,14 +607,25 @@ class DetectionParametersPage(ttkb.Frame):
     
     ##### Anzeige-Aktualisierungs-Funktionen #####
     
+    def get_image_subscriptions(self):
+        # Alle Zwischenbilder werden angezeigt
+        return {'raw', 'blur', 'binary', 'overlay'}
+    
+    def get_freeze_frame(self):
+        # Ist der Standbild-Schalter an?
+        return self._freeze_frame.get()
+    
     def update_images(self, img_raw, img_blur, img_binary, img_overlay):
         # Bilder aktualisieren
-        self._image_panel_raw.set_image(ImageTk.PhotoImage(ImageOps.contain(img_raw, (605, 525))))
-        self._image_panel_blur.set_image(ImageTk.PhotoImage(ImageOps.contain(img_blur, (605, 525))))
-        self._image_panel_binary.set_image(ImageTk.PhotoImage(ImageOps.contain(img_binary, (605, 525))))
-        self._image_panel_overlay.set_image(ImageTk.PhotoImage(ImageOps.contain(img_overlay, (605, 525))))
+        self._image_panel_raw.show_image(img_raw)
+        self._image_panel_blur.show_image(img_blur)
+        self._image_panel_binary.show_image(img_binary)
+        self._image_panel_overlay.show_image(img_overlay)
     
     def overwrite_parameters(self, parameters):
+        # Parameter merken
+        self._parameters = dict(parameters)
+        
         # Slider auf die Werte der vorgegebenen Einstellung setzten
         self._slider_1.set_value(parameters['blur_kernel_size'])
         self._slider_2.set_value(parameters['threshold_brightness'])
@@ -507,7 +637,7 @@ class DetectionParametersPage(ttkb.Frame):
     
     def _compile_parameters(self):
         # Slider auslesen und zu Parameter zusammenfassen
-        parameters = {
+        parameters = self._parameters | {
             'blur_kernel_size': self._slider_1.get_value(),
             'threshold_brightness': self._slider_2.get_value(),
             'contour_min_area': self._slider_3.get_value(),
@@ -555,6 +685,8 @@ class SettingsPage(ttkb.Frame):
             'fy': LabeledEntry(self._camera_settings_frame, "Brennweite (Y)"),
             'cx': LabeledEntry(self._camera_settings_frame, "Kamerahauptpunkt (X)"),
             'cy': LabeledEntry(self._camera_settings_frame, "Kamerahauptpunkt (Y)"),
+            'calibration_width': LabeledEntry(self._camera_settings_frame, "Kalibrier-Breite", data_type='int'),
+            'calibration_height': LabeledEntry(self._camera_settings_frame, "Kalibrier-Höhe", data_type='int'),
             
             'k1': LabeledEntry(self._camera_settings_frame, "Radiale Verzerrung (k1)"),
             'k2': LabeledEntry(self._camera_settings_frame, "Radiale Verzerrung (k2)"),
@@ -590,6 +722,28 @@ class SettingsPage(ttkb.Frame):
         # Button zum Anwenden der angegebenen Einstellungen
         self._retry_robotController_button = ttkb.Button(self._robot_settings_frame, text="Roboterverbindung neu starten", command=self._on_retry_robotController_pressed)
         
+        ##### Laufzeit-Messwerte #####
+        
+        # Frame
+        self._metrics_frame = ttkb.LabelFrame(self, bootstyle='info', text="Laufzeit-Messwerte")
+        
+        # Unterüberschriften
+        self._metrics_section1 = ttkb.Label(self._metrics_frame, text="Bilder", bootstyle='inverse-dark', anchor='center')
+        self._metrics_section2 = ttkb.Label(self._metrics_frame, text="Schritte (Median / 99 %)", bootstyle='inverse-dark', anchor='center')
+        self._metrics_section3 = ttkb.Label(self._metrics_frame, text="Letzter Greifvorgang", bootstyle='inverse-dark', anchor='center')
+        
+        # Anzeigen
+        self._metrics_labels = {
+            'capture_fps': NamedLabelWithUnit(self._metrics_frame, "Aufnahme", "FPS", decimal_places=1),
+            'processing_fps': NamedLabelWithUnit(self._metrics_frame, "Bearbeitung", "FPS", decimal_places=1),
+            'dropped_frames': NamedLabelWithUnit(self._metrics_frame, "Verworfen", "", decimal_places=0),
+            'skipped_frames': NamedLabelWithUnit(self._metrics_frame, "Unverändert", "", decimal_places=0),
+            'frame_p50': NamedLabelWithUnit(self._metrics_frame, "Gesamt (Median)", "ms", decimal_places=1),
+            'frame_p99': NamedLabelWithUnit(self._metrics_frame, "Gesamt (99 %)", "ms", decimal_places=1)
+        }
+        self._metrics_stages_label = ttkb.Label(self._metrics_frame, text="", font=('Courier', 9), justify='left')
+        self._metrics_pick_label = ttkb.Label(self._metrics_frame, text="Noch kein Greifvorgang", font=('Courier', 9), justify='left')
+        
         ##### Widgets plazieren #####
         
         # Kamera-Bereich
@@ -606,6 +760,8 @@ class SettingsPage(ttkb.Frame):
         self._camera_intrinsics_entries['fy'].pack(padx=10, pady=5)
         self._camera_intrinsics_entries['cx'].pack(padx=10, pady=5)
         self._camera_intrinsics_entries['cy'].pack(padx=10, pady=5)
+        self._camera_intrinsics_entries['calibration_width'].pack(padx=10, pady=5)
+        self._camera_intrinsics_entries['calibration_height'].pack(padx=10, pady=5)
         
         self._camera_settings_section3.pack(padx=10, pady=(10, 5), side='top', fill='x')
         self._camera_intrinsics_entries['k1'].pack(padx=10, pady=5)
@@ -633,6 +789,20 @@ class SettingsPage(ttkb.Frame):
         self._cam_pos_entries['gamma'].pack(padx=10, pady=5)
         
         self._retry_robotController_button.pack(padx=10, pady=10, side='bottom', fill='x')
+        
+        # Messwert-Bereich
+        self._metrics_frame.grid(row=0, column=2, padx=20, pady=(10,20), sticky='nse')
+        
+        # Messwert-Bereich: Inhalte
+        self._metrics_section1.pack(padx=10, pady=(10, 5), side='top', fill='x')
+        for label in self._metrics_labels.values():
+            label.pack(padx=10, pady=2)
+        
+        self._metrics_section2.pack(padx=10, pady=(10, 5), side='top', fill='x')
+        self._metrics_stages_label.pack(padx=10, pady=5, side='top', fill='x')
+        
+        self._metrics_section3.pack(padx=10, pady=(10, 5), side='top', fill='x')
+        self._metrics_pick_label.pack(padx=10, pady=5, side='top', fill='x')
     
     ##### Callback-Zuweis-Funktionen #####
     
@@ -677,6 +847,10 @@ class SettingsPage(ttkb.Frame):
     
     ##### Anzeige-Aktualisierungs-Funktionen #####
     
+    def get_image_subscriptions(self):
+        # Auf dieser Seite werden keine Bilder angezeigt
+        return set()
+    
     def update_objectDetection_status(self, status):
         # Kamera-Einstellungsrahmen entsprechend färben
         self._camera_settings_frame.configure(bootstyle=status_to_bootstyle(status))
@@ -685,6 +859,28 @@ class SettingsPage(ttkb.Frame):
         # Kamera-Einstellungsrahmen entsprechend färben
         self._robot_settings_frame.configure(bootstyle=status_to_bootstyle(status))
     
+    def update_metrics(self, metrics):
+        # Bilder pro Sekunde und Zähler eintragen (verworfen: Summe über alle Übergaben)
+        stages = metrics['stages']
+        self._metrics_labels['capture_fps'].set_value(metrics['capture_fps'])
+        self._metrics_labels['processing_fps'].set_value(metrics['processing_fps'])
+        self._metrics_labels['dropped_frames'].set_value(sum(metrics['dropped_frames'].values()))
+        self._metrics_labels['skipped_frames'].set_value(metrics['skipped_frames'])
+        if 'frame' in stages:
+            self._metrics_labels['frame_p50'].set_value(stages['frame']['p50_ms'])
+            self._metrics_labels['frame_p99'].set_value(stages['frame']['p99_ms'])
+        
+        # Eine Zeile pro gemessenem Schritt
+        lines = [f"{name:<18}{stages[stage]['p50_ms']:6.1f} /{stages[stage]['p99_ms']:6.1f} ms" for stage, name in METRIC_STAGES.items() if stage in stages]
+        self._metrics_stages_label.configure(text="\n".join(lines))
+        
+        # Abschnitte des letzten Greifvorgangs (mit der Nummer des Bildes, auf dem er beruhte)
+        pick = metrics['last_pick']
+        if pick is not None:
+            lines = [f"{'Bild Nr.':<18}{pick['sequence'] if pick['sequence'] is not None else '-':>8}"]
+            lines += [f"{name:<18}{pick[segment] * 1000:8.0f} ms" for segment, name in PICK_SEGMENTS.items() if segment in pick]
+            self._metrics_pick_label.configure(text="\n".join(lines))
+    
     def overwrite_objectDetection_settings(self, settings):
         # Einstellungen in Entry-Felder eintragen
         for key, element in self._camera_settings_entries.items():
@@ -720,11 +916,19 @@ class Application(ttkb.Window):
         self.resizable(width=False, height=False)
         self.title("Teile Greifer")
         
-        # Bilder-Variablen mit einem Testbild initialisieren
-        self._img_raw = Image.open('Bilder/Testbild.png')
-        self._img_blur = Image.open('Bilder/Testbild.png')
-        self._img_binary = Image.open('Bilder/Testbild.png')
-        self._img_overlay = Image.open('Bilder/Testbild.png')
+        # Callback-Funktionen als None initialisieren
+        self._set_image_subscriptions_func = None
+        self._set_freeze_frame_func = None
+        
+        # Variablen initialisieren
+        self._image_subscriptions = None
+        self._freeze_frame = False
+        
+        # Bilder-Variablen mit einem Testbild initialisieren (OpenCV-Bilder, umgewandelt wird erst beim Anzeigen)
+        self._img_raw = cv.imread('Bilder/Testbild.png')
+        self._img_blur = self._img_raw
+        self._img_binary = self._img_raw
+        self._img_overlay = self._img_raw
         
         # Ein Notebook erstellen und im Fenster plazieren
         self._notebook = ttkb.Notebook(self, style='secondary')
@@ -745,28 +949,38 @@ class Application(ttkb.Window):
         self._notebook.add(self._detection_parameters_page, text="Bilderkennung: Parameter einstellen")
         self._notebook.add(self._settings_page, text="Einstellungen")
         
+        # Beim Seitenwechsel andere Bilder anfordern
+        self._notebook.bind('<<NotebookTabChanged>>', self._on_tab_changed)
+        
         # Testbilder einfügen
         self._update_images()
     
-    def bind_controller_functions(self, update_cv_parameters, save_cv_parameters, retry_objectDetection, retry_robotController, grab_object_at_uv, return_object_at_uv_info):
+    def bind_controller_functions(self, update_cv_parameters, save_cv_parameters, retry_objectDetection, retry_robotController, grab_object_at_uv, return_object_at_uv_info, set_image_subscriptions, set_freeze_frame):
         # Callback-Funktionen des Controllers an die benötigten Stellen weiterleiten
         self._detection_parameters_page.bind_update_cv_parameters_func(update_cv_parameters)
         self._detection_parameters_page.bind_save_cv_parameters_func(save_cv_parameters)
+        self._detection_parameters_page.bind_freeze_frame_changed_func(self._update_freeze_frame)
         self._settings_page.bind_retry_objectDetection_func(retry_objectDetection)
         self._settings_page.bind_retry_robotController_func(retry_robotController)
         self._controller_page.bind_grab_object_at_uv_func(grab_object_at_uv)
         self._controller_page.bind_return_object_at_uv_info_func(return_object_at_uv_info)
+        self._set_image_subscriptions_func = set_image_subscriptions
+        self._set_freeze_frame_func = set_freeze_frame
+        
+        # Bilder der aktuellen Seite anfordern
+        self._update_image_subscriptions()
     
     def overwrite_cv_parameters(self, parameters):
         # Slider der Einstellungs-Seite auf die Werte der vorgegebenen Einstellung setzten
         self._detection_parameters_page.overwrite_parameters(parameters)
     
     def set_images(self, img_raw, img_blur, img_binary, img_overlay):
-        # Bilder konvertieren
-        self._img_raw = self._convert_image(img_raw)
-        self._img_blur = self._convert_image(img_blur)
-        self._img_binary = self._convert_image(img_binary)
-        self._img_overlay = self._convert_image(img_overlay)
+        # Nur das neueste Ergebnis merken (ältere Bilder können im Prozess-Modus schon überschrieben sein),
+        # nicht angeforderte Bilder sind None und lassen das angezeigte Bild stehen
+        self._img_raw = img_raw
+        self._img_blur = img_blur
+        self._img_binary = img_binary
+        self._img_overlay = img_overlay
         
         # Bilder aktualisieren
         self._update_images()
@@ -775,6 +989,12 @@ class Application(ttkb.Window):
         self._settings_page.update_objectDetection_status(objectDetection_status)
         self._settings_page.update_robotController_status(robotController_status)
         self._controller_page.update_status(objectDetection_status, rob_status)
+        
+        # Auf der Greifsteuerung hängt das angezeigte Bild vom Roboter-Status ab
+        self._update_image_subscriptions()
+    
+    def update_metrics(self, metrics):
+        self._settings_page.update_metrics(metrics)
     
     def overwrite_objectDetection_settings(self, settings):
         self._settings_page.overwrite_objectDetection_settings(settings)
@@ -782,20 +1002,41 @@ class Application(ttkb.Window):
     def overwrite_robotController_settings(self, settings):
         self._settings_page.overwrite_robotController_settings(settings)
     
-    def _convert_image(self, img):
-        # Von BGR nach RGB ändern
-        img = cv.cvtColor(img, cv.COLOR_BGR2RGB)
+    def _on_tab_changed(self, event):
+        # Bilder der neuen Seite anfordern (Standbild nur auf der Parameter-Seite)
+        self._update_image_subscriptions()
+        self._update_freeze_frame()
         
-        # In ein Bild umwandeln
-        img = Image.fromarray(img)
-        
-        # Bild zurückgeben
-        return img
+        # Neueste Bilder sofort auf der neuen Seite anzeigen
+        self._update_images()
+    
+    def _update_freeze_frame(self):
+        # Eingefroren wird nur, solange die Parameter-Seite sichtbar und der Schalter an ist
+        page = self.nametowidget(self._notebook.select())
+        freeze_frame = page is self._detection_parameters_page and self._detection_parameters_page.get_freeze_frame()
+        
+        # Controller nur bei einer Änderung Bescheid geben
+        if freeze_frame != self._freeze_frame and not self._set_freeze_frame_func == None:
+            self._freeze_frame = freeze_frame
+            self._set_freeze_frame_func(freeze_frame)
+    
+    def _update_image_subscriptions(self):
+        # Angezeigte Bilder der aktuellen Seite bestimmen
+        page = self.nametowidget(self._notebook.select())
+        subscriptions = page.get_image_subscriptions()
+        
+        # Controller nur bei einer Änderung Bescheid geben
+        if subscriptions != self._image_subscriptions and not self._set_image_subscriptions_func == None:
+            self._image_subscriptions = subscriptions
+            self._set_image_subscriptions_func(subscriptions)
     
     def _update_images(self):
-        # Bilder auf den Seiten aktualisieren
-        self._controller_page.update_images(self._img_raw, self._img_overlay)
-        self._detection_parameters_page.update_images(self._img_raw, self._img_blur, self._img_binary, self._img_overlay)
+        # Nur die Bilder der sichtbaren Seite umwandeln (beim Seitenwechsel wird nachgezogen)
+        page = self.nametowidget(self._notebook.select())
+        if page is self._controller_page:
+            self._controller_page.update_images(self._img_raw, self._img_overlay)
+        elif page is self._detection_parameters_page:
+            self._detection_parameters_page.update_images(self._img_raw, self._img_blur, self._img_binary, self._img_overlay)
 
 ############################################################
 # Test                                                     #
@@ -0,0 +1,284 @@
+# Dieses Program sucht offline (ohne Kamera und GUI) passende
+# Bilderkennungs-Parameter für die automatische Greifsoftware.
+# Aufgenommene Bilder werden mit vielen Parametersätzen parallel
+# bearbeitet; für jeden Satz werden Erkennungsgenauigkeit und
+# Bearbeitungszeit pro Bild ausgegeben.
+#
+# Aufruf (im Ordner Bilderkennung): python autoTuner.py [Bildordner] [--pattern Muster] [--write]
+#
+# Autor: Maximilian Schnell
+
+############################################################
+# Bibliotheken                                             #
+############################################################
+
+# OpenCV
+import cv2 as cv
+# Numpy
+import numpy as np
+# Kommandozeilen-Argumente
+import argparse
+# Prozess-Pool
+import concurrent.futures
+# Dateien und Zeitmessung
+import os
+import fnmatch
+import time
+# Zufallssuche und Gittersuche
+import random
+import itertools
+# Einstellungsverwaltung im .yaml-Format
+import yaml
+# Bildbearbeitung
+from objectDetection import ImageCaptureAndProcessingThread
+
+
+############################################################
+# Konstanten                                               #
+############################################################
+
+# Suchbereiche für die Zufallssuche (wie die Slider der Parameter-Seite: von, bis, Schrittweite)
+PARAMETER_RANGES = {
+    'blur_kernel_size': (1, 13, 2),
+    'threshold_brightness': (0, 255, 1),
+    'contour_min_area': (500, 10000, 100),
+    'contour_max_area': (1000, 50000, 200),
+    'polygon_epsilon': (0.0, 0.1, 0.005)
+}
+
+# Werte für die Gittersuche
+PARAMETER_GRID = {
+    'blur_kernel_size': [3, 5, 7, 9, 11, 13],
+    'threshold_brightness': [120, 140, 160, 180, 200, 220, 240],
+    'contour_min_area': [1000, 2500, 5000],
+    'contour_max_area': [15000, 20000, 30000],
+    'polygon_epsilon': [0.02, 0.035, 0.05, 0.065]
+}
+
+# Dateiendungen der Bilder
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+# Aufnahmen der Szene ohne Labels (die Prozessbilder und die Maske sind keine Szenen)
+SCENE_PATTERN = 'Beispielbild*'
+
+
+############################################################
+# Parametersätze                                           #
+############################################################
+
+def create_grid_parameter_sets():
+    # Alle Kombinationen des Gitters (Mindestfläche muss kleiner als Höchstfläche sein)
+    keys = list(PARAMETER_GRID.keys())
+    parameter_sets = [dict(zip(keys, values)) for values in itertools.product(*PARAMETER_GRID.values())]
+    return [parameters for parameters in parameter_sets if parameters['contour_min_area'] < parameters['contour_max_area']]
+
+
+def create_random_parameter_sets(count, seed=None):
+    # Zufällige Werte auf dem Raster der Slider ziehen
+    rng = random.Random(seed)
+    parameter_sets = []
+    while len(parameter_sets) < count:
+        parameters = {}
+        for key, (from_, to, increment) in PARAMETER_RANGES.items():
+            steps = int(round((to - from_) / increment))
+            value = from_ + rng.randint(0, steps) * increment
+            parameters[key] = round(value, 6) if isinstance(increment, float) else int(value)
+        if parameters['contour_min_area'] < parameters['contour_max_area']:
+            parameter_sets.append(parameters)
+    return parameter_sets
+
+
+############################################################
+# Bilder und Labels                                        #
+############################################################
+
+def load_frames(directory, names=None, pattern=None, exclude=()):
+    # Bilder des Ordners laden (nur die genannten bzw. passenden, ohne die ausgeschlossenen)
+    frames = []
+    for name in sorted(os.listdir(directory)):
+        if not name.lower().endswith(IMAGE_EXTENSIONS) or name in exclude:
+            continue
+        if names is not None and name not in names:
+            continue
+        if pattern is not None and not fnmatch.fnmatch(name, pattern):
+            continue
+        img = cv.imread(os.path.join(directory, name))
+        if img is not None:
+            frames.append((name, img))
+    return frames
+
+
+def load_labels(path):
+    # Labels: Dateiname -> Liste der Objekt-Mittelpunkte [u, v] (im entzerrten Bild, in Pixeln)
+    if not os.path.isfile(path):
+        return None
+    with open(path, 'r') as labelsFile:
+        labels = yaml.safe_load(labelsFile) or {}
+    return {name: np.array(points, dtype=np.float64).reshape(-1, 2) for name, points in labels.items()}
+
+
+############################################################
+# Bewertung (läuft in den Prozessen des Pools)             #
+############################################################
+
+# Bildbearbeitung und Bilder des jeweiligen Prozesses
+_worker = {}
+
+
+def _init_worker(config, frames):
+    # Bildbearbeitung wie im sequentiellen Modus, aber ohne Kamera, Streifen und Verfolgung (jedes Bild ist unabhängig)
+    intrinsics = config['camera_intrinsics']
+    camera_matrix = np.array([[intrinsics['fx'], 0, intrinsics['cx']], [0, intrinsics['fy'], intrinsics['cy']], [0, 0, 1]])
+    distortion_matrix = np.array([intrinsics['k1'], intrinsics['k2'], intrinsics['p1'], intrinsics['p2']])
+    calibration_size = (intrinsics['calibration_width'], intrinsics['calibration_height'])
+    detection_settings = config['detection_settings'] | {'pipeline': 'sequential', 'tiles': 1, 'tracking': False}
+    image_thread = ImageCaptureAndProcessingThread(config['camera_settings'], camera_matrix, distortion_matrix, calibration_size,
+                                                   config['cv_parameters'], detection_settings)
+
+    _worker['image_thread'] = image_thread
+    _worker['cv_parameters'] = config['cv_parameters']
+    _worker['frames'] = frames
+
+    # Aufwärmen (Entzerrungs-Cache und Puffer anlegen), damit die Zeitmessung nur die Bearbeitung enthält
+    for name, img in frames:
+        detect_objects(img, config['cv_parameters'])
+
+
+def detect_objects(img, parameters):
+    # Alle Stufen ausführen (ohne Bilder), Mittelpunkte der gefundenen Objekte zurückgeben
+    images, found_objects = _worker['image_thread'].process_single_frame(img, parameters, subscriptions=())
+    records = found_objects.records
+    return np.column_stack((records['u'], records['v']))
+
+
+def evaluate_parameters(parameters, labels, tolerance):
+    # Parametersatz auf alle Bilder anwenden (übrige Parameter wie in config.yaml)
+    parameters = _worker['cv_parameters'] | parameters
+
+    true_positives = 0
+    false_positives = 0
+    false_negatives = 0
+    correct_frames = 0
+    durations = []
+    for name, img in _worker['frames']:
+        start = time.perf_counter()
+        points = detect_objects(img, parameters)
+        durations.append(time.perf_counter() - start)
+
+        # Gefundene Objekte den gelabelten Objekten zuordnen
+        matched = match_points(labels[name], points, tolerance)
+        true_positives += matched
+        false_positives += len(points) - matched
+        false_negatives += len(labels[name]) - matched
+        if matched == len(points) == len(labels[name]):
+            correct_frames += 1
+
+    return {
+        'recall': true_positives / max(true_positives + false_negatives, 1),
+        'precision': true_positives / max(true_positives + false_positives, 1),
+        'correct_frames': correct_frames,
+        'ms_per_frame': 1000 * float(np.mean(durations)) if durations else 0.0
+    }
+
+
+def match_points(label_points, points, tolerance):
+    # Kürzeste Abstände zuerst zuordnen (jeder Punkt höchstens einmal); Anzahl der Zuordnungen zurückgeben
+    if len(label_points) == 0 or len(points) == 0:
+        return 0
+    distances = np.linalg.norm(label_points[:, None, :] - points[None, :, :], axis=2)
+    matched = 0
+    used_labels = set()
+    used_points = set()
+    for flat_index in np.argsort(distances, axis=None):
+        label_index, point_index = np.unravel_index(flat_index, distances.shape)
+        if distances[label_index, point_index] > tolerance:
+            break
+        if label_index in used_labels or point_index in used_points:
+            continue
+        matched += 1
+        used_labels.add(label_index)
+        used_points.add(point_index)
+    return matched
+
+
+############################################################
+# Code                                                     #
+############################################################
+
+def main():
+    # Kommandozeilen-Argumente
+    parser = argparse.ArgumentParser(description="Bilderkennungs-Parameter offline an aufgenommenen Bildern einstellen")
+    parser.add_argument('directory', nargs='?', default='Bilder', help="Ordner mit den Bildern")
+    parser.add_argument('--labels', default=None, help="Labels (.yaml: Dateiname -> Liste von [u, v]); Standard: <Ordner>/labels.yaml")
+    parser.add_argument('--pattern', default=None, help=f"Dateimuster der Szenenbilder; Standard: die gelabelten Bilder bzw. ohne Labels '{SCENE_PATTERN}'")
+    parser.add_argument('--config', default='config.yaml', help="Config-Datei (übrige Einstellungen, Ziel für --write)")
+    parser.add_argument('--search', choices=('random', 'grid'), default='random', help="Zufalls- oder Gittersuche")
+    parser.add_argument('--samples', type=int, default=200, help="Anzahl der Parametersätze der Zufallssuche")
+    parser.add_argument('--seed', type=int, default=None, help="Startwert der Zufallssuche")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Anzahl der Prozesse")
+    parser.add_argument('--tolerance', type=float, default=15.0, help="Größter Abstand (Pixel) zwischen Label und gefundenem Mittelpunkt")
+    parser.add_argument('--top', type=int, default=20, help="Anzahl der ausgegebenen Parametersätze")
+    parser.add_argument('--write', action='store_true', help="Schnellsten fehlerfreien Parametersatz in die Config-Datei schreiben (nur mit Labels)")
+    parser.add_argument('--allow-pseudo-labels', action='store_true', help="--write auch ohne Labels erlauben (Referenz sind die aktuellen Parameter)")
+    args = parser.parse_args()
+
+    # Einstellungen laden
+    with open(args.config, 'r') as configFile:
+        config = yaml.safe_load(configFile)
+
+    # Bilder und Labels laden (die Maske ist kein Bild der Szene)
+    labels = load_labels(args.labels or os.path.join(args.directory, 'labels.yaml'))
+    exclude = {os.path.basename(config['detection_settings']['mask_path'])}
+    pattern = args.pattern or (SCENE_PATTERN if labels is None else None)
+    frames = load_frames(args.directory, names=None if labels is None else set(labels), pattern=pattern, exclude=exclude)
+    if len(frames) == 0:
+        print(f"[ERROR] Keine Bilder in {args.directory} gefunden.")
+        return
+
+    # Ohne Labels ist das Ergebnis nur mit den aktuellen Parametern stimmig, nicht unbedingt richtig
+    if args.write and labels is None and not args.allow_pseudo_labels:
+        print("[ERROR] --write braucht Labels (labels.yaml oder --labels); ohne Labels nur mit --allow-pseudo-labels.")
+        return
+
+    # Ohne Labels dienen die Ergebnisse der aktuellen Parameter als Referenz (gesucht: schnellere, gleichwertige Parameter)
+    if labels is None:
+        print("[INFO] Keine Labels gefunden, die Ergebnisse der aktuellen Parameter dienen als Referenz.")
+        _init_worker(config, frames)
+        labels = {name: detect_objects(img, config['cv_parameters']) for name, img in frames}
+
+    # Parametersätze erstellen
+    if args.search == 'grid':
+        parameter_sets = create_grid_parameter_sets()
+    else:
+        parameter_sets = create_random_parameter_sets(args.samples, args.seed)
+    print(f"{len(parameter_sets)} Parametersätze, {len(frames)} Bilder, {args.workers} Prozesse")
+
+    # Parametersätze auf dem Prozess-Pool bewerten
+    start = time.perf_counter()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=(config, frames)) as pool:
+        futures = [pool.submit(evaluate_parameters, parameters, labels, args.tolerance) for parameters in parameter_sets]
+        results = [parameters | future.result() for parameters, future in zip(parameter_sets, futures)]
+    print(f"Dauer: {time.perf_counter() - start:.1f} s")
+
+    # Fehlerfreie Sätze zuerst, darunter die schnellsten; sonst nach Genauigkeit
+    results.sort(key=lambda result: (-result['correct_frames'], -(result['recall'] + result['precision']), result['ms_per_frame']))
+    print(" Kernel | Schwelle | Fläche min | Fläche max | Epsilon | Recall | Precision | Bilder ok | ms/Bild")
+    for result in results[:args.top]:
+        print(f"{result['blur_kernel_size']:7d} | {result['threshold_brightness']:8d} | {result['contour_min_area']:10d} | {result['contour_max_area']:10d} | "
+              f"{result['polygon_epsilon']:7.3f} | {result['recall']:6.3f} | {result['precision']:9.3f} | {result['correct_frames']:4d}/{len(frames):<4d} | {result['ms_per_frame']:7.1f}")
+
+    # Schnellsten fehlerfreien Satz in die Config-Datei schreiben
+    if args.write:
+        perfect = [result for result in results if result['correct_frames'] == len(frames)]
+        if len(perfect) == 0:
+            print("[WARNING] Kein Parametersatz erkennt alle Bilder fehlerfrei, Config-Datei bleibt unverändert.")
+            return
+        best = min(perfect, key=lambda result: result['ms_per_frame'])
+        config['cv_parameters'] = config['cv_parameters'] | {key: best[key] for key in PARAMETER_RANGES}
+        with open(args.config, 'w') as configFile:
+            yaml.dump(config, configFile, sort_keys=False)
+        print(f"Parameter in {args.config} geschrieben: " + ", ".join(f"{key}={best[key]}" for key in PARAMETER_RANGES))
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
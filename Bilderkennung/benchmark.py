@@ -0,0 +1,337 @@
+# Dieses Program misst die Geschwindigkeit der Bilderkennung
+# der automatischen Greifsoftware ohne Kamera und GUI.
+# Künstliche oder aufgenommene Bilder werden in mehreren
+# Auflösungen (und bei künstlichen Bildern mit unterschiedlich
+# vielen Objekten) bearbeitet; für jeden Bearbeitungsschritt
+# werden Median und 99. Perzentil ausgegeben und auf Wunsch
+# als .json-Datei abgespeichert bzw. mit einer früheren
+# Messung verglichen.
+#
+# Mit --check wird stattdessen geprüft, ob der Pyramiden-Modus und
+# die Streifen-Bearbeitung dieselben Objekte wie das ganze Bild in
+# voller Auflösung finden (mit Speedup pro Streifenanzahl) und ob im
+# Dauerbetrieb keine großen Speicherbereiche mehr angelegt werden.
+#
+# Aufruf (im Ordner Bilderkennung): python benchmark.py [--json Ergebnis.json] [--compare Alt.json]
+#                                   python benchmark.py --check [--image Bild.png] [--scale 2]
+#
+# Autor: Maximilian Schnell
+
+############################################################
+# Bibliotheken                                             #
+############################################################
+
+# OpenCV
+import cv2 as cv
+# Numpy
+import numpy as np
+# Kommandozeilen-Argumente
+import argparse
+# Zeitmessung und Versionsangaben
+import time
+import datetime
+import platform
+import subprocess
+# Speichermessung und Anzahl der Prozessorkerne
+import tracemalloc
+import os
+# Rückgabewert des Programms
+import sys
+# Ergebnisse im .json-Format
+import json
+# Einstellungsverwaltung im .yaml-Format
+import yaml
+# Bildbearbeitung
+from objectDetection import ImageCaptureAndProcessingThread, IMAGE_PRODUCTS
+# Bildquellen
+from frameSources import SyntheticFrameSource, ImageFilesFrameSource, list_image_files
+
+
+############################################################
+# Konstanten                                               #
+############################################################
+
+# Bearbeitungsschritte in der Reihenfolge der Ausgabe
+STAGES = ('undistort', 'color', 'blur', 'threshold', 'mask', 'find_contours', 'filter', 'tracking', 'overlay')
+# Ab dieser Verlangsamung (Median) gilt ein Schritt beim Vergleich als langsamer
+REGRESSION_THRESHOLD = 1.1
+# Anzahl der Bilder pro Streifenanzahl bzw. im Speicher-Test (--check)
+CHECK_REPETITIONS = 20
+# Größte erlaubte Abweichung (Pixel bzw. Grad) der Objekte im Pyramiden-Modus
+PYRAMID_TOLERANCE = 0.5
+# Im Speicher-Test gleichzeitig gehaltene Bilder (wie die Stufen im Pipeline-Modus) und größter erlaubter neuer Speicher
+MEMORY_FRAMES_HELD = 4
+MEMORY_LIMIT = 2**20
+
+
+############################################################
+# Messung                                                  #
+############################################################
+
+def create_image_thread(config, width, height, detection_settings):
+    # Bildbearbeitung wie im sequentiellen Modus (ohne Überspringen unveränderter Bilder, sonst wird nichts gemessen)
+    intrinsics = config['camera_intrinsics']
+    camera_matrix = np.array([[intrinsics['fx'], 0, intrinsics['cx']], [0, intrinsics['fy'], intrinsics['cy']], [0, 0, 1]])
+    distortion_matrix = np.array([intrinsics['k1'], intrinsics['k2'], intrinsics['p1'], intrinsics['p2']])
+    calibration_size = (intrinsics['calibration_width'], intrinsics['calibration_height'])
+    camera_settings = config['camera_settings'] | {'width': width, 'height': height}
+    detection_settings = config['detection_settings'] | {'pipeline': 'sequential', 'skip_static_frames': False} | detection_settings
+    return ImageCaptureAndProcessingThread(camera_settings, camera_matrix, distortion_matrix, calibration_size,
+                                           config['cv_parameters'], detection_settings)
+
+
+def run_benchmark(config, source, width, height, frame_count, warmup_count, tiles):
+    image_thread = create_image_thread(config, width, height, {'tiles': tiles})
+    
+    # Aufwärmen (Entzerrungs-Cache und Puffer anlegen), dann nur die eigentlichen Bilder messen
+    for _ in range(warmup_count):
+        process_frame(image_thread, source, config['cv_parameters'])
+    image_thread.reset_stage_timings()
+    
+    durations = []
+    object_counts = []
+    start = time.perf_counter()
+    for _ in range(frame_count):
+        frame_start = time.perf_counter()
+        images, found_objects = process_frame(image_thread, source, config['cv_parameters'])
+        durations.append(time.perf_counter() - frame_start)
+        object_counts.append(len(found_objects))
+    duration = time.perf_counter() - start
+    
+    image_thread.shutdown()
+    
+    # Durchsatz, Gesamtdauer pro Bild und Dauer der einzelnen Schritte
+    p50, p99 = np.percentile(durations, (50, 99)) * 1000
+    return {
+        'width': width,
+        'height': height,
+        'found_objects': float(np.mean(object_counts)),
+        'fps': frame_count / duration,
+        'frame': {'mean_ms': float(np.mean(durations) * 1000), 'p50_ms': float(p50), 'p99_ms': float(p99)},
+        'stages': image_thread.get_stage_timings()
+    }
+
+
+def process_frame(image_thread, source, parameters):
+    # Bild der Quelle holen und alle Stufen nacheinander ausführen (alle Bilder angefordert)
+    ret, img_raw = source.read()
+    return image_thread.process_single_frame(img_raw, parameters, IMAGE_PRODUCTS)
+
+
+############################################################
+# Ausgabe                                                  #
+############################################################
+
+def print_results(results):
+    # Eine Zeile pro Messung: Durchsatz, Gesamtdauer und Median der Schritte
+    header = ['Auflösung', 'Objekte', 'FPS', 'p50 ms', 'p99 ms', *STAGES]
+    rows = []
+    for result in results:
+        stages = [f"{result['stages'][stage]['p50_ms']:.2f}" if stage in result['stages'] else '-' for stage in STAGES]
+        rows.append([f"{result['width']}x{result['height']}", f"{result['found_objects']:.1f}", f"{result['fps']:.1f}",
+                     f"{result['frame']['p50_ms']:.1f}", f"{result['frame']['p99_ms']:.1f}", *stages])
+    
+    # Kopfzeile und Zeilen mit denselben Spaltenbreiten ausgeben
+    widths = [max(len(row[column]) for row in [header, *rows]) for column in range(len(header))]
+    for row in [header, *rows]:
+        print(" | ".join(f"{cell:>{width}}" for cell, width in zip(row, widths)))
+
+
+def compare_results(results, previous_results):
+    # Messungen mit gleicher Auflösung und Objektanzahl vergleichen (Faktor > 1: langsamer als vorher)
+    previous = {(result['width'], result['height'], result.get('objects')): result for result in previous_results}
+    print("\nVergleich (Median neu / alt):")
+    for result in results:
+        old = previous.get((result['width'], result['height'], result.get('objects')))
+        if old is None:
+            continue
+        
+        ratios = {'frame': result['frame']['p50_ms'] / old['frame']['p50_ms']}
+        for stage in STAGES:
+            if stage in result['stages'] and stage in old['stages'] and old['stages'][stage]['p50_ms'] > 0:
+                ratios[stage] = result['stages'][stage]['p50_ms'] / old['stages'][stage]['p50_ms']
+        
+        slower = [stage for stage, ratio in ratios.items() if ratio > REGRESSION_THRESHOLD]
+        print(f"{result['width']:>4}x{result['height']:<4} ({result.get('objects', '-')} Objekte): " + ", ".join(f"{stage} {ratio:.2f}" for stage, ratio in ratios.items())
+              + (f"  -> langsamer: {', '.join(slower)}" if slower else ""))
+
+
+def get_version():
+    # Aktueller Git-Stand (falls verfügbar), damit Messungen verschiedener Versionen zuordenbar sind
+    try:
+        return subprocess.run(['git', 'describe', '--always', '--dirty'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+############################################################
+# Prüfungen                                                #
+############################################################
+
+def detect_objects(image_thread, img_raw, parameters):
+    # Vorverarbeitung und Analyse ausführen, gefundene Objekte vergleichbar machen (Reihenfolge ist egal)
+    images, found_objects = image_thread.process_single_frame(img_raw, parameters, subscriptions=())
+    return sorted((round(obj['u'], 3), round(obj['v'], 3), round(obj['alpha'], 3), round(obj['w'], 3), round(obj['h'], 3)) for obj in found_objects)
+
+
+def check_pyramid(config, img_raw):
+    # Pyramiden-Modus muss dieselben Objekte (bis auf Rundung) wie die volle Auflösung finden, in beiden Entzerrungs-Modi
+    height, width = img_raw.shape[:2]
+    image_thread = create_image_thread(config, width, height, {'tiles': 1, 'tracking': False})
+    passed = True
+    print("Entzerrung | Stufen | Objekte (voll) | Objekte (Pyramide) | gleiches Ergebnis")
+    for undistortion_mode in ('image', 'points'):
+        parameters = config['cv_parameters'] | {'undistortion_mode': undistortion_mode}
+        reference_objects = detect_objects(image_thread, img_raw, parameters | {'detection_mode': 'full'})
+        for levels in (1, 2):
+            objects = detect_objects(image_thread, img_raw, parameters | {'detection_mode': 'pyramid', 'pyramid_levels': levels})
+            same = len(objects) == len(reference_objects) and np.allclose(objects, reference_objects, atol=PYRAMID_TOLERANCE)
+            passed = passed and same
+            print(f"{undistortion_mode:>10} | {levels:6d} | {len(reference_objects):14d} | {len(objects):18d} | {same}")
+    return passed
+
+
+def check_tiles(config, img_raw, tile_counts):
+    # Jede Streifenanzahl muss dasselbe Ergebnis wie das ganze Bild liefern (ohne Verfolgung, die glättet über mehrere Bilder)
+    height, width = img_raw.shape[:2]
+    results = {}
+    for tiles in tile_counts:
+        image_thread = create_image_thread(config, width, height, {'tiles': tiles, 'tracking': False})
+        start = time.perf_counter()
+        for _ in range(CHECK_REPETITIONS):
+            objects = detect_objects(image_thread, img_raw, config['cv_parameters'])
+        results[tiles] = ((time.perf_counter() - start) / CHECK_REPETITIONS, objects)
+        image_thread.shutdown()
+    
+    reference_duration, reference_objects = results[1]
+    print(f"Streifen | ms/Bild | Speedup | gleiches Ergebnis ({len(reference_objects)} Objekte)")
+    for tiles, (duration, objects) in results.items():
+        print(f"{tiles:8d} | {duration * 1000:7.1f} | {reference_duration / duration:7.2f} | {objects == reference_objects}")
+    return all(objects == reference_objects for duration, objects in results.values())
+
+
+def check_memory(config, img_raw, tile_counts):
+    # Nach dem Aufwärmen dürfen keine Puffer und keine großen Speicherbereiche mehr angelegt werden (Ergebnisse werden gehalten wie von der GUI)
+    height, width = img_raw.shape[:2]
+    passed = True
+    print("Streifen | neue Puffer | Puffer im Pool MB | Spitze neuer Speicher MB | ok")
+    for tiles in tile_counts:
+        image_thread = create_image_thread(config, width, height, {'tiles': tiles, 'tracking': False})
+        
+        # Aufwärmen, bis so viele Bilder gehalten werden wie beim Messen (plus das gerade entstehende)
+        results = []
+        for _ in range(MEMORY_FRAMES_HELD + 1):
+            results = results[-(MEMORY_FRAMES_HELD - 1):] + [image_thread.process_single_frame(img_raw, config['cv_parameters'])]
+        stats_before = image_thread.get_buffer_stats()
+        
+        tracemalloc.start()
+        for _ in range(CHECK_REPETITIONS):
+            results = results[-(MEMORY_FRAMES_HELD - 1):] + [image_thread.process_single_frame(img_raw, config['cv_parameters'])]
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        
+        stats_after = image_thread.get_buffer_stats()
+        image_thread.shutdown()
+        
+        allocations = stats_after['allocations'] - stats_before['allocations']
+        ok = allocations == 0 and peak <= MEMORY_LIMIT
+        passed = passed and ok
+        print(f"{tiles:8d} | {allocations:11d} | {stats_after['pooled_bytes'] / 2**20:17.1f} | {peak / 2**20:24.2f} | {ok}")
+    return passed
+
+
+def run_checks(config, image_path, scale):
+    # Beispielbild laden (für die Streifen hochskaliert, z.B. auf 4K; Intrinsics und Flächen werden automatisch angepasst)
+    img_raw = cv.imread(image_path)
+    if img_raw is None:
+        print(f"[ERROR] {image_path} konnte nicht geöffnet werden.")
+        return False
+    
+    # Pyramiden-Modus in der Originalauflösung (dort ist das Beispielbild beschriftet)
+    passed = check_pyramid(config, img_raw)
+    print()
+    
+    img_raw = cv.resize(img_raw, None, fx=scale, fy=scale, interpolation=cv.INTER_LINEAR)
+    tile_counts = sorted({1, 2, 4, 8, os.cpu_count() or 1})
+    passed = check_tiles(config, img_raw, tile_counts) and passed
+    print()
+    passed = check_memory(config, img_raw, (1, 4)) and passed
+    return passed
+
+
+############################################################
+# Code                                                     #
+############################################################
+
+def main():
+    # Kommandozeilen-Argumente
+    parser = argparse.ArgumentParser(description="Geschwindigkeit der Bilderkennung ohne Kamera und GUI messen")
+    parser.add_argument('--source', choices=('synthetic', 'directory'), default='synthetic', help="Künstliche Bilder oder Bilder eines Ordners")
+    parser.add_argument('--path', default='Bilder', help="Bildordner für --source directory")
+    parser.add_argument('--resolutions', nargs='+', default=['960x540', '1920x1080', '3840x2160'], help="Auflösungen (BreitexHöhe)")
+    parser.add_argument('--objects', nargs='+', type=int, default=[2, 6, 12], help="Objektanzahlen der künstlichen Bilder")
+    parser.add_argument('--frames', type=int, default=100, help="Anzahl der gemessenen Bilder pro Messung")
+    parser.add_argument('--warmup', type=int, default=10, help="Anzahl der Bilder zum Aufwärmen")
+    parser.add_argument('--tiles', type=int, default=1, help="Anzahl der Bildstreifen")
+    parser.add_argument('--config', default='config.yaml', help="Config-Datei (Intrinsics, Parameter, Einstellungen)")
+    parser.add_argument('--json', default=None, help="Ergebnisse in diese .json-Datei schreiben")
+    parser.add_argument('--compare', default=None, help="Mit den Ergebnissen einer früheren .json-Datei vergleichen")
+    parser.add_argument('--check', action='store_true', help="Statt zu messen: Ergebnisse von Pyramiden-Modus und Streifen sowie Speicherbedarf prüfen")
+    parser.add_argument('--image', default='Bilder/Beispielbild.png', help="Bild für --check")
+    parser.add_argument('--scale', type=float, default=2, help="Vergrößerung des Bildes für --check (2: 4K aus 1080p)")
+    args = parser.parse_args()
+    
+    # Einstellungen laden
+    with open(args.config, 'r') as configFile:
+        config = yaml.safe_load(configFile)
+    
+    # Nur prüfen (Rückgabewert 1, falls ein Ergebnis abweicht)
+    if args.check:
+        return 0 if run_checks(config, args.image, args.scale) else 1
+    
+    # Alle Kombinationen aus Auflösung und Objektanzahl messen (aufgenommene Bilder haben eine feste Objektanzahl)
+    results = []
+    for resolution in args.resolutions:
+        width, height = (int(value) for value in resolution.lower().split('x'))
+        for objects in (args.objects if args.source == 'synthetic' else [None]):
+            if args.source == 'synthetic':
+                source = SyntheticFrameSource(width, height, objects, args.frames + args.warmup)
+            else:
+                source = ImageFilesFrameSource(list_image_files(args.path))
+                source.set_resolution(width, height)
+            if not source.open():
+                print(f"[ERROR] {source.get_description()} konnte nicht geöffnet werden.")
+                return 1
+            
+            result = run_benchmark(config, source, width, height, args.frames, args.warmup, args.tiles)
+            result['objects'] = objects
+            results.append(result)
+            source.release()
+    
+    print_results(results)
+    
+    # Mit einer früheren Messung vergleichen
+    if args.compare is not None:
+        with open(args.compare, 'r') as resultsFile:
+            compare_results(results, json.load(resultsFile)['results'])
+    
+    # Maschinenlesbar abspeichern (mit Version und Umgebung)
+    if args.json is not None:
+        report = {
+            'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+            'version': get_version(),
+            'python': platform.python_version(),
+            'opencv': cv.__version__,
+            'numpy': np.__version__,
+            'machine': platform.platform(),
+            'settings': {'source': args.source, 'path': args.path, 'frames': args.frames, 'warmup': args.warmup, 'tiles': args.tiles,
+                         'cv_parameters': config['cv_parameters']},
+            'results': results
+        }
+        with open(args.json, 'w') as resultsFile:
+            json.dump(report, resultsFile, indent=2)
+        print(f"Ergebnisse in {args.json} geschrieben.")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -10,12 +10,20 @@
 
 # Einstellungsverwaltung im .yaml-Format
 import yaml
+# Zeitmessung (Laufzeit-Messwerte)
+import time
+# Benachrichtigungs-Thread für den Event-Modus
+import threading
+# Fehler beim Erzeugen von Tk-Events (z.B. Fenster bereits geschlossen)
+from tkinter import TclError
 # Applikation (View)
 from application import Application
 # Bilderkennung (Model)
 from objectDetection import ObjectDetection
 # Roboterkommunikation (Model)
 from robotController import RobotController
+# Status-Enums und Stufen-Zeitmesser
+from utils import Status, RobotStatus, StageTimer
 
 ############################################################
 # Konstanten                                               #
@@ -35,14 +43,25 @@ DEFAULT_CONFIG = {
         'k1': 0.030879754719235,
         'k2': -0.091482467868427,
         'p1': -0.002232927599662,
-        'p2': 0.000545642267413
+        'p2': 0.000545642267413,
+        # Auflösung, in der kalibriert wurde (bei anderen Auflösungen wird die Kameramatrix skaliert)
+        'calibration_width': 1920,
+        'calibration_height': 1080
     },
     'cv_parameters': {
         'blur_kernel_size': 13,
         'threshold_brightness': 180,
         'contour_min_area': 5000,
         'contour_max_area': 20000,
-        'polygon_epsilon': 0.05
+        'polygon_epsilon': 0.05,
+        # 'image': ganzes Bild entzerren, 'points': nur Konturpunkte entzerren
+        'undistortion_mode': 'image',
+        # 'full': in voller Auflösung suchen, 'pyramid': im verkleinerten Bild suchen und nur die Kandidaten verfeinern
+        'detection_mode': 'full',
+        # Anzahl der Halbierungen für den Pyramiden-Modus (1: halbe, 2: viertel Auflösung)
+        'pyramid_levels': 1,
+        # 'contours': Konturen aller Flecken suchen, 'components': erst Flächen aller Flecken bestimmen, nur passende nachzeichnen
+        'detection_engine': 'contours'
     },
     'server': {
         'ip': '192.168.133.1',
@@ -56,9 +75,58 @@ DEFAULT_CONFIG = {
     },
     'objects_parameters': {
         'min_depth': 5.0
+    },
+    'detection_settings': {
+        # 'sequential': alle Schritte in einem Thread, 'pipelined': ein Thread pro Stufe
+        'pipeline': 'sequential',
+        # 'thread': Bilderkennung im GUI-Prozess, 'process': in einem eigenen Prozess
+        'backend': 'thread',
+        # Anzahl der parallel bearbeiteten Bildstreifen (1: ganzes Bild auf einmal)
+        'tiles': 1,
+        # Maske, die den Greifer verdeckt (nur der Bereich der Maske wird überhaupt bearbeitet)
+        'mask_path': 'Bilder/Maske.png',
+        # Alternativ: Liste von Rechtecken [x, y, Breite, Höhe] relativ zur Bildgröße (0 bis 1), ersetzt die Masken-Datei
+        'mask_rois': [],
+        # 'fixed': immer in der eingestellten Auflösung, 'adaptive': niedrige Auflösung, solange der Roboter nicht wartet
+        'resolution_mode': 'fixed',
+        # Auflösung [Breite, Höhe] für den adaptiven Modus
+        'low_resolution': [960, 540],
+        # Objekte über mehrere Bilder verfolgen (stabile IDs, geglättete Werte; ändert die Greifdaten -> nur bei Bedarf einschalten)
+        'tracking': False,
+        # Gewicht des bisherigen Werts beim Glätten (0: keine Glättung)
+        'tracker_smoothing': 0.5,
+        # Größter Abstand in Pixeln, über den ein Objekt von Bild zu Bild zugeordnet wird
+        'tracker_max_distance': 40,
+        # Anzahl der Bilder, die ein Objekt fehlen darf, bevor es vergessen wird
+        'tracker_max_missed': 3,
+        # Nur jedes N-te Bild vollständig erkennen, dazwischen die Objekte lokal nachführen (1: jedes Bild vollständig)
+        'redetection_interval': 1,
+        # Unveränderte Bilder weder bearbeiten noch übergeben (Anzeige und Objekte behalten das vorherige Ergebnis)
+        'skip_static_frames': True,
+        # Größte Helligkeitsabweichung (0 bis 255) eines Blocks im verkleinerten Graubild, die noch als unverändert gilt
+        'change_tolerance': 12,
+        # Bildquelle: 'camera', 'image' (eine Bilddatei), 'directory' (alle Bilder eines Ordners), 'video' oder 'synthetic' (künstliche Szene)
+        'frame_source': 'camera',
+        # Datei bzw. Ordner für 'image', 'directory' und 'video'
+        'source_path': 'Bilder/Beispielbild.png',
+        # Kamera-Backend: 'auto' (passend zum Betriebssystem), 'any', 'dshow', 'msmf', 'v4l2', 'avfoundation' oder 'gstreamer'
+        'camera_backend': 'auto',
+        # Höchstens so viele Bilder pro Sekunde liefern (0: so schnell wie möglich)
+        'playback_fps': 0,
+        # Am Ende der Bildfolge: 'loop' (von vorne), 'bounce' (rückwärts zurück) oder 'once' (anhalten)
+        'loop_mode': 'loop',
+        # Anzahl der Objekte und Länge der künstlichen Szene
+        'synthetic_objects': 6,
+        'synthetic_frames': 300,
+        # 'event': Bilderkennung und Robotersteuerung melden neue Ergebnisse bzw. Statuswechsel, 'polling': alle 50 ms abfragen
+        'result_delivery': 'event'
     }
 }
 
+# Abstand der Controller-Takte in ms (im Event-Modus nur für Status und Messwerte)
+POLLING_INTERVAL = 50
+FALLBACK_INTERVAL = 500
+
 
 ############################################################
 # Code                                                     #
@@ -67,6 +135,24 @@ DEFAULT_CONFIG = {
 class Controller:
     
     def __init__(self):
+        # Variablen initialisieren
+        self._objectDetection = None
+        self._image_subscriptions = None
+        self._freeze_frame = False
+        self._low_resolution = False
+        
+        # Dauer eines Controller-Takts und der Bildanzeige, Zeitpunkt der letzten Messwert-Anzeige
+        self._stage_timer = StageTimer()
+        self._metrics_time = 0
+        
+        # Zuletzt angezeigter Modul-Status, noch nicht abgearbeitete Meldungen der Hintergrund-Threads
+        self._systems_status = None
+        self._result_pending = False
+        self._status_pending = False
+        
+        # Weckt den Benachrichtigungs-Thread (der allein darf auf den Tk-Loop warten)
+        self._notify_event = threading.Event()
+        
         # Einstellungen laden
         self._init_settings()
         
@@ -75,34 +161,148 @@ class Controller:
         self._init_objectDetection()
         self._init_robotController()
         
-        # Den Loop starten
+        # Den Loop starten (im Event-Modus den Benachrichtigungs-Thread erst, wenn der Tk-Loop läuft)
         self._app.after(10, self.update)
+        if self._config['detection_settings']['result_delivery'] == 'event':
+            self._app.after_idle(self._start_notify_thread)
         self._app.mainloop()
     
     def update(self):
-        # Modul-Status in App aktualisieren
-        self._app.update_systems_status(self._objectDetection.get_status(), self._robotController.get_status(), self._robotController.get_robot_status())
+        start = time.perf_counter()
+        
+        # Modul-Status aktualisieren und neue Bilder holen (im Event-Modus nur zur Sicherheit, normalerweise kommt vorher eine Meldung)
+        self._update_status()
+        self._update_detection_result()
+        
+        # Laufzeit-Messwerte anzeigen
+        self._update_metrics()
+        self._stage_timer.add('tick', time.perf_counter() - start)
         
+        # Nächstes Update in Warteschlange packen
+        if self._config['detection_settings']['result_delivery'] == 'event':
+            self._app.after(FALLBACK_INTERVAL, self.update)
+        else:
+            self._app.after(POLLING_INTERVAL, self.update)
+    
+    def _update_status(self):
+        # Modul-Status nur bei einer Änderung an die App weitergeben
+        robot_status = self._robotController.get_robot_status()
+        systems_status = (self._objectDetection.get_status(), self._robotController.get_status(), robot_status)
+        if systems_status != self._systems_status:
+            self._systems_status = systems_status
+            self._app.update_systems_status(*systems_status)
+        
+        # Auflösung an den Roboterzustand anpassen (nur im adaptiven Modus)
+        self._update_capture_resolution(robot_status)
+    
+    def _update_detection_result(self):
         # Falls neue Bilder vorhanden sind, diese holen und an App weitergeben
         available = self._objectDetection.update()
         
         if available:
             img_raw, img_blur, img_binary, img_overlay = self._objectDetection.get_images()
-            # TODO: Braucht zu lange
-            self._app.set_images(img_raw, img_blur, img_binary, img_overlay)
-        
-        # Nächstes Update in Warteschlange packen
-        self._app.after(50, self.update)
+            with self._stage_timer.measure('set_images'):
+                self._app.set_images(img_raw, img_blur, img_binary, img_overlay)
+    
+    ##### Benachrichtigungs-Funktionen #####
+    
+    def _notify_detection_result(self):
+        # Aus dem Bildbearbeitungs-Thread: nur vormerken und den Benachrichtigungs-Thread wecken (kein Tk-Aufruf, der würde warten)
+        self._result_pending = True
+        self._notify_event.set()
+    
+    def _notify_robot_status(self):
+        # Aus dem Roboter-Thread: ebenso
+        self._status_pending = True
+        self._notify_event.set()
+    
+    def _start_notify_thread(self):
+        # Im Tk-Loop aufgerufen -> event_generate wird ab jetzt abgearbeitet
+        threading.Thread(target=self._run_notify_thread, daemon=True, name="ControllerNotify").start()
+    
+    def _run_notify_thread(self):
+        # Pro Wecken ein Event je vorgemerkter Meldung in den Tk-Loop (event_generate wartet, bis der Tk-Loop es abarbeitet;
+        # währenddessen eintreffende Meldungen wecken den Thread erneut)
+        while True:
+            self._notify_event.wait()
+            self._notify_event.clear()
+            try:
+                if self._status_pending:
+                    self._app.event_generate('<<RobotStatusChanged>>', when='tail')
+                if self._result_pending:
+                    self._app.event_generate('<<NewDetectionResult>>', when='tail')
+            except (RuntimeError, TclError):
+                # Fenster geschlossen -> der Controller-Takt läuft ohnehin nicht mehr
+                return
+    
+    def _on_detection_result(self, event):
+        # Vormerkung vor dem Abholen zurücksetzen (ein währenddessen fertiges Ergebnis wird erneut gemeldet)
+        if not self._result_pending:
+            return
+        self._result_pending = False
+        self._update_detection_result()
+    
+    def _on_robot_status(self, event):
+        if not self._status_pending:
+            return
+        self._status_pending = False
+        self._update_status()
     
     ##### Event-Funktionen #####
     
     def grab_object_at_uv(self, u_rel, v_rel):
+        # Zeitpunkt des Klicks (Beginn der Latenz-Messung des Greifvorgangs)
+        click_time = time.perf_counter()
+        
         # Greifdaten berechnen
         hit, info = self.get_object_at_uv_info(u_rel, v_rel)
         
-        # Greifen
+        # Greifen (mit dem Bild, aus dem die Greifdaten stammen)
         if hit:
-            self._robotController.grab_object(info['grab_data'])
+            self._robotController.grab_object(info['grab_data'], info['frame_timing'], click_time)
+    
+    def _update_metrics(self):
+        # Höchstens einmal pro Sekunde (Perzentile zu berechnen und die Anzeige zu ändern kostet etwas Zeit)
+        now = time.perf_counter()
+        if now - self._metrics_time < 1.0:
+            return
+        self._metrics_time = now
+        
+        # Messwerte der Bilderkennung um die des Controllers und den letzten Greifvorgang ergänzen
+        metrics = self._objectDetection.get_metrics()
+        metrics['stages'] = metrics['stages'] | self._stage_timer.get_stats()
+        metrics['last_pick'] = self._robotController.get_last_pick()
+        self._app.update_metrics(metrics)
+    
+    def _update_capture_resolution(self, robot_status):
+        # Nur im adaptiven Modus
+        if self._config['detection_settings']['resolution_mode'] != 'adaptive':
+            return
+        
+        # Volle Auflösung nur, wenn der Roboter auf einen Greifbefehl wartet
+        low_resolution = robot_status != RobotStatus.WAITING
+        if low_resolution == self._low_resolution:
+            return
+        self._low_resolution = low_resolution
+        
+        # Bilderkennung umstellen
+        if low_resolution:
+            width, height = self._config['detection_settings']['low_resolution']
+        else:
+            width, height = self._config['camera_settings']['width'], self._config['camera_settings']['height']
+        self._objectDetection.set_capture_resolution(width, height)
+    
+    def set_image_subscriptions(self, products):
+        # Merken (für einen Neustart der Bilderkennung) und weitergeben
+        self._image_subscriptions = products
+        if self._objectDetection is not None:
+            self._objectDetection.set_image_subscriptions(products)
+    
+    def set_freeze_frame(self, enabled):
+        # Merken (für einen Neustart der Bilderkennung) und weitergeben
+        self._freeze_frame = enabled
+        if self._objectDetection is not None:
+            self._objectDetection.set_freeze_frame(enabled)
     
     def get_object_at_uv_info(self, u_rel, v_rel):
         # Position abfragen
@@ -115,7 +315,7 @@ class Controller:
             
             if hit:
                 grab_data = self._objectDetection.get_grab_data(obj, extrinsics)
-                return True, {'picture_info': obj, 'grab_data': grab_data}
+                return True, {'picture_info': obj, 'grab_data': grab_data, 'frame_timing': self._objectDetection.get_frame_timing()}
         
         return False, None
     
@@ -129,16 +329,29 @@ class Controller:
                                             retry_objectDetection=self.retry_objectDetection,
                                             retry_robotController=self.retry_robotController,
                                             grab_object_at_uv=self.grab_object_at_uv,
-                                            return_object_at_uv_info=self.get_object_at_uv_info)
+                                            return_object_at_uv_info=self.get_object_at_uv_info,
+                                            set_image_subscriptions=self.set_image_subscriptions,
+                                            set_freeze_frame=self.set_freeze_frame)
         self._app.overwrite_cv_parameters(self._config['cv_parameters'])
         self._app.overwrite_objectDetection_settings({'camera_settings': self._config['camera_settings']} | {'camera_intrinsics': self._config['camera_intrinsics']} | {'objects_parameters': self._config['objects_parameters']})
         self._app.overwrite_robotController_settings({'server': self._config['server']} | {'initial_camera_pose': self._config['initial_camera_pose']})
+        
+        # Meldungen der Bilderkennung und der Robotersteuerung (aus deren Threads) im Tk-Loop abarbeiten
+        self._app.bind('<<NewDetectionResult>>', self._on_detection_result)
+        self._app.bind('<<RobotStatusChanged>>', self._on_robot_status)
     
     def retry_objectDetection(self, settings):
         # Settings in config eintragen und speichern
         self._config = self._config | settings
         self._save_settings()
-        
+
+        # Wenn die Kamera läuft und sich die Kamera-Einstellungen nicht geändert haben,
+        # reicht es, die Intrinsics zu tauschen (Entzerrungs-Cache baut sich selbst neu auf)
+        if self._objectDetection.get_status() == Status.WORKING and self._objectDetection.get_camera_settings() == self._config['camera_settings']:
+            self._objectDetection.set_camera_intrinsics(self._config['camera_intrinsics'])
+            self._objectDetection.set_object_parameters(self._config['objects_parameters'])
+            return
+
         # Bilderkennung neu starten
         del self._objectDetection
         self._init_objectDetection()
@@ -149,7 +362,23 @@ class Controller:
             self._config['camera_settings'],
             self._config['camera_intrinsics'],
             self._config['cv_parameters'],
-            self._config['objects_parameters'])
+            self._config['objects_parameters'],
+            self._config['detection_settings'])
+        
+        # Kamera startet in der eingestellten Auflösung
+        self._low_resolution = False
+        
+        # Nur die Bilder anfordern, die die App gerade anzeigt
+        if self._image_subscriptions is not None:
+            self._objectDetection.set_image_subscriptions(self._image_subscriptions)
+        
+        # Standbild-Modus beibehalten
+        if self._freeze_frame:
+            self._objectDetection.set_freeze_frame(True)
+        
+        # Neue Ergebnisse melden lassen (sonst holt der Controller-Takt sie ab)
+        if self._config['detection_settings']['result_delivery'] == 'event':
+            self._objectDetection.set_result_callback(self._notify_detection_result)
     
     def retry_robotController(self, settings):
         # Settings in config eintragen und speichern
@@ -166,6 +395,10 @@ class Controller:
             self._config['server']['ip'],
             self._config['server']['port'],
             self._config['initial_camera_pose'])
+        
+        # Statuswechsel melden lassen (sonst holt der Controller-Takt sie ab)
+        if self._config['detection_settings']['result_delivery'] == 'event':
+            self._robotController.set_status_callback(self._notify_robot_status)
         self._robotController.start()
     
     ##### Einstellungsverwaltungs-Funktionen #####
@@ -180,8 +413,8 @@ class Controller:
         self._save_settings()
     
     def _init_settings(self):
-        # Standard-Einstellungen laden
-        self._config = DEFAULT_CONFIG
+        # Standard-Einstellungen laden (Kopie, damit DEFAULT_CONFIG unverändert bleibt)
+        self._config = {section: (values.copy() if isinstance(values, dict) else values) for section, values in DEFAULT_CONFIG.items()}
         
         # Config-Datei einlesen, falls vorhanden
         self._load_settings()
@@ -195,8 +428,14 @@ class Controller:
         # Einstellungen aus Config-Datei laden
         try:
             with open(path, 'r') as configFile:
-                # Die neuen Einstellungen mit den alten zusammenführen
-                self._config = self._config | yaml.safe_load(configFile)
+                loaded_config = yaml.safe_load(configFile)
+                
+                # Die neuen Einstellungen mit den alten zusammenführen (pro Abschnitt, damit neue Standardwerte erhalten bleiben)
+                for section, values in loaded_config.items():
+                    if isinstance(values, dict) and isinstance(self._config.get(section), dict):
+                        self._config[section] = self._config[section] | values
+                    else:
+                        self._config[section] = values
         except:
             pass
         
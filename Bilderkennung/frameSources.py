@@ -0,0 +1,388 @@
+# Dieses Program enthält die Bildquellen (Kamera, Bilddatei,
+# Bildordner, Video und künstliche Bilder) für die
+# automatische Greifsoftware.
+#
+# Autor: Maximilian Schnell
+
+############################################################
+# Bibliotheken                                             #
+############################################################
+
+# OpenCV
+import cv2 as cv
+# Numpy
+import numpy as np
+# Dateien
+import os
+# Betriebssystem erkennen (Kamera-Backend)
+import sys
+# Abspielgeschwindigkeit
+import time
+
+
+############################################################
+# Konstanten                                               #
+############################################################
+
+# Kamera-Backend je Betriebssystem (DirectShow gibt es nur unter Windows)
+PLATFORM_CAMERA_BACKENDS = {'win32': cv.CAP_DSHOW, 'darwin': cv.CAP_AVFOUNDATION, 'linux': cv.CAP_V4L2}
+# Kamera-Backends nach Namen (Einstellung camera_backend, 'auto': passend zum Betriebssystem)
+CAMERA_BACKENDS = {'any': cv.CAP_ANY, 'dshow': cv.CAP_DSHOW, 'msmf': cv.CAP_MSMF, 'v4l2': cv.CAP_V4L2,
+                   'avfoundation': cv.CAP_AVFOUNDATION, 'gstreamer': cv.CAP_GSTREAMER}
+# Verhalten am Ende einer Bildfolge ('loop': von vorne, 'bounce': rückwärts zurück, 'once': Quelle endet)
+LOOP_MODES = ('loop', 'bounce', 'once')
+# Dateiendungen der Bilder im Bildordner
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff')
+
+
+############################################################
+# Bildquelle erstellen                                     #
+############################################################
+
+def create_frame_source(camera_settings, detection_settings):
+    # Gemeinsame Einstellungen aller Quellen
+    source = detection_settings['frame_source']
+    playback_fps = detection_settings['playback_fps']
+    loop_mode = detection_settings['loop_mode']
+    if loop_mode not in LOOP_MODES:
+        print(f"[WARNING] Unbekannter Wiedergabe-Modus '{loop_mode}', verwende 'loop'.")
+        loop_mode = 'loop'
+    
+    # Quelle nach Einstellung erstellen
+    if source == 'camera':
+        return CameraFrameSource(camera_settings['camera_index'], camera_settings['width'], camera_settings['height'], detection_settings['camera_backend'], playback_fps)
+    elif source == 'image':
+        return ImageFilesFrameSource([detection_settings['source_path']], playback_fps, loop_mode)
+    elif source == 'directory':
+        return ImageFilesFrameSource(list_image_files(detection_settings['source_path']), playback_fps, loop_mode)
+    elif source == 'video':
+        return VideoFrameSource(detection_settings['source_path'], playback_fps, loop_mode)
+    elif source == 'synthetic':
+        return SyntheticFrameSource(camera_settings['width'], camera_settings['height'], detection_settings['synthetic_objects'], detection_settings['synthetic_frames'], playback_fps, loop_mode)
+    else:
+        print(f"[ERROR] Unbekannte Bildquelle '{source}'.")
+        return None
+
+
+def list_image_files(directory):
+    # Alle Bilder des Ordners in alphabetischer Reihenfolge
+    if not os.path.isdir(directory):
+        return []
+    return [os.path.join(directory, name) for name in sorted(os.listdir(directory)) if name.lower().endswith(IMAGE_EXTENSIONS)]
+
+
+############################################################
+# Bildquellen                                              #
+############################################################
+
+# FrameSource:
+# Gemeinsame Grundlage aller Bildquellen. read() hält die
+# eingestellte Abspielgeschwindigkeit ein (0: so schnell wie
+# möglich) und liefert (ret, img) wie cv.VideoCapture.read().
+class FrameSource:
+    
+    def __init__(self, playback_fps=0):
+        # Zeit zwischen zwei Bildern (0: nicht warten)
+        self._period = 1 / playback_fps if playback_fps > 0 else 0
+        self._next_time = None
+        
+        # Angeforderte Auflösung (None: Auflösung der Quelle)
+        self._resolution = None
+        
+        # Quelle zu Ende (nur im Modus 'once')
+        self._finished = False
+    
+    def open(self):
+        # Quelle öffnen, True bei Erfolg
+        return True
+    
+    def release(self):
+        # Quelle schließen
+        pass
+    
+    def get_description(self):
+        # Bezeichnung für Meldungen
+        return "Bildquelle"
+    
+    def is_finished(self):
+        # Liefert die Quelle keine Bilder mehr?
+        return self._finished
+    
+    def set_resolution(self, width, height):
+        # Bilder werden ab dem nächsten Bild auf diese Auflösung gebracht
+        self._resolution = (width, height)
+    
+    def read(self):
+        # Quelle zu Ende? -> kein Bild
+        if self._finished:
+            return False, None
+        
+        # Abspielgeschwindigkeit einhalten, dann Bild holen
+        self._wait_for_next_frame()
+        return self._read_frame()
+    
+    def _read_frame(self):
+        # Wird von den Quellen überschrieben
+        return False, None
+    
+    def _wait_for_next_frame(self):
+        # Ohne Abspielgeschwindigkeit nicht warten
+        if self._period == 0:
+            return
+        
+        # Zu weit hinter dem Takt? -> Takt neu beginnen (verpasste Bilder nicht nachholen)
+        now = time.perf_counter()
+        if self._next_time is None or now - self._next_time > self._period:
+            self._next_time = now
+        elif self._next_time > now:
+            time.sleep(self._next_time - now)
+        self._next_time += self._period
+    
+    def _scale_image(self, img):
+        # Bild auf die angeforderte Auflösung bringen (verkleinern mit Flächenmittelung)
+        if self._resolution is None or (img.shape[1], img.shape[0]) == self._resolution:
+            return img
+        return cv.resize(img, self._resolution, interpolation=cv.INTER_AREA)
+
+
+# CameraFrameSource:
+# Live-Kamera über cv.VideoCapture. Das Backend wird passend zum
+# Betriebssystem gewählt (Windows: DirectShow, Linux: V4L2,
+# macOS: AVFoundation), falls es nicht fest eingestellt ist.
+class CameraFrameSource(FrameSource):
+    
+    def __init__(self, camera_index, width, height, backend='auto', playback_fps=0):
+        super().__init__(playback_fps)
+        
+        # Kamera-Einstellungen abspeichern
+        self._camera_index = camera_index
+        self._width = width
+        self._height = height
+        if backend == 'auto':
+            self._backend = PLATFORM_CAMERA_BACKENDS.get(sys.platform, cv.CAP_ANY)
+        else:
+            self._backend = CAMERA_BACKENDS.get(backend, cv.CAP_ANY)
+        self._capture = None
+    
+    def open(self):
+        # Kameraaufnahme konfigurieren
+        self._capture = cv.VideoCapture(self._camera_index, self._backend)
+        if self._capture is None or not self._capture.isOpened():
+            return False
+        
+        self._capture.set(cv.CAP_PROP_FRAME_WIDTH, self._width)
+        self._capture.set(cv.CAP_PROP_FRAME_HEIGHT, self._height)
+        self._capture.set(cv.CAP_PROP_AUTOFOCUS, 0)
+        self._capture.set(cv.CAP_PROP_FOCUS, 30)
+        self._capture.set(cv.CAP_PROP_BUFFERSIZE, 1)
+        return True
+    
+    def release(self):
+        if self._capture is not None:
+            self._capture.release()
+    
+    def get_description(self):
+        return f"Kamera {self._camera_index}"
+    
+    def set_resolution(self, width, height):
+        # Die Kamera selbst umstellen (kein Skalieren nötig)
+        self._capture.set(cv.CAP_PROP_FRAME_WIDTH, width)
+        self._capture.set(cv.CAP_PROP_FRAME_HEIGHT, height)
+    
+    def _read_frame(self):
+        return self._capture.read()
+
+
+# IndexedFrameSource:
+# Grundlage der Quellen mit einer festen Anzahl an Bildern.
+# Bestimmt das nächste Bild je nach Wiedergabe-Modus (von vorne,
+# hin und zurück oder einmal bis zum Ende).
+class IndexedFrameSource(FrameSource):
+    
+    def __init__(self, playback_fps=0, loop_mode='loop'):
+        super().__init__(playback_fps)
+        
+        # Position in der Bildfolge
+        self._loop_mode = loop_mode
+        self._frame_count = 0
+        self._index = 0
+        self._direction = 1
+    
+    def _read_frame(self):
+        # Keine Bilder? -> nichts zu liefern
+        if self._frame_count == 0:
+            return False, None
+        return self._get_frame(self._next_index())
+    
+    def _get_frame(self, index):
+        # Wird von den Quellen überschrieben
+        return False, None
+    
+    def _next_index(self):
+        # Aktuelles Bild liefern und das folgende Bild nach dem Wiedergabe-Modus bestimmen
+        index = self._index
+        next_index = index + self._direction
+        if 0 <= next_index < self._frame_count:
+            self._index = next_index
+        elif self._loop_mode == 'loop':
+            self._index = 0
+        elif self._loop_mode == 'bounce':
+            self._direction = -self._direction
+            self._index = min(max(index + self._direction, 0), self._frame_count - 1)
+        else:
+            self._finished = True
+        return index
+
+
+# ImageFilesFrameSource:
+# Einzelnes Bild oder alle Bilder eines Ordners. Die Dateien
+# werden beim Öffnen einmal geladen und dann aus dem Speicher
+# geliefert (auch skaliert nur einmal pro Auflösung), sodass
+# kein Dateizugriff die Messungen verfälscht.
+# Die gelieferten Bilder dürfen nicht verändert werden.
+class ImageFilesFrameSource(IndexedFrameSource):
+    
+    def __init__(self, paths, playback_fps=0, loop_mode='loop'):
+        super().__init__(playback_fps, loop_mode)
+        
+        # Dateien und geladene Bilder
+        self._paths = paths
+        self._images = []
+        self._scaled_images = {}
+    
+    def open(self):
+        # Alle Bilder laden (fehlerhafte Dateien auslassen)
+        self._images = []
+        for path in self._paths:
+            img = cv.imread(path)
+            if img is None:
+                print(f"[WARNING] Bild {path} konnte nicht geladen werden.")
+                continue
+            self._images.append(img)
+        self._frame_count = len(self._images)
+        return self._frame_count > 0
+    
+    def get_description(self):
+        if len(self._paths) == 1:
+            return f"Bilddatei {self._paths[0]}"
+        return f"Bildordner ({len(self._paths)} Bilder)"
+    
+    def set_resolution(self, width, height):
+        # Skalierte Bilder der alten Auflösung verwerfen
+        super().set_resolution(width, height)
+        self._scaled_images = {}
+    
+    def _get_frame(self, index):
+        # Skaliertes Bild aus dem Speicher (beim ersten Mal skalieren)
+        img = self._scaled_images.get(index)
+        if img is None:
+            img = self._scale_image(self._images[index])
+            self._scaled_images[index] = img
+        return True, img
+
+
+# VideoFrameSource:
+# Bilder einer Videodatei. Gelesen wird fortlaufend; nur bei einem
+# Sprung (von vorne, rückwärts) wird im Video gesucht.
+class VideoFrameSource(IndexedFrameSource):
+    
+    def __init__(self, path, playback_fps=0, loop_mode='loop'):
+        super().__init__(playback_fps, loop_mode)
+        
+        # Datei und Leseposition
+        self._path = path
+        self._capture = None
+        self._position = 0
+    
+    def open(self):
+        # Video öffnen und Anzahl der Bilder bestimmen
+        self._capture = cv.VideoCapture(self._path)
+        if self._capture is None or not self._capture.isOpened():
+            return False
+        self._frame_count = int(self._capture.get(cv.CAP_PROP_FRAME_COUNT))
+        self._position = 0
+        return self._frame_count > 0
+    
+    def release(self):
+        if self._capture is not None:
+            self._capture.release()
+    
+    def get_description(self):
+        return f"Video {self._path}"
+    
+    def _get_frame(self, index):
+        # Nicht das nächste Bild? -> im Video suchen
+        if index != self._position:
+            self._capture.set(cv.CAP_PROP_POS_FRAMES, index)
+        ret, img = self._capture.read()
+        self._position = index + 1
+        
+        # Angegebene Bildanzahl zu groß? (kommt bei manchen Formaten vor) -> Länge korrigieren, nächstes Bild liefern
+        if not ret and index > 0:
+            self._frame_count = index
+            self._index = index - 1
+            self._next_index()
+            return self._read_frame() if not self._finished else (False, None)
+        if not ret:
+            return False, None
+        return True, self._scale_image(img)
+
+
+# SyntheticFrameSource:
+# Künstliche Szene ohne Kamera und Dateien: helle, gedrehte
+# Rechtecke bewegen sich langsam über einen dunklen, leicht
+# verrauschten Hintergrund. Bild N ist bei gleichem Startwert
+# immer gleich (reproduzierbare Messungen).
+class SyntheticFrameSource(IndexedFrameSource):
+    
+    def __init__(self, width, height, object_count=6, frame_count=300, playback_fps=0, loop_mode='loop', seed=0):
+        super().__init__(playback_fps, loop_mode)
+        
+        # Szenen-Einstellungen abspeichern
+        self._width = width
+        self._height = height
+        self._object_count = object_count
+        self._scene_frame_count = frame_count
+        self._seed = seed
+        self._background = None
+    
+    def open(self):
+        # Objekte zufällig, aber reproduzierbar anlegen (Positionen und Größen relativ zur Bildbreite)
+        rng = np.random.default_rng(self._seed)
+        self._positions = rng.uniform(0.0, 1.0, (self._object_count, 2))
+        self._velocities = rng.uniform(-0.004, 0.004, (self._object_count, 2))
+        self._sizes = rng.uniform(0.04, 0.07, (self._object_count, 2))
+        self._angles = rng.uniform(0.0, 180.0, self._object_count)
+        self._angular_velocities = rng.uniform(-1.0, 1.0, self._object_count)
+        self._frame_count = self._scene_frame_count
+        self._create_background()
+        return self._frame_count > 0
+    
+    def get_description(self):
+        return f"Künstliche Bilder ({self._object_count} Objekte)"
+    
+    def set_resolution(self, width, height):
+        # Szene direkt in der neuen Auflösung zeichnen
+        self._width, self._height = width, height
+        self._create_background()
+    
+    def _create_background(self):
+        # Dunkler Hintergrund mit festem Rauschen
+        rng = np.random.default_rng(self._seed + 1)
+        self._background = rng.integers(30, 60, (self._height, self._width, 3), dtype=np.uint8)
+    
+    def _get_frame(self, index):
+        # Positionen als Dreieckswelle (Objekte prallen am Rand ab, Abstand zum Rand 10 %)
+        positions = np.abs((self._positions + self._velocities * index) % 2.0 - 1.0)
+        u = (0.1 + 0.8 * positions[:, 0]) * self._width
+        v = (0.1 + 0.8 * positions[:, 1]) * self._height
+        w = self._sizes[:, 0] * self._width
+        h = self._sizes[:, 1] * self._width
+        alpha = self._angles + self._angular_velocities * index
+        
+        # Rechtecke auf eine Kopie des Hintergrunds zeichnen
+        img = self._background.copy()
+        for i in range(self._object_count):
+            box_points = cv.boxPoints(((u[i], v[i]), (w[i], h[i]), alpha[i]))
+            cv.fillPoly(img, [np.intp(box_points)], (220, 220, 220))
+        return True, img
\ No newline at end of file
@@ -15,32 +15,56 @@ import numpy as np
 import math
 # Multithreading
 import threading
+# Zeitmessung der Bearbeitungsschritte
+import time
+# Multiprocessing
+import multiprocessing
 import queue
-# Modul-Status-Enum
-from utils import Status
+# Thread-Pool für die Bildstreifen
+import concurrent.futures
+# Modul-Status-Enum, Übergabe-Postfach, Bild-Ringpuffer, Puffer-Pool und Stufen-Zeitmesser
+from utils import Status, Mailbox, SharedImageRing, BufferPool, StageTimer
+# Bildquellen (Kamera, Bilddatei, Bildordner, Video, künstliche Bilder)
+from frameSources import create_frame_source
 
 
 ############################################################
 # Debug-Einstellungen                                      #
 ############################################################
 
-# Beispielbild statt Kamera verwenden?
-DEBUG_EXAMPLE_PICTURE = False
 # Bearbeitete Bilder abspechern?
 DEBUG_SAVE_PICTURES = False
 
 
+############################################################
+# Konstanten                                               #
+############################################################
+
+# Bilder, die von der Bilderkennung angefordert werden können (Reihenfolge wie in get_images)
+IMAGE_PRODUCTS = ('raw', 'blur', 'binary', 'overlay')
+# Verkleinerung der Trefferkarte als Nachkommabits für fillPoly (2: ein Eintrag pro 4x4 Pixel)
+HIT_MAP_SHIFT = 2
+HIT_MAP_SCALE = 2 ** HIT_MAP_SHIFT
+# Parameter der Vorverarbeitung und deren Ergebnisse im Bild-dict (Standbild-Modus: nur bei Änderung wiederholen)
+PREPROCESS_PARAMETERS = ('blur_kernel_size', 'threshold_brightness', 'undistortion_mode', 'detection_mode', 'pyramid_levels')
+PREPROCESS_PRODUCTS = ('img_undist', 'img_blur', 'img_binary', 'roi', 'maps', 'scale')
+# Felder eines gefundenen Objekts (ein Eintrag des strukturierten Arrays in FoundObjects)
+FOUND_OBJECT_DTYPE = np.dtype([('id', np.int64), ('u', np.float64), ('v', np.float64), ('alpha', np.float64),
+                               ('w', np.float64), ('h', np.float64), ('A', np.float64), ('box_points', np.int32, (4, 2))])
+
+
 ############################################################
 # Bilderkennung                                            #
 ############################################################
 
 class ObjectDetection:
     
-    def __init__(self, camera_settings, camera_intrinsics, cv_parameters, object_parameters):
+    def __init__(self, camera_settings, camera_intrinsics, cv_parameters, object_parameters, detection_settings):
         
-        # Kameramatrix und Settings abspeichern
+        # Kameramatrix (gilt für die Kalibrier-Auflösung) und Settings abspeichern
         self._camera_settings = camera_settings
-        self._camera_matrix, distortion_matrix = self._intrinsics_settings_to_matricies(camera_intrinsics)
+        self._camera_intrinsics = camera_intrinsics
+        self._camera_matrix, distortion_matrix, calibration_size = self._intrinsics_settings_to_matricies(camera_intrinsics)
         self._object_parameters = object_parameters
         
         # Variablen initialisieren
@@ -48,10 +72,32 @@ class ObjectDetection:
         self._img_blur = cv.imread('Bilder/Testbild.png')
         self._img_binary = cv.imread('Bilder/Testbild.png')
         self._img_overlay = cv.imread('Bilder/Testbild.png')
-        self._found_objects = []
+        self._found_objects = FoundObjects()
+        
+        # Zwischengespeicherte Greifdaten (pro Bild und Pose) und Transformationen (pro Pose)
+        self._grab_data = None
+        self._grab_data_key = None
+        self._pose_transforms = None
+        self._pose_transforms_key = None
+        
+        # Messwerte der GUI-Seite (Wartezeit der Ergebnisse) und Bezugswerte für die Bilder pro Sekunde
+        self._stage_timer = StageTimer()
+        self._fps_reference = None
+        self._fps = {'capture_fps': 0.0, 'processing_fps': 0.0}
+        
+        # Bis zum ersten Ergebnis gilt die eingestellte Auflösung
+        self._frame_info = {
+            'camera_matrix': scale_camera_matrix(self._camera_matrix, calibration_size, camera_settings['width'], camera_settings['height']),
+            'width': camera_settings['width'],
+            'height': camera_settings['height'],
+            'hit_map': create_hit_map([], camera_settings['width'], camera_settings['height'])
+        }
         
-        # Bildauslese- und Bildbearbeitungs-Thread erstellen und starten
-        self._image_thread = ImageCaptureAndProcessingThread(camera_settings, self._camera_matrix, distortion_matrix, cv_parameters)
+        # Bildauslese- und Bildbearbeitungs-Thread (bzw. -Prozess) erstellen und starten
+        if detection_settings['backend'] == 'process':
+            self._image_thread = ImageCaptureAndProcessingProcess(camera_settings, self._camera_matrix, distortion_matrix, calibration_size, cv_parameters, detection_settings)
+        else:
+            self._image_thread = ImageCaptureAndProcessingThread(camera_settings, self._camera_matrix, distortion_matrix, calibration_size, cv_parameters, detection_settings)
         
         self._image_thread.start()
     
@@ -66,6 +112,14 @@ class ObjectDetection:
         # Ergebnis aufspalten
         (img_raw, img_blur, img_binary, img_overlay), found_objects = result
         
+        # Wartezeit vom Übergeben bis zum Abholen, nur einmal pro Übergabe (der Prozess-Betrieb liefert jedes Mal ein neues Objekt,
+        # deshalb wird am Übergabezeitpunkt statt an der Identität erkannt, ob das Ergebnis schon abgeholt wurde)
+        if found_objects.metadata['publish_time'] != self._frame_info.get('publish_time'):
+            found_objects.metadata['receive_time'] = time.perf_counter()
+            self._stage_timer.add('wait_result', found_objects.metadata['receive_time'] - found_objects.metadata['publish_time'])
+        else:
+            found_objects.metadata['receive_time'] = self._frame_info['receive_time']
+        
         # Bilder abspeichern
         self._img_raw = img_raw
         self._img_blur = img_blur
@@ -73,40 +127,150 @@ class ObjectDetection:
         self._img_overlay = img_overlay
         
         if DEBUG_SAVE_PICTURES:
-            cv.imwrite('Bilder/Prozessbild_raw.png', img_raw)
-            cv.imwrite('Bilder/Prozessbild_blur.png', img_blur)
-            cv.imwrite('Bilder/Prozessbild_binary.png', img_binary)
-            cv.imwrite('Bilder/Prozessbild_overlay.png', img_overlay)
+            # Nicht angeforderte Bilder (None) werden übersprungen
+            for name, img in zip(IMAGE_PRODUCTS, (img_raw, img_blur, img_binary, img_overlay)):
+                if img is not None:
+                    cv.imwrite(f'Bilder/Prozessbild_{name}.png', img)
         
-        # Gefundene Objekte abspeichern
+        # Gefundene Objekte und die Auflösung / Kameramatrix, in der sie gefunden wurden, abspeichern
         self._found_objects = found_objects
+        self._frame_info = found_objects.metadata
+        
+        # Greifdaten gehören zum alten Bild -> bei Bedarf neu berechnen
+        self._grab_data = None
         
         return True
     
     def get_images(self):
+        # Nicht angeforderte Bilder sind None
         return self._img_raw, self._img_blur, self._img_binary, self._img_overlay
     
+    def set_image_subscriptions(self, products):
+        # Nur diese Bilder (aus IMAGE_PRODUCTS) werden erstellt bzw. übergeben
+        self._image_thread.set_image_subscriptions(products)
+    
     def get_status(self):
         return self._image_thread.get_status()
     
+    def get_dropped_frames(self):
+        return self._image_thread.get_dropped_frames()
+    
+    def get_skipped_frames(self):
+        # Anzahl der unveränderten (nicht erneut bearbeiteten) Bilder
+        return self._image_thread.get_skipped_frames()
+    
+    def get_buffer_stats(self):
+        return self._image_thread.get_buffer_stats()
+    
+    def get_metrics(self):
+        # Zähler und Dauer der Schritte (Anzahl, Mittelwert, Median, 99. Perzentil in ms) der Bilderkennung und der GUI-Seite
+        metrics = self._image_thread.get_metrics()
+        metrics['stages'] = metrics['stages'] | self._stage_timer.get_stats()
+        
+        # Aufgenommene und bearbeitete Bilder pro Sekunde (über mindestens eine Sekunde gemittelt)
+        now = time.perf_counter()
+        counters = (now, metrics['captured_frames'], metrics['processed_frames'])
+        if self._fps_reference is None or counters[1] < self._fps_reference[1]:
+            self._fps_reference = counters
+        elif now - self._fps_reference[0] >= 1.0:
+            duration = now - self._fps_reference[0]
+            self._fps = {
+                'capture_fps': (counters[1] - self._fps_reference[1]) / duration,
+                'processing_fps': (counters[2] - self._fps_reference[2]) / duration
+            }
+            self._fps_reference = counters
+        
+        return metrics | self._fps
+    
+    def get_frame_timing(self):
+        # Bildnummer sowie Aufnahme-, Übergabe- und Abholzeitpunkt (perf_counter) des Bildes, aus dem die aktuellen Objekte stammen
+        return {key: self._frame_info.get(key) for key in ('sequence', 'capture_time', 'publish_time', 'receive_time')}
+    
     def set_cv_parameters(self, parameters):
         self._image_thread.set_cv_parameters(parameters)
     
+    def set_capture_resolution(self, width, height):
+        # Kamera auf eine andere Auflösung umstellen (Intrinsics und Flächen werden automatisch angepasst)
+        self._image_thread.set_capture_resolution(width, height)
+    
+    def set_freeze_frame(self, enabled):
+        # Standbild zum Einstellen der Parameter (nur die von einer Änderung betroffenen Schritte werden wiederholt)
+        self._image_thread.set_freeze_frame(enabled)
+    
+    def set_result_callback(self, func):
+        # func wird aus einem Hintergrund-Thread aufgerufen, sobald ein neues Ergebnis bereitliegt (darf nur kurz dauern)
+        self._image_thread.set_result_callback(func)
+    
+    def get_camera_settings(self):
+        return self._camera_settings
+    
+    def set_camera_intrinsics(self, camera_intrinsics):
+        # Neue Kameramatrix berechnen
+        self._camera_intrinsics = camera_intrinsics
+        self._camera_matrix, distortion_matrix, calibration_size = self._intrinsics_settings_to_matricies(camera_intrinsics)
+        
+        # Thread Bescheid geben (Entzerrungs-Cache wird dort automatisch neu aufgebaut)
+        self._image_thread.set_camera_intrinsics(self._camera_matrix, distortion_matrix, calibration_size)
+    
+    def set_object_parameters(self, object_parameters):
+        # Neue Dicke -> Greifdaten beim nächsten Zugriff neu berechnen
+        self._object_parameters = object_parameters
+        self._grab_data = None
+    
     def get_object_at_uv(self, u_rel, v_rel):
-        # Alle gefundenen Objekte durchsuchen
-        for obj in self._found_objects:
-            # u und v (0 bis 1) auf die Kameraauflösung anpassen
-            u = u_rel * self._camera_settings['width']
-            v = v_rel * self._camera_settings['height']
-            # Wurde das Objekt mit der Maus getroffen?
-            hit = self._check_hit_box(obj, u, v)
-            if hit:
-                return True, obj
-        
-        # => Nichts getroffen
-        return False, None
+        # u und v (0 bis 1) auf die (verkleinerte) Trefferkarte des Bildes anpassen, in dem die Objekte gefunden wurden
+        hit_map = self._frame_info['hit_map']
+        row = min(max(int(v_rel * self._frame_info['height']) // HIT_MAP_SCALE, 0), hit_map.shape[0] - 1)
+        column = min(max(int(u_rel * self._frame_info['width']) // HIT_MAP_SCALE, 0), hit_map.shape[1] - 1)
+        
+        # Eintrag der Karte ist der Index des Objekts plus 1 (0: nichts getroffen)
+        index = hit_map[row, column]
+        if index == 0:
+            return False, None
+        return True, self._found_objects[index - 1]
     
     def get_grab_data(self, obj, extrinsics):
+        # Greifdaten aller Objekte des Bildes (einmal pro Bild und Pose berechnet) nachschlagen
+        return self.get_all_grab_data(extrinsics)[obj.index]
+    
+    def get_all_grab_data(self, extrinsics):
+        # Für dieses Bild und diese Pose schon berechnet? -> Ergebnis wiederverwenden
+        key = (tuple(extrinsics), self._object_parameters['min_depth'])
+        if self._grab_data_key == key and self._grab_data is not None:
+            return self._grab_data
+        
+        # Transformationen der Pose holen
+        A, b, cam_gamma, size_factor = self._get_pose_transforms(extrinsics)
+        
+        # Alle Objekte auf einmal: [u, v, 1] * A^T + b ergibt die Position im Weltkoordinatensystem
+        records = self._found_objects.records
+        uv1 = np.ones((len(records), 3))
+        uv1[:, 0] = records['u']
+        uv1[:, 1] = records['v']
+        positions = uv1.dot(A.T) + b
+        gammas = records['alpha'] + cam_gamma
+        widths = records['w'] * size_factor
+        heights = records['h'] * size_factor
+        
+        self._grab_data = [{
+            'x': positions[i, 0],
+            'y': positions[i, 1],
+            'z': positions[i, 2],
+            'gamma': gammas[i],
+            'w': widths[i],
+            'h': heights[i],
+        } for i in range(len(records))]
+        self._grab_data_key = key
+        
+        return self._grab_data
+    
+    def _get_pose_transforms(self, extrinsics):
+        # Für diese Pose, Kameramatrix und Objekt-Dicke schon berechnet? -> wiederverwenden
+        camera_matrix = self._frame_info['camera_matrix']
+        key = (tuple(extrinsics), self._object_parameters['min_depth'], camera_matrix.tobytes())
+        if self._pose_transforms_key == key:
+            return self._pose_transforms
+        
         # Extrinsics verarbeiten
         t_Wo_K__Wo = np.array(extrinsics[0:3])
         cam_gamma = extrinsics[3]
@@ -114,42 +278,23 @@ class ObjectDetection:
         s = math.sin(math.radians(cam_gamma))
         R_K_Wo = np.array([[0, -1, 0], [-1, 0, 0], [0, 0, -1]]).dot(np.array([[c, s, 0], [-s, c, 0], [0, 0, 1]]))
         
-        # Objekt-Pose berechnen
-        obj_gamma = obj['alpha'] + cam_gamma
-
+        # Abstand der Objektoberfläche zur Kamera
         z_K = t_Wo_K__Wo[2] - self._object_parameters['min_depth']
-        inv_cam_mat = np.linalg.inv(self._camera_matrix)
+        inv_cam_mat = np.linalg.inv(camera_matrix)
         R_Wo_K = np.transpose(R_K_Wo)
         t_K_Wo__K = R_K_Wo.dot(-t_Wo_K__Wo)
         t_Wo_K__K = -t_K_Wo__K
-        r_K_obj__K = z_K * inv_cam_mat.dot(np.array([obj['u'], obj['v'], 1]))
-        r_Wo_obj__K = t_Wo_K__K + r_K_obj__K
-        r_Wo_obj_Wo = R_Wo_K.dot(r_Wo_obj__K)
-
-        obj_width = obj['w'] * z_K / self._camera_matrix[0,0]
-        obj_height = obj['h'] * z_K / self._camera_matrix[0,0]
-        
-        grab_data = {
-            'x': r_Wo_obj_Wo[0],
-            'y': r_Wo_obj_Wo[1],
-            'z': r_Wo_obj_Wo[2],
-            'gamma': obj_gamma,
-            'w': obj_width,
-            'h': obj_height,
-        }
         
-        return grab_data
-    
-    def _check_hit_box(self, obj, u, v):
-        # Rotationsmatrix erstellen
-        rot_mat = np.array([[math.cos(math.radians(-obj['alpha'])), math.sin(math.radians(-obj['alpha']))],
-                            [-math.sin(math.radians(-obj['alpha'])), math.cos(math.radians(-obj['alpha']))]])
+        # r_Wo_obj_Wo = R_Wo_K * (t_Wo_K__K + z_K * K^-1 * [u, v, 1]) = A * [u, v, 1] + b
+        A = z_K * R_Wo_K.dot(inv_cam_mat)
+        b = R_Wo_K.dot(t_Wo_K__K)
         
-        # uv-Koordinaten in das Koordinatensystem des Rechteckes transformieren
-        rec_coords = np.dot(rot_mat, np.array([u, v]) - np.array([obj['u'], obj['v']]))
+        # Pixel -> Millimeter für Breite und Höhe
+        size_factor = z_K / camera_matrix[0,0]
         
-        # Zurückgeben ob neue Koordinaten im Rechteck liegen
-        return not (rec_coords[0] > obj['w'] / 2 or rec_coords[0] < -obj['w'] / 2 or rec_coords[1] > obj['h'] / 2 or rec_coords[1] < -obj['h'] / 2)
+        self._pose_transforms = (A, b, cam_gamma, size_factor)
+        self._pose_transforms_key = key
+        return self._pose_transforms
     
     def _intrinsics_settings_to_matricies(self, camera_intrinsics):
         camera_matrix = np.array([[camera_intrinsics['fx'], 0, camera_intrinsics['cx']],
@@ -159,7 +304,8 @@ class ObjectDetection:
                                       camera_intrinsics['k2'],
                                       camera_intrinsics['p1'],
                                       camera_intrinsics['p2']])
-        return camera_matrix, distortion_matrix
+        calibration_size = (camera_intrinsics['calibration_width'], camera_intrinsics['calibration_height'])
+        return camera_matrix, distortion_matrix, calibration_size
     
     def __del__(self):
         # Thread anhalten
@@ -171,22 +317,83 @@ class ObjectDetection:
 
 class ImageCaptureAndProcessingThread(threading.Thread):
     
-    def __init__(self, camera_settings, camera_matrix, distortion_matrix, cv_parameters):
+    def __init__(self, camera_settings, camera_matrix, distortion_matrix, calibration_size, cv_parameters, detection_settings):
         # Kamera- und Bilderkennungsparameter abspeichern
         self._camera_settings = camera_settings
         self._camera_matrix = camera_matrix
         self._distortion_matrix = distortion_matrix
+        self._calibration_size = calibration_size
         self._cv_parameters = cv_parameters
+        self._detection_settings = detection_settings
         
         # Variablen initialisieren
         self._status = Status.UNKNOWN
-        ret, self._img_mask = cv.threshold(cv.imread('Bilder/Maske.png', cv.IMREAD_GRAYSCALE), 127, 255, cv.THRESH_BINARY)
+        self._pipelined = (detection_settings['pipeline'] == 'pipelined')
+        self._image_subscriptions = frozenset(IMAGE_PRODUCTS)
+        self._requested_resolution = None
+        self._frame_source = None
+        self._result_callback = None
+        
+        # Unveränderte Bilder erkennen (Vergleich eines verkleinerten Graubilds mit dem zuletzt bearbeiteten)
+        self._skip_static_frames = detection_settings['skip_static_frames']
+        self._change_tolerance = detection_settings['change_tolerance']
+        self._last_thumbnail = None
+        self._last_inputs = None
+        self._last_result = None
+        self._skipped_frames = 0
+        
+        # Standbild-Modus (Zwischenergebnisse des eingefrorenen Bildes pro Schritt merken)
+        self._freeze_frame = False
+        self._frozen = None
+        
+        # Bei mehr als einem Streifen wird jedes Bild in Streifen parallel bearbeitet
+        if detection_settings['tiles'] > 1:
+            self._tile_processor = TileProcessor(detection_settings['tiles'])
+        else:
+            self._tile_processor = None
+        
+        # Objekte über mehrere Bilder verfolgen (stabile IDs, geglättete Werte)
+        if detection_settings['tracking']:
+            self._tracker = ObjectTracker(detection_settings['tracker_smoothing'], detection_settings['tracker_max_distance'], detection_settings['tracker_max_missed'], detection_settings['redetection_interval'])
+        else:
+            self._tracker = None
+        
+        # Erkennungs-Engines (Auswahl pro Bild über cv_parameters['detection_engine'])
+        self._detection_engines = {
+            'contours': ContourDetectionEngine(self._tile_processor),
+            'components': ComponentsDetectionEngine(self._tile_processor)
+        }
+        
+        # Im Pipeline-Modus sind bis zu fünf entzerrte Bilder gleichzeitig unterwegs
+        # (Vorverarbeitung, Übergabe, Analyse, Übergabe, Darstellung)
+        self._undistortion_cache = UndistortionCache(detection_settings['mask_path'], detection_settings['mask_rois'], buffer_count=5 if self._pipelined else 1, tile_processor=self._tile_processor)
+        
+        # Wiederverwendbare Puffer für alle Zwischenbilder (im Dauerbetrieb keine neuen Speicherbereiche)
+        self._buffer_pool = BufferPool()
+        self._buffer_rois = {}
+        
+        # Dauer der einzelnen Bearbeitungsschritte (Sekunden, die letzten 1000 Messungen pro Schritt)
+        self._stage_timer = StageTimer()
+        
+        # Zähler der aufgenommenen und übergebenen Bilder (jeder Zähler wird nur von einem Thread erhöht -> kein Lock nötig)
+        self._captured_frames = 0
+        self._processed_frames = 0
 
         # Thread-Sicherheitsobjekte initialisieren
         self._stop_event = threading.Event()
-        self._results_queue = queue.Queue()
+        self._results_mailbox = Mailbox()
         self._cv_parameters_lock = threading.Lock()
+        self._intrinsics_lock = threading.Lock()
         self._status_lock = threading.Lock()
+        self._subscriptions_lock = threading.Lock()
+        self._resolution_lock = threading.Lock()
+        self._last_result_lock = threading.Lock()
+        self._freeze_frame_lock = threading.Lock()
+        
+        # Übergaben zwischen den Pipeline-Stufen (nur das jeweils neueste Bild wird behalten)
+        self._preprocess_mailbox = Mailbox()
+        self._analysis_mailbox = Mailbox()
+        self._render_mailbox = Mailbox()
 
         # Thread starten
         super().__init__(daemon=True, name="ImageCaptureAndProcessingThread")
@@ -196,132 +403,1077 @@ class ImageCaptureAndProcessingThread(threading.Thread):
         with self._status_lock:
             return self._status
     
-    def get_result(self):
-        # Neue Bilder fertig?
-        available = not self._results_queue.empty()
-        if available:
-            # Neues Ergebnis aus der Queue ziehen
-            result = self._results_queue.get()
-            # Ergebnis zurückgeben
-            return True, result
-        else:
-            # Kein neues Ergebnis
-            return False, None
+    def get_result(self, timeout=0):
+        # Neues Ergebnis abholen, falls vorhanden (standardmäßig nicht warten)
+        return self._results_mailbox.get(timeout=timeout)
+    
+    def get_buffer_stats(self):
+        # Anzahl und Größe der angelegten bzw. wiederverwendeten Puffer
+        return self._buffer_pool.get_stats()
+    
+    def get_stage_timings(self):
+        # Anzahl, Mittelwert, Median und 99. Perzentil (ms) pro Bearbeitungsschritt
+        return self._stage_timer.get_stats()
+    
+    def reset_stage_timings(self):
+        # Bisherige Dauern verwerfen (z.B. nach dem Aufwärmen)
+        self._stage_timer.reset()
+    
+    def get_metrics(self):
+        # Zähler, verworfene / übersprungene Bilder und Dauer der Schritte
+        return {
+            'captured_frames': self._captured_frames,
+            'processed_frames': self._processed_frames,
+            'skipped_frames': self.get_skipped_frames(),
+            'dropped_frames': self.get_dropped_frames(),
+            'stages': self._stage_timer.get_stats()
+        }
+    
+    def get_skipped_frames(self):
+        # Anzahl der unveränderten Bilder, die weder bearbeitet noch übergeben wurden
+        with self._last_result_lock:
+            return self._skipped_frames
+    
+    def get_dropped_frames(self):
+        # Anzahl der überschriebenen (nie bearbeiteten) Bilder pro Übergabe
+        dropped_frames = {'result': self._results_mailbox.get_dropped()}
+        if self._pipelined:
+            dropped_frames['preprocess'] = self._preprocess_mailbox.get_dropped()
+            dropped_frames['analysis'] = self._analysis_mailbox.get_dropped()
+            dropped_frames['render'] = self._render_mailbox.get_dropped()
+        return dropped_frames
     
     def set_cv_parameters(self, parameters):
         # Gleichzeitiges Zugreifen verhindern
         with self._cv_parameters_lock:
             self._cv_parameters = parameters
     
+    def set_camera_intrinsics(self, camera_matrix, distortion_matrix, calibration_size):
+        # Gleichzeitiges Zugreifen verhindern
+        with self._intrinsics_lock:
+            self._camera_matrix = camera_matrix
+            self._distortion_matrix = distortion_matrix
+            self._calibration_size = calibration_size
+    
+    def set_capture_resolution(self, width, height):
+        # Gleichzeitiges Zugreifen verhindern (umgestellt wird vor der nächsten Aufnahme)
+        with self._resolution_lock:
+            self._requested_resolution = (width, height)
+    
+    def set_image_subscriptions(self, products):
+        # Gleichzeitiges Zugreifen verhindern
+        with self._subscriptions_lock:
+            # Andere Bilder angefordert -> Referenz für unveränderte Bilder verwerfen, damit das nächste Bild
+            # vollständig bearbeitet wird (sonst bekommt die neue Seite ihre Bilder erst, wenn sich die Szene ändert)
+            if frozenset(products) != self._image_subscriptions:
+                self._last_thumbnail = None
+            self._image_subscriptions = frozenset(products)
+    
+    def set_freeze_frame(self, enabled):
+        # Gleichzeitiges Zugreifen verhindern (eingefroren wird das nächste Kamerabild)
+        with self._freeze_frame_lock:
+            self._freeze_frame = enabled
+    
+    def set_result_callback(self, func):
+        # Wird nach jedem übergebenen Ergebnis aufgerufen (Zuweisung ist atomar -> kein Lock nötig)
+        self._result_callback = func
+    
     def stop(self):
         # Stop-Event setzen -> Thread wird beim nächsten Loop aufhören
         self._stop_event.set()
     
     def run(self):
-        # Kameraaufnahme konfigurieren
-        self._capture = cv.VideoCapture(self._camera_settings['camera_index'], cv.CAP_DSHOW)
+        # Bildquelle öffnen (Kamera oder Wiedergabe aus Dateien / künstlichen Bildern)
+        self._frame_source = create_frame_source(self._camera_settings, self._detection_settings)
         
-        if self._capture == None or not self._capture.isOpened():
-            print(f"[ERROR] Es konnte keine Verbindung zu Kamera {self._camera_settings['camera_index']} aufgebaut werden.")
+        if self._frame_source == None or not self._frame_source.open():
+            if self._frame_source != None:
+                print(f"[ERROR] {self._frame_source.get_description()} konnte nicht geöffnet werden.")
+                # Thread schließen
+                self._frame_source.release()
             self._status = Status.ERROR
-            # Thread schließen
-            self._capture.release()
             return
         else:
             self._status = Status.WORKING
-        
-        self._capture.set(cv.CAP_PROP_FRAME_WIDTH, self._camera_settings['width'])
-        self._capture.set(cv.CAP_PROP_FRAME_HEIGHT, self._camera_settings['height'])
-        self._capture.set(cv.CAP_PROP_AUTOFOCUS, 0)
-        self._capture.set(cv.CAP_PROP_FOCUS, 30)
-        self._capture.set(cv.CAP_PROP_BUFFERSIZE, 1)
 
         # Bildschleife beginnen
+        if self._pipelined:
+            self._run_pipelined()
+        else:
+            self._run_sequential()
+        
+        # Gleichzeitiges Zugreifen verhindern
+        with self._status_lock:
+            self._status = Status.ERROR
+        
+        # Thread-Pool der Bildstreifen beenden
+        if self._tile_processor is not None:
+            self._tile_processor.shutdown()
+        
+        # Thread schließen
+        self._frame_source.release()
+    
+    def _run_sequential(self):
+        # Alle Stufen nacheinander in diesem Thread ausführen
         while not self._stop_event.is_set():
-            # Rohes Kamera-/Beispielbild bekommen
-            ret, img_raw = self._read_raw_image()
-            if not ret:
+            if self._process_frozen_frame():
+                continue
+            
+            frame = self._capture_stage()
+            if frame is None:
                 continue
             
-            # Aktuelle Parameter kopieren (damit Lock schnell wieder frei ist)
+            self._preprocess_stage(frame)
+            self._analysis_stage(frame)
+            self._render_stage(frame)
+            self._publish_result(frame)
+    
+    def _run_pipelined(self):
+        # Jede Stufe in einem eigenen Thread (OpenCV gibt den GIL frei -> Stufen laufen parallel)
+        stage_threads = [
+            PipelineStageThread("Preprocess", self._preprocess_stage, self._preprocess_mailbox, self._analysis_mailbox.put, self._stop_event, self._stage_timer),
+            PipelineStageThread("Analysis", self._analysis_stage, self._analysis_mailbox, self._render_mailbox.put, self._stop_event, self._stage_timer),
+            PipelineStageThread("Render", self._render_stage, self._render_mailbox, self._publish_result, self._stop_event, self._stage_timer)
+        ]
+        for stage_thread in stage_threads:
+            stage_thread.start()
+        
+        # Dieser Thread übernimmt die Bildaufnahme (im Standbild-Modus auch die ganze Bearbeitung)
+        while not self._stop_event.is_set():
+            if self._process_frozen_frame():
+                continue
+            
+            frame = self._capture_stage()
+            if frame is None:
+                continue
+            
+            frame['queued_time'] = time.perf_counter()
+            self._preprocess_mailbox.put(frame)
+        
+        # Auf das Ende der Stufen-Threads warten
+        for stage_thread in stage_threads:
+            stage_thread.join()
+    
+    ##### Einzelbild-Modus (ohne laufenden Thread, z.B. für Benchmark und autoTuner) #####
+    
+    def process_single_frame(self, img_raw, parameters=None, subscriptions=IMAGE_PRODUCTS):
+        # Ein Bild wie im sequentiellen Modus durch alle Stufen schicken (ohne Übergabe); Ergebnis wie bei get_result
+        if parameters is None:
             with self._cv_parameters_lock:
                 parameters = self._cv_parameters
-            
+        frame = {'img_raw': img_raw, 'parameters': parameters, 'subscriptions': frozenset(subscriptions), 'capture_time': time.perf_counter()}
+        
+        self._preprocess_stage(frame)
+        self._analysis_stage(frame)
+        self._render_stage(frame)
+        return self._create_result(frame)
+    
+    def shutdown(self):
+        # Thread-Pool der Bildstreifen beenden (nur nötig, wenn der Thread nie gestartet wurde)
+        if self._tile_processor is not None:
+            self._tile_processor.shutdown()
+    
+    ##### Standbild-Modus #####
+    
+    def _process_frozen_frame(self):
+        # Standbild-Modus aus? -> Zwischenergebnisse verwerfen, normal weiterarbeiten
+        with self._freeze_frame_lock:
+            freeze_frame = self._freeze_frame
+        if not freeze_frame:
+            self._frozen = None
+            return False
+        
+        # Beim Einschalten ein Bild aufnehmen und einfrieren
+        if self._frozen is None:
+            ret, img_raw = self._read_raw_image()
+            if not ret:
+                return True
+            self._captured_frames += 1
+            self._frozen = {'img_raw': img_raw, 'inputs': None, 'capture_time': time.perf_counter(), 'sequence': self._captured_frames}
+        
+        # Aktuelle Parameter, Intrinsics und angeforderte Bilder holen
+        with self._cv_parameters_lock:
+            parameters = self._cv_parameters
+        with self._subscriptions_lock:
+            subscriptions = self._image_subscriptions
+        intrinsics = self._get_camera_intrinsics()
+        
+        # Nichts geändert? -> kurz warten (mehrere Slider-Bewegungen werden so zur neuesten zusammengefasst)
+        inputs = (parameters, *intrinsics, subscriptions)
+        if self._frozen['inputs'] is not None and all(new is old for new, old in zip(inputs, self._frozen['inputs'])):
+            self._stop_event.wait(0.02)
+            return True
+        self._frozen['inputs'] = inputs
+        
+        # Nur die betroffenen Schritte wiederholen, dann wie gewohnt darstellen und übergeben
+        frame = {'img_raw': self._frozen['img_raw'], 'parameters': parameters, 'subscriptions': subscriptions,
+                 'capture_time': self._frozen['capture_time'], 'sequence': self._frozen['sequence'], 'frozen': True}
+        self._analyse_frozen_frame(frame)
+        self._render_stage(frame)
+        self._publish_result(frame)
+        return True
+    
+    def _analyse_frozen_frame(self, frame):
+        memo = self._frozen
+        
+        # Kameramatrix und Parameter wie im Live-Betrieb an die Auflösung anpassen (günstig -> immer)
+        self._prepare_frame(frame)
+        parameters = frame['parameters']
+        
+        # Jeder Schritt hängt von seinen Parametern und allen vorherigen Schritten ab (Schlüssel wird weitergereicht)
+        # Die Schritte selbst sind dieselben wie im Live-Betrieb (gleiche Ergebnisse auch mit Pyramide, Streifen und Maske)
+        
+        # 1. Vorverarbeitung (Entzerren, Weichzeichnen, Schwellwert und Maske)
+        key = (frame['camera_matrix'].tobytes(), frame['distortion_matrix'].tobytes()) + tuple(parameters[name] for name in PREPROCESS_PARAMETERS)
+        if memo.get('preprocess_key') != key:
+            self._preprocess_image(frame)
+            memo['preprocessed'] = {name: frame.get(name) for name in PREPROCESS_PRODUCTS}
+            memo['preprocess_key'] = key
+        frame.update(memo['preprocessed'])
+        
+        # 2. Konturen suchen (abhängig von den Parametern, die Engine bzw. Pyramiden-Modus dabei schon verwenden)
+        key = key + tuple(parameters[name] for name in self._get_contour_parameters(parameters))
+        if memo.get('contours_key') != key:
+            memo['contours'] = self._find_contours(frame)
+            memo['contours_key'] = key
+        contours, invalid_contours = memo['contours']
+        
+        # 3. Konturen prüfen (Flächen, Polygon-Genauigkeit) -> günstig, wird immer wiederholt
+        self._filter_contours(frame, contours, invalid_contours)
+    
+    def _get_contour_parameters(self, parameters):
+        # Im Pyramiden-Modus werden die Kandidaten schon beim Verfeinern geprüft, sonst hängt es von der Engine ab
+        if parameters['detection_mode'] == 'pyramid':
+            return ('detection_engine', 'contour_min_area', 'contour_max_area', 'polygon_epsilon')
+        return ('detection_engine',) + self._detection_engines[parameters['detection_engine']].CONTOUR_PARAMETERS
+    
+    ##### Pipeline-Stufen #####
+    
+    def _capture_stage(self):
+        # Neue Auflösung angefordert? -> Bildquelle umstellen
+        with self._resolution_lock:
+            resolution = self._requested_resolution
+            self._requested_resolution = None
+        if resolution is not None:
+            self._frame_source.set_resolution(*resolution)
+        
+        # Rohes Bild der Bildquelle bekommen (Aufnahmezeitpunkt für die Gesamtdauer merken)
+        with self._stage_timer.measure('capture'):
+            ret, img_raw = self._read_raw_image()
+        if not ret:
+            return None
+        capture_time = time.perf_counter()
+        self._captured_frames += 1
+        sequence = self._captured_frames
+        
+        # Aktuelle Parameter und angeforderte Bilder kopieren (damit Locks schnell wieder frei sind)
+        with self._cv_parameters_lock:
+            parameters = self._cv_parameters
+        with self._subscriptions_lock:
+            subscriptions = self._image_subscriptions
+        
+        # Bild und die zugehörigen Parameter gemeinsam weitergeben
+        frame = {'img_raw': img_raw, 'parameters': parameters, 'subscriptions': subscriptions, 'capture_time': capture_time, 'sequence': sequence}
+        
+        # Hat sich nichts verändert? -> Bild weder bearbeiten noch übergeben (das vorherige Ergebnis bleibt gültig)
+        if self._skip_static_frames and self._is_static_frame(frame):
+            return None
+        
+        return frame
+    
+    def _preprocess_stage(self, frame):
+        start = time.perf_counter()
+        self._prepare_frame(frame)
+        self._preprocess_image(frame)
+        self._stage_timer.add('preprocess', time.perf_counter() - start)
+        return frame
+    
+    def _prepare_frame(self, frame):
+        # Aktuelle Kameramatrix holen und (wie die Flächengrenzen) auf die Auflösung des Bildes anpassen
+        camera_matrix, frame['distortion_matrix'], calibration_size = self._get_camera_intrinsics()
+        height, width = frame['img_raw'].shape[:2]
+        frame['camera_matrix'] = scale_camera_matrix(camera_matrix, calibration_size, width, height)
+        frame['parameters'] = scale_cv_parameters(frame['parameters'], calibration_size, width, height)
+        
+        # Zwischen zwei vollständigen Erkennungen werden nur die verfolgten Objekte in kleinen Fenstern nachgeführt
+        # (ein Standbild wird immer vollständig erkannt)
+        frame['local_update'] = self._tracker is not None and not frame.get('frozen', False) and not self._tracker.needs_detection()
+    
+    def _preprocess_image(self, frame):
+        height, width = frame['img_raw'].shape[:2]
+        
+        # Je nach Modus das ganze Bild oder (später) nur die Konturpunkte entzerren
+        if frame['local_update']:
+            # Nichts ganz bearbeiten, nur den Cache für die Fenster bereitstellen
+            self._undistortion_cache.prepare(frame['camera_matrix'], frame['distortion_matrix'], width, height)
+            frame['img_blur'], frame['img_binary'], frame['roi'] = None, None, (0, 0, 0, 0)
+            frame['maps'] = self._undistortion_cache.get_maps()
+        elif frame['parameters']['detection_mode'] == 'pyramid':
+            # Verkleinertes, verzerrtes Bild bearbeiten (Kandidaten werden später in voller Auflösung verfeinert)
+            frame['img_blur'], frame['img_binary'], frame['roi'], frame['scale'] = self._process_coarse_image(frame['img_raw'], frame['parameters'], frame['camera_matrix'], frame['distortion_matrix'])
+            frame['maps'] = self._undistortion_cache.get_maps()
+        elif frame['parameters']['undistortion_mode'] == 'points':
+            # Bild ohne Entzerrung bearbeiten
+            frame['img_blur'], frame['img_binary'], frame['roi'] = self._process_raw_image(frame['img_raw'], frame['parameters'], frame['camera_matrix'], frame['distortion_matrix'])
+        else:
             # Bild bearbeiten
-            img_undist, img_blur, img_binary = self._process_image(img_raw, parameters)
-            
-            # Konturen identifizieren
-            contours, hierarchy = cv.findContours(img_binary, cv.RETR_EXTERNAL, cv.CHAIN_APPROX_SIMPLE)
-            
-            # Bei allen gefundenen Konturen:
-            invalid_contours = []
-            valid_contours = []
-            found_objects = []
-            for contour in contours:
-                # Kontur überprüfen (filtern)
-                if self._check_if_contour_is_valid(contour, parameters):
-                    # Kontur der "guten" Liste hinzufügen
-                    valid_contours.append(contour)
-                    
-                    # Gefundenes Objekt und seine Parameter berechnen und an Liste anheften
-                    found_objects.append(self._find_object_parameters_from_contour(contour))
-                else:
-                    # Kontur der "schlechten" Liste hinzufügen
-                    invalid_contours.append(contour)
-                
-            # Overlay erstellen
-            img_overlay = self._create_overlay(img_undist, invalid_contours, valid_contours, found_objects)
-            
-            # Ergebnisse in die Queue legen
-            result = ((img_raw, img_blur, img_binary, img_overlay), found_objects)
+            frame['img_undist'], frame['img_blur'], frame['img_binary'], frame['roi'] = self._process_image(frame['img_raw'], frame['parameters'], frame['camera_matrix'], frame['distortion_matrix'])
+    
+    def _analysis_stage(self, frame):
+        start = time.perf_counter()
+        contours, invalid_contours = self._find_contours(frame)
+        self._stage_timer.add('find_contours', time.perf_counter() - start)
+        
+        self._filter_contours(frame, contours, invalid_contours)
+        self._stage_timer.add('analysis', time.perf_counter() - start)
+        return frame
+    
+    def _find_contours(self, frame):
+        parameters = frame['parameters']
+        engine = self._detection_engines[parameters['detection_engine']]
+        
+        if frame['local_update']:
+            # Nur die verfolgten Objekte in Fenstern um ihre letzte Position nachzeichnen
+            contours, invalid_contours = self._find_tracked_contours(frame), []
+        elif parameters['detection_mode'] == 'pyramid':
+            # Kandidaten im verkleinerten Bild suchen und in voller Auflösung nachzeichnen
+            contours, invalid_contours = self._find_refined_contours(frame)
+        else:
+            # Kandidaten-Konturen identifizieren (nur im Bereich der Maske)
+            contours, invalid_contours = engine.find_contours(frame['img_binary'], frame['roi'], parameters)
             
-            if not self._results_queue.empty():
-                try:
-                    self._results_queue.get_nowait()
-                except queue.Empty:
-                    pass
-            self._results_queue.put(result)
+            # Im Punkt-Modus wurden die Konturen im verzerrten Bild gefunden -> nur deren Punkte entzerren
+            if parameters['undistortion_mode'] == 'points':
+                contours = self._undistort_contours(contours, frame['camera_matrix'], frame['distortion_matrix'])
+                invalid_contours = self._undistort_contours(invalid_contours, frame['camera_matrix'], frame['distortion_matrix'])
         
-        # Gleichzeitiges Zugreifen verhindern
-        with self._status_lock:
-            self._status = Status.ERROR
+        return contours, invalid_contours
+    
+    def _filter_contours(self, frame, contours, invalid_contours):
+        parameters = frame['parameters']
+        engine = self._detection_engines[parameters['detection_engine']]
         
-        # Thread schließen
-        self._capture.release()
+        # Konturen überprüfen und gefundene Objekte berechnen
+        with self._stage_timer.measure('filter'):
+            valid_contours, rejected_contours, found_objects = engine.analyse_contours(contours, parameters)
+            invalid_contours = invalid_contours + rejected_contours
+        
+        # Gefundene Objekte den verfolgten Objekten zuordnen (stabile IDs, geglättete Werte; nicht für ein Standbild)
+        if self._tracker is not None and not frame.get('frozen', False):
+            height, width = frame['img_raw'].shape[:2]
+            with self._stage_timer.measure('tracking'):
+                found_objects = self._tracker.update(found_objects, (width, height), not frame['local_update'])
+        
+        frame['invalid_contours'] = invalid_contours
+        frame['valid_contours'] = valid_contours
+        frame['found_objects'] = found_objects
+    
+    def _render_stage(self, frame):
+        # Will niemand das Overlay sehen? -> nicht erstellen (spart die Kopie des entzerrten Bildes)
+        if 'overlay' not in frame['subscriptions']:
+            frame['img_overlay'] = None
+            return frame
+        
+        # Overlay erstellen (hier und nicht erst in der GUI, auch wenn nur ein Ausschnitt entzerrt wurde)
+        frame['img_overlay'] = self._create_overlay(frame)
+        
+        return frame
+    
+    def _publish_result(self, frame):
+        # Bilder und gefundene Objekte samt Bildinformationen
+        images, found_objects = self._create_result(frame)
+        
+        # Für unveränderte Folgebilder merken
+        with self._last_result_lock:
+            self._last_result = found_objects
+        
+        # Ergebnisse übergeben (ein noch nicht abgeholtes Ergebnis wird ersetzt)
+        result = (images, found_objects)
+        self._results_mailbox.put(result)
+        self._processed_frames += 1
+        self._notify_result()
+        
+        # Gesamtdauer von der Aufnahme bis zur Übergabe (ein Standbild wird immer älter -> nicht messen)
+        if not frame.get('frozen', False):
+            self._stage_timer.add('frame', time.perf_counter() - frame['capture_time'])
+    
+    def _create_result(self, frame):
+        # Nur angeforderte Bilder übergeben (nicht angeforderte Puffer werden so sofort wieder frei)
+        images = tuple(frame[f'img_{product}'] if product in frame['subscriptions'] else None for product in IMAGE_PRODUCTS)
+        
+        # Auflösung, Kameramatrix und Trefferkarte mitgeben (für Treffertest und Greifdaten)
+        height, width = frame['img_raw'].shape[:2]
+        # (Karte aus dem Puffer-Pool: sie wird frei, sobald die GUI ein neueres Ergebnis übernommen hat)
+        with self._stage_timer.measure('hit_map'):
+            hit_map = self._buffer_pool.get(_hit_map_shape(width, height), dtype=np.uint16, tag='hit_map')
+            frame_info = {'camera_matrix': frame['camera_matrix'], 'width': width, 'height': height, 'hit_map': create_hit_map(frame['found_objects'], width, height, hit_map)}
         
+        # Bildnummer, Aufnahme- und Übergabezeitpunkt mitgeben (für Wartezeit und Latenz der Greifvorgänge)
+        frame_info['sequence'] = frame.get('sequence')
+        frame_info['capture_time'] = frame['capture_time']
+        frame_info['publish_time'] = time.perf_counter()
+        
+        # Bildinformationen an die gefundenen Objekte anhängen
+        found_objects = frame['found_objects']
+        found_objects.metadata = frame_info
+        return images, found_objects
+    
+    def _is_static_frame(self, frame):
+        # Verkleinertes Graubild (jeder Pixel mittelt einen ganzen Block -> Rauschen fällt kaum ins Gewicht)
+        img_raw = frame['img_raw']
+        height, width = img_raw.shape[:2]
+        thumbnail_size = (64, max(round(64 * height / width), 1))
+        thumbnail = cv.cvtColor(cv.resize(img_raw, thumbnail_size, interpolation=cv.INTER_AREA), cv.COLOR_BGR2GRAY)
+        
+        # Eingaben, bei deren Änderung das Bild trotzdem neu bearbeitet werden muss
+        inputs = (frame['parameters'], *self._get_camera_intrinsics(), frame['subscriptions'], (width, height))
+        
+        # Unverändert, wenn kein Block stärker als die Toleranz vom zuletzt bearbeiteten Bild abweicht
+        # (keine Referenz: verworfen, z.B. weil andere Bilder angefordert wurden)
+        with self._last_result_lock:
+            last_result = self._last_result
+        last_thumbnail = self._last_thumbnail
+        static = (last_result is not None and self._last_inputs is not None and last_thumbnail is not None
+                  and all(new is old for new, old in zip(inputs[:3], self._last_inputs[:3]))
+                  and inputs[3:] == self._last_inputs[3:]
+                  and cv.norm(thumbnail, last_thumbnail, cv.NORM_INF) <= self._change_tolerance)
+        
+        # Verändert -> dieses Bild wird bearbeitet und zur neuen Referenz
+        if not static:
+            self._last_thumbnail = thumbnail
+            self._last_inputs = inputs
+            return False
+        
+        # Nichts übergeben: die Anzeige behält Bilder und Objekte, die GUI wird nicht geweckt
+        with self._last_result_lock:
+            self._skipped_frames += 1
+        return True
+    
+    def _notify_result(self):
+        # Abnehmer über das neue Ergebnis benachrichtigen (falls einer eingetragen ist)
+        callback = self._result_callback
+        if callback is not None:
+            callback()
+    
+    ##### Bildbearbeitungs-Funktionen #####
+    
     def _read_raw_image(self):
-        # Beispielbild / Kamerabild zurückgeben
-        if DEBUG_EXAMPLE_PICTURE:
-            img = cv.imread('Bilder/Beispielbild.png')
-            return True, img
-        else:
-            return self._capture.read()
+        # Bild der Bildquelle zurückgeben
+        ret, img = self._frame_source.read()
+        
+        # Wiedergabe zu Ende? -> nicht im Leerlauf drehen, letztes Ergebnis bleibt stehen
+        if not ret and self._frame_source.is_finished():
+            self._stop_event.wait(0.05)
+        return ret, img
+    
+    def _get_camera_intrinsics(self):
+        # Aktuelle Kameramatrix kopieren (damit Lock schnell wieder frei ist)
+        with self._intrinsics_lock:
+            return self._camera_matrix, self._distortion_matrix, self._calibration_size
+    
+    def _process_image(self, img_raw, parameters, camera_matrix, distortion_matrix):
+        # Cache ggf. (neu) aufbauen (Entzerrungs-Karten werden nur bei neuen Intrinsics / neuer Auflösung berechnet)
+        height, width = img_raw.shape[:2]
+        self._undistortion_cache.prepare(camera_matrix, distortion_matrix, width, height)
+        
+        # Nur den Bereich der Maske bearbeiten (mit Rand, damit der Weichzeichner dort exakt bleibt)
+        roi = self._undistortion_cache.get_roi(int(parameters['blur_kernel_size']) // 2)
+        
+        # Ausschnitt entzerren
+        with self._stage_timer.measure('undistort'):
+            img_undist = self._undistortion_cache.undistort(img_raw, camera_matrix, distortion_matrix, roi)
+        
+        # Weichzeichnen, Schwellwert und Maske (Maske verdeckt den Greifer) direkt in die Ausgabepuffer
+        img_blur = self._get_output_buffer('blur', width, height, roi)
+        img_binary = self._get_output_buffer('binary', width, height, roi)
+        self._threshold_image(img_undist, parameters, _crop_image(self._undistortion_cache.get_mask(), roi), _crop_image(img_blur, roi), _crop_image(img_binary, roi))
+        
+        # Bilder zurückgeben
+        return img_undist, img_blur, img_binary, roi
+    
+    def _process_raw_image(self, img_raw, parameters, camera_matrix, distortion_matrix):
+        # Cache ggf. (neu) aufbauen, damit die Maske zur Geometrie passt
+        height, width = img_raw.shape[:2]
+        self._undistortion_cache.prepare(camera_matrix, distortion_matrix, width, height)
+        
+        # Nur den Bereich der in die verzerrte Geometrie übertragenen Maske bearbeiten
+        roi = self._undistortion_cache.get_raw_roi(int(parameters['blur_kernel_size']) // 2)
+        
+        # Weichzeichnen, Schwellwert und die in die verzerrte Geometrie übertragene Maske
+        img_blur = self._get_output_buffer('blur', width, height, roi)
+        img_binary = self._get_output_buffer('binary', width, height, roi)
+        self._threshold_image(_crop_image(img_raw, roi), parameters, _crop_image(self._undistortion_cache.get_raw_mask(), roi), _crop_image(img_blur, roi), _crop_image(img_binary, roi))
+        
+        # Bilder zurückgeben
+        return img_blur, img_binary, roi
+    
+    def _process_coarse_image(self, img_raw, parameters, camera_matrix, distortion_matrix):
+        # Cache ggf. (neu) aufbauen, damit die Maske zur Geometrie passt
+        height, width = img_raw.shape[:2]
+        self._undistortion_cache.prepare(camera_matrix, distortion_matrix, width, height)
+        
+        # Verkleinerungsfaktor der Pyramidenstufe
+        scale = 2 ** int(parameters['pyramid_levels'])
+        
+        # Bereich der verzerrten Maske, auf ganze Blöcke der Pyramidenstufe ausgerichtet
+        x0, y0, x1, y1 = self._undistortion_cache.get_raw_roi(int(parameters['blur_kernel_size']) // 2)
+        x0, y0 = x0 // scale * scale, y0 // scale * scale
+        x1, y1 = min(-(-x1 // scale) * scale, width // scale * scale), min(-(-y1 // scale) * scale, height // scale * scale)
+        roi = (x0 // scale, y0 // scale, x1 // scale, y1 // scale)
+        
+        # Ausschnitt blockweise mitteln (verkleinern)
+        img_coarse = self._buffer_pool.get((roi[3] - roi[1], roi[2] - roi[0], 3), tag='coarse')
+        with self._stage_timer.measure('downscale'):
+            cv.resize(img_raw[y0:y1, x0:x1], (roi[2] - roi[0], roi[3] - roi[1]), dst=img_coarse, interpolation=cv.INTER_AREA)
+        
+        # Kernelgröße an die Stufe anpassen (ungerade, mindestens 1)
+        blur_kernel_size = max(int(parameters['blur_kernel_size']) // scale // 2 * 2 + 1, 1)
+        coarse_parameters = parameters | {'blur_kernel_size': blur_kernel_size}
+        
+        # Weichzeichnen, Schwellwert und verkleinerte Maske
+        img_blur = self._get_output_buffer('coarse_blur', width // scale, height // scale, roi)
+        img_binary = self._get_output_buffer('coarse_binary', width // scale, height // scale, roi)
+        self._threshold_image(img_coarse, coarse_parameters, _crop_image(self._undistortion_cache.get_raw_mask_level(scale), roi), _crop_image(img_blur, roi), _crop_image(img_binary, roi))
+        
+        # Bilder zurückgeben
+        return img_blur, img_binary, roi, scale
+    
+    def _get_output_buffer(self, tag, width, height, roi, channels=1):
+        # Puffer in voller Bildgröße holen, von dem nur der Ausschnitt beschrieben wird
+        buffer = self._buffer_pool.get((height, width) if channels == 1 else (height, width, channels), tag=tag)
+        
+        # Wurde der Puffer zuletzt mit einem anderen Ausschnitt verwendet? -> Rest schwärzen
+        if self._buffer_rois.get(id(buffer)) != roi:
+            buffer.fill(0)
+            self._buffer_rois[id(buffer)] = roi
+        
+        return buffer
     
-    def _process_image(self, img_raw, parameters):
-        # Bild entzerren
-        img_undist = cv.undistort(img_raw, self._camera_matrix, self._distortion_matrix)
+    def _threshold_image(self, img, parameters, img_mask, img_blur, img_binary):
+        # Ohne Streifen -> ganzes Bild auf einmal bearbeiten (jeder Schritt einzeln gemessen)
+        if self._tile_processor is None:
+            self._blur_region(img, parameters, img_blur, self._stage_timer)
+            self._binarize_region(img_blur, parameters, img_mask, img_binary, self._stage_timer)
+            return
+        
+        height, width = img.shape[:2]
+        
+        def process_tile(top, bottom, outer_top, outer_bottom):
+            # Streifen inklusive Rand weichzeichnen und nur den inneren Teil übernehmen
+            tile_blur = self._buffer_pool.get((outer_bottom - outer_top, width), tag='tile_blur')
+            self._blur_region(img[outer_top:outer_bottom], parameters, tile_blur)
+            img_blur[top:bottom] = tile_blur[top - outer_top:bottom - outer_top]
+            
+            # Schwellwert und Maske brauchen keine Nachbarpixel
+            self._binarize_region(img_blur[top:bottom], parameters, img_mask[top:bottom], img_binary[top:bottom])
         
-        # Schwarz-Weiß-Bild erstellen
-        _, _, img_bw = cv.split(cv.cvtColor(img_undist, cv.COLOR_BGR2HSV))
+        # Rand = halbe Kernelgröße -> der Weichzeichner sieht dieselben Nachbarpixel wie im ganzen Bild
+        # (die Streifen laufen parallel -> nur die Gesamtdauer aller Schritte messen)
+        with self._stage_timer.measure('tiles'):
+            self._tile_processor.run(process_tile, height, int(parameters['blur_kernel_size']) // 2)
+    
+    def _blur_region(self, img, parameters, img_blur, stage_timer=None):
+        # Schwarz-Weiß-Bild (V-Kanal des HSV-Bildes = Maximum aus B, G und R) direkt berechnen
+        start = time.perf_counter()
+        img_value = self._buffer_pool.get(img.shape[:2], tag='value')
+        img_channel = self._buffer_pool.get(img.shape[:2], tag='channel')
+        cv.extractChannel(img, 0, dst=img_value)
+        for channel in (1, 2):
+            cv.extractChannel(img, channel, dst=img_channel)
+            cv.max(img_value, img_channel, dst=img_value)
+        color_time = time.perf_counter()
         
         # Bild weichzeichnen, um Rauschen zu unterdrücken
-        img_blur = cv.GaussianBlur(img_bw, (int(parameters['blur_kernel_size']), int(parameters['blur_kernel_size'])), 0)
+        cv.GaussianBlur(img_value, (int(parameters['blur_kernel_size']), int(parameters['blur_kernel_size'])), 0, dst=img_blur)
         
+        # Dauer der Schritte festhalten (nur für ganze Bilder, nicht für Streifen und Fenster)
+        if stage_timer is not None:
+            stage_timer.add('color', color_time - start)
+            stage_timer.add('blur', time.perf_counter() - color_time)
+    
+    def _binarize_region(self, img_blur, parameters, img_mask, img_binary, stage_timer=None):
         # Mit einem Schwellwert ein binäres Bild erstellen
-        ret, img_binary = cv.threshold(img_blur, parameters['threshold_brightness'], 255, cv.THRESH_BINARY)
+        start = time.perf_counter()
+        cv.threshold(img_blur, parameters['threshold_brightness'], 255, cv.THRESH_BINARY, dst=img_binary)
+        threshold_time = time.perf_counter()
         
         # Die Maske anwenden, um Greifer zu verdecken
-        img_binary = cv.bitwise_and(img_binary, self._img_mask)
+        cv.bitwise_and(img_binary, img_mask, dst=img_binary)
         
-        # Bilder zurückgeben
-        return img_undist, img_blur, img_binary
+        # Dauer der Schritte festhalten (nur für ganze Bilder, nicht für Streifen und Fenster)
+        if stage_timer is not None:
+            stage_timer.add('threshold', threshold_time - start)
+            stage_timer.add('mask', time.perf_counter() - threshold_time)
     
-    def _check_if_contour_is_valid(self, contour, parameters):
-        # Flächeninhalt überprüfen
+    def _find_refined_contours(self, frame):
+        parameters = frame['parameters']
+        scale = frame['scale']
+        height, width = frame['img_raw'].shape[:2]
+        
+        # Konturen im verkleinerten Bild suchen
+        coarse_contours = self._detection_engines['contours'].trace_contours(frame['img_binary'], frame['roi'])
+        
+        # Flächen skalieren mit dem Quadrat des Faktors; die Kontur ist nur auf einen Block genau (Toleranz: ein Block um den Umfang)
+        # Die Polygon-Genauigkeit ist relativ zum Umfang und wird erst in voller Auflösung geprüft
+        candidates = []
+        rejected_contours = []
+        for contour in coarse_contours:
+            area = cv.contourArea(contour) * scale ** 2
+            tolerance = cv.arcLength(contour, True) * scale ** 2
+            if parameters['contour_min_area'] - tolerance < area < parameters['contour_max_area'] + tolerance:
+                x, y, w, h = cv.boundingRect(contour)
+                candidates.append((x * scale, y * scale, (x + w) * scale, (y + h) * scale))
+            else:
+                # Blockmittelpunkte in Koordinaten des vollen (verzerrten) Bildes
+                rejected_contours.append(contour.astype(np.float32) * scale + (scale - 1) / 2)
+        
+        # Aussortierte Kandidaten für das Overlay entzerren
+        invalid_contours = self._undistort_contours(rejected_contours, frame['camera_matrix'], frame['distortion_matrix'])
+        
+        # Fenster um die Kandidaten (im Bild-Modus wird im entzerrten Bild verfeinert -> Fenster dorthin übertragen)
+        windows = []
+        margin = int(parameters['blur_kernel_size']) // 2 + 2 * scale
+        for candidate in candidates:
+            window = _expand_rect(candidate, margin, width, height)
+            if parameters['undistortion_mode'] != 'points':
+                window = _expand_rect(self._undistort_rect(window, frame['camera_matrix'], frame['distortion_matrix']), 2, width, height)
+            windows.append(window)
+        
+        # Jeden Kandidaten in einem kleinen Fenster in voller Auflösung nachzeichnen
+        return self._refine_windows(frame, windows), invalid_contours
+    
+    def _find_tracked_contours(self, frame):
+        parameters = frame['parameters']
+        height, width = frame['img_raw'].shape[:2]
+        
+        # Fenster um die verfolgten Objekte (Rand: Weichzeichner und erlaubte Bewegung seit dem letzten Bild)
+        # Die Objekte liegen im entzerrten Bild -> im Punkt-Modus Fenster ins verzerrte Bild übertragen
+        windows = []
+        margin = int(parameters['blur_kernel_size']) // 2 + int(self._tracker.get_max_distance())
+        for box_points in self._tracker.get_boxes():
+            x, y, w, h = cv.boundingRect(box_points)
+            window = _expand_rect((x, y, x + w, y + h), margin, width, height)
+            if parameters['undistortion_mode'] == 'points':
+                window = _expand_rect(self._distort_rect(window, frame['camera_matrix'], frame['distortion_matrix']), 2, width, height)
+            windows.append(window)
+        
+        # Jedes verfolgte Objekt in seinem Fenster nachzeichnen
+        return self._refine_windows(frame, windows)
+    
+    def _refine_windows(self, frame, windows):
+        parameters = frame['parameters']
+        engine = self._detection_engines[parameters['detection_engine']]
+        
+        # Jedes Fenster in voller Auflösung nachzeichnen
+        contours = []
+        centers = []
+        for window in windows:
+            window_contours = self._refine_candidate(frame, window)
+            
+            # Im Punkt-Modus wurde im verzerrten Bild verfeinert -> nur die Konturpunkte entzerren
+            if parameters['undistortion_mode'] == 'points':
+                window_contours = self._undistort_contours(window_contours, frame['camera_matrix'], frame['distortion_matrix'])
+            
+            # Alle passenden Konturen behalten (im verkleinerten Bild verschmelzen benachbarte Objekte zu einem Kandidaten),
+            # passt keine -> die größte (erscheint im Overlay als aussortiert)
+            matching_contours = [contour for contour in window_contours if engine.is_object_contour(contour, parameters)]
+            if len(matching_contours) == 0 and len(window_contours) > 0:
+                matching_contours = [max(window_contours, key=cv.contourArea)]
+            
+            for contour in matching_contours:
+                # Überlappende Fenster finden dasselbe Objekt -> am Mittelpunkt erkennen
+                x, y, w, h = cv.boundingRect(contour)
+                center = (x + w / 2, y + h / 2)
+                if any(abs(center[0] - other[0]) <= 2 and abs(center[1] - other[1]) <= 2 for other in centers):
+                    continue
+                centers.append(center)
+                contours.append(contour)
+        
+        return contours
+    
+    def _refine_candidate(self, frame, window):
+        parameters = frame['parameters']
+        height, width = frame['img_raw'].shape[:2]
+        blur_radius = int(parameters['blur_kernel_size']) // 2
+        
+        # Höchstens einmal vergrößern, falls ein Objekt größer als das Fenster ist
+        for attempt in range(2):
+            # Fenster plus Rand für den Weichzeichner ausschneiden (und ggf. entzerren)
+            outer = _expand_rect(window, blur_radius, width, height)
+            if parameters['undistortion_mode'] == 'points':
+                img = _crop_image(frame['img_raw'], outer)
+                img_mask = _crop_image(self._undistortion_cache.get_raw_mask(), outer)
+            else:
+                map1, map2 = frame['maps']
+                img = cv.remap(frame['img_raw'], _crop_image(map1, outer), _crop_image(map2, outer), cv.INTER_LINEAR)
+                img_mask = _crop_image(self._undistortion_cache.get_mask(), outer)
+            
+            # Kleines Fenster -> Zwischenbilder dürfen neu angelegt werden
+            img_value = cv.max(cv.max(cv.extractChannel(img, 0), cv.extractChannel(img, 1)), cv.extractChannel(img, 2))
+            img_blur = cv.GaussianBlur(img_value, (int(parameters['blur_kernel_size']), int(parameters['blur_kernel_size'])), 0)
+            img_binary = np.empty_like(img_blur)
+            self._binarize_region(img_blur, parameters, img_mask, img_binary)
+            
+            # Nur im inneren Fenster suchen (dort ist der Weichzeichner exakt)
+            inner = (window[0] - outer[0], window[1] - outer[1], window[2] - outer[0], window[3] - outer[1])
+            contours, hierarchy = cv.findContours(_crop_image(img_binary, inner), cv.RETR_EXTERNAL, cv.CHAIN_APPROX_SIMPLE, offset=(window[0], window[1]))
+            
+            # Konturen, die den Fensterrand (und nicht den Bildrand) berühren, sind abgeschnitten
+            rects = [cv.boundingRect(contour) for contour in contours]
+            cut = [(x == window[0] > 0) or (y == window[1] > 0) or (x + w == window[2] < width) or (y + h == window[3] < height) for x, y, w, h in rects]
+            if not any(cut) or attempt == 1:
+                break
+            
+            # Fenster um die größte abgeschnittene Kontur vergrößern
+            x, y, w, h = max((rect for rect, is_cut in zip(rects, cut) if is_cut), key=lambda rect: rect[2] * rect[3])
+            window = _expand_rect(window, max(w, h), width, height)
+        
+        # Abgeschnittene Konturen verwerfen (ein benachbartes Objekt wird in seinem eigenen Fenster gefunden)
+        return [contour for contour, is_cut in zip(contours, cut) if not is_cut]
+    
+    def _undistort_rect(self, rect, camera_matrix, distortion_matrix):
+        # Ecken und Kantenmitten des Rechtecks entzerren und neu umschließen
+        x0, y0, x1, y1 = rect
+        xm, ym = (x0 + x1) / 2, (y0 + y1) / 2
+        points = np.array([[x0, y0], [xm, y0], [x1, y0], [x1, ym], [x1, y1], [xm, y1], [x0, y1], [x0, ym]], dtype=np.float32).reshape(-1, 1, 2)
+        points = cv.undistortPoints(points, camera_matrix, distortion_matrix, P=camera_matrix).reshape(-1, 2)
+        x0, y0 = np.floor(points.min(axis=0)).astype(int)
+        x1, y1 = np.ceil(points.max(axis=0)).astype(int) + 1
+        return (int(x0), int(y0), int(x1), int(y1))
+    
+    def _distort_rect(self, rect, camera_matrix, distortion_matrix):
+        # Ecken und Kantenmitten des Rechtecks verzerren (normieren, dann mit Verzerrung projizieren) und neu umschließen
+        x0, y0, x1, y1 = rect
+        xm, ym = (x0 + x1) / 2, (y0 + y1) / 2
+        points = np.array([[x0, y0], [xm, y0], [x1, y0], [x1, ym], [x1, y1], [xm, y1], [x0, y1], [x0, ym]], dtype=np.float32).reshape(-1, 1, 2)
+        points = cv.convertPointsToHomogeneous(cv.undistortPoints(points, camera_matrix, None))
+        points, jacobian = cv.projectPoints(points, np.zeros(3), np.zeros(3), camera_matrix, distortion_matrix)
+        points = points.reshape(-1, 2)
+        x0, y0 = np.floor(points.min(axis=0)).astype(int)
+        x1, y1 = np.ceil(points.max(axis=0)).astype(int) + 1
+        return (int(x0), int(y0), int(x1), int(y1))
+    
+    def _undistort_contours(self, contours, camera_matrix, distortion_matrix):
+        # Keine Konturen -> nichts zu tun
+        if len(contours) == 0:
+            return []
+        
+        # Alle Konturpunkte in einem Aufruf entzerren
+        points = np.concatenate(contours).astype(np.float32)
+        points = cv.undistortPoints(points, camera_matrix, distortion_matrix, P=camera_matrix)
+        
+        # Punkte wieder auf die einzelnen Konturen aufteilen
+        lengths = [len(contour) for contour in contours]
+        return np.split(points, np.cumsum(lengths)[:-1])
+    
+    def _create_overlay(self, frame):
+        start = time.perf_counter()
+        height, width = frame['img_raw'].shape[:2]
+        
+        # Entzerrtes Bild (nur im Bereich der Maske, der Rest bleibt schwarz) in einen Puffer in voller Bildgröße
+        if frame.get('img_undist') is not None:
+            # Ausschnitt schon entzerrt -> nur kopieren
+            roi = frame['roi']
+            img_overlay = self._get_output_buffer('overlay', width, height, roi, channels=3)
+            np.copyto(_crop_image(img_overlay, roi), frame['img_undist'])
+        else:
+            # Punkt- und Pyramiden-Modus (bzw. nur nachgeführt): Bereich der Maske hier entzerren
+            roi = self._undistortion_cache.get_roi()
+            img_overlay = self._get_output_buffer('overlay', width, height, roi, channels=3)
+            self._undistortion_cache.undistort_into(frame['img_raw'], _crop_image(img_overlay, roi), roi)
+        
+        # Konturen und Objekte einzeichnen
+        self._draw_overlay(img_overlay, frame['invalid_contours'], frame['valid_contours'], frame['found_objects'])
+        self._stage_timer.add('overlay', time.perf_counter() - start)
+        return img_overlay
+    
+    def _draw_overlay(self, img_overlay, invalid_contours, valid_contours, found_objects):
+        # Entzerrte Konturen (Kommazahlen) zum Zeichnen runden
+        invalid_contours = [np.int32(np.round(contour)) if contour.dtype.kind == 'f' else contour for contour in invalid_contours]
+        
+        # Aussortierte Konturen einzeichnen
+        cv.drawContours(img_overlay, invalid_contours, -1, (0, 0, 255), 2)
+        
+        # Gefundene Objekte einzeichnen
+        for object in found_objects:
+            # Bounding Box einzeichnen
+            cv.polylines(img_overlay, [object['box_points']], True, (255, 0, 0), 2)
+            
+            # Koordinatenachsen einzeichnen
+            main_axis_dir = 20 * np.array([math.cos(math.radians(object['alpha'])), -math.sin(math.radians(object['alpha']))])
+            sec_axis_dir = 12 * np.array([math.sin(math.radians(object['alpha'])), math.cos(math.radians(object['alpha']))])
+            cv.line(img_overlay, np.intp(np.array([object['u'], object['v']]) - main_axis_dir), np.intp(np.array([object['u'], object['v']]) + main_axis_dir), (255, 0, 0), 2)
+            cv.line(img_overlay, np.intp(np.array([object['u'], object['v']]) - sec_axis_dir), np.intp(np.array([object['u'], object['v']]) + sec_axis_dir), (255, 0, 0), 2)
+            
+        # Bild zurückgeben
+        return img_overlay
+
+
+############################################################
+# Ergebnis-Container                                       #
+############################################################
+
+# FoundObjects:
+# Gefundene Objekte eines Bildes als ein strukturiertes Array
+# (FOUND_OBJECT_DTYPE) plus Bildinformationen (metadata). Lässt sich
+# ohne ein Python-Objekt pro Objekt zwischen Threads und Prozessen
+# übergeben; einzelne Objekte werden erst beim Zugriff als FoundObject
+# (Zugriff per Schlüssel wie bei einem dict) erstellt.
+class FoundObjects:
+    
+    __slots__ = ('records', 'metadata')
+    
+    def __init__(self, records=None, metadata=None):
+        # Leeres Array, falls keine Objekte übergeben wurden
+        self.records = records if records is not None else np.empty(0, dtype=FOUND_OBJECT_DTYPE)
+        self.metadata = metadata
+    
+    def __len__(self):
+        return len(self.records)
+    
+    def __getitem__(self, index):
+        return FoundObject(self.records, index)
+    
+    def __iter__(self):
+        return (FoundObject(self.records, index) for index in range(len(self.records)))
+
+
+# FoundObject:
+# Sicht auf einen Eintrag von FoundObjects (obj['u'], obj['box_points'], ...).
+class FoundObject:
+    
+    __slots__ = ('_records', 'index')
+    
+    def __init__(self, records, index):
+        self._records = records
+        self.index = index
+    
+    def __getitem__(self, key):
+        return self._records[key][self.index]
+    
+    def keys(self):
+        return self._records.dtype.names
+
+
+############################################################
+# Objekt-Verfolgung                                        #
+############################################################
+
+# ObjectTracker:
+# Ordnet die gefundenen Objekte über mehrere Bilder hinweg einander
+# zu (nächster Mittelpunkt), vergibt stabile IDs und glättet u, v,
+# alpha, w und h. Entscheidet außerdem, wann wieder eine vollständige
+# Erkennung nötig ist (alle N Bilder, bei Bewegung oder verlorenen
+# Objekten); dazwischen werden die Objekte nur lokal nachgeführt.
+class ObjectTracker:
+    
+    def __init__(self, smoothing, max_distance, max_missed, redetection_interval):
+        # Einstellungen abspeichern
+        self._smoothing = smoothing
+        self._max_distance = max_distance
+        self._max_missed = max_missed
+        self._redetection_interval = redetection_interval
+        
+        # Variablen initialisieren (verfolgte Objekte und wie oft sie nacheinander gefehlt haben)
+        self._tracks = np.empty(0, dtype=FOUND_OBJECT_DTYPE)
+        self._missed = np.empty(0, dtype=np.int64)
+        self._next_id = 0
+        self._size = None
+        self._frames_since_detection = 0
+        self._force_detection = True
+        
+        # Vorverarbeitung und Analyse können in verschiedenen Threads laufen
+        self._lock = threading.Lock()
+    
+    def get_max_distance(self):
+        return self._max_distance
+    
+    def get_boxes(self):
+        # Eckpunkte aller verfolgten Objekte (auch der gerade nicht gefundenen)
+        with self._lock:
+            return list(self._tracks['box_points'])
+    
+    def needs_detection(self):
+        # Vollständige Erkennung nötig? (erzwungen, nichts verfolgt oder Intervall abgelaufen)
+        with self._lock:
+            return self._force_detection or len(self._tracks) == 0 or self._frames_since_detection + 1 >= self._redetection_interval
+    
+    def update(self, found_objects, size, full_detection):
+        records = found_objects.records
+        
+        with self._lock:
+            # Neue Auflösung -> Positionen nicht vergleichbar, neu anfangen
+            if size != self._size:
+                self._tracks = np.empty(0, dtype=FOUND_OBJECT_DTYPE)
+                self._missed = np.empty(0, dtype=np.int64)
+                self._size = size
+            
+            # Gefundene Objekte den verfolgten Objekten zuordnen
+            track_indices, object_indices = self._match(records)
+            
+            # Bewegung der zugeordneten Objekte messen
+            movement = np.hypot(records['u'][object_indices] - self._tracks['u'][track_indices], records['v'][object_indices] - self._tracks['v'][track_indices])
+            max_movement = movement.max() if len(movement) > 0 else 0
+            
+            # Zugeordnete Objekte glätten, nicht gefundene eine Weile behalten, dann vergessen
+            tracks = self._tracks.copy()
+            tracks[track_indices] = self._smooth(tracks[track_indices], records[object_indices])
+            missed = self._missed + 1
+            missed[track_indices] = 0
+            lost = len(track_indices) < len(tracks)
+            kept = missed <= self._max_missed
+            
+            # Neue Objekte mit neuer ID aufnehmen
+            new_tracks = np.delete(records, object_indices)
+            new_tracks['id'] = np.arange(self._next_id, self._next_id + len(new_tracks))
+            self._next_id += len(new_tracks)
+            self._tracks = np.concatenate((tracks[kept], new_tracks))
+            self._missed = np.concatenate((missed[kept], np.zeros(len(new_tracks), dtype=np.int64)))
+            
+            # Objekt verloren oder stark bewegt, während nur nachgeführt wurde -> als nächstes wieder vollständig erkennen
+            self._force_detection = not full_detection and (lost or max_movement > self._max_distance / 2)
+            self._frames_since_detection = 0 if full_detection else self._frames_since_detection + 1
+            
+            # Nur die in diesem Bild gefundenen Objekte weitergeben (Kopie, sortiert nach ID)
+            published = self._tracks[self._missed == 0]
+            return FoundObjects(published[np.argsort(published['id'], kind='stable')])
+    
+    def _match(self, records):
+        # Nichts zu vergleichen -> keine Zuordnungen
+        if len(self._tracks) == 0 or len(records) == 0:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+        
+        # Abstände aller Mittelpunkte auf einmal berechnen
+        track_points = np.column_stack((self._tracks['u'], self._tracks['v']))
+        object_points = np.column_stack((records['u'], records['v']))
+        distances = np.linalg.norm(track_points[:, None, :] - object_points[None, :, :], axis=2)
+        
+        # Die kürzesten Abstände zuerst zuordnen (jedes Objekt höchstens einmal)
+        track_indices = []
+        object_indices = []
+        used_tracks = set()
+        used_objects = set()
+        for flat_index in np.argsort(distances, axis=None):
+            track_index, object_index = np.unravel_index(flat_index, distances.shape)
+            if distances[track_index, object_index] > self._max_distance:
+                break
+            if track_index in used_tracks or object_index in used_objects:
+                continue
+            track_indices.append(track_index)
+            object_indices.append(object_index)
+            used_tracks.add(track_index)
+            used_objects.add(object_index)
+        return np.array(track_indices, dtype=np.intp), np.array(object_indices, dtype=np.intp)
+    
+    def _smooth(self, tracks, records):
+        # Gewicht des bisherigen Werts (0: keine Glättung); Fläche wird übernommen, ID bleibt
+        s = self._smoothing
+        smoothed = records.copy()
+        smoothed['id'] = tracks['id']
+        for key in ('u', 'v', 'w', 'h'):
+            smoothed[key] = s * tracks[key] + (1 - s) * records[key]
+        
+        # Winkel wiederholt sich alle 180° -> über den kürzeren Weg glätten, Ergebnis aber in der Nähe des
+        # gefundenen Winkels angeben (der Wertebereich der Erkennung reicht über 180° hinaus, Greifwinkel sonst um 180° gedreht)
+        difference = (records['alpha'] - tracks['alpha'] + 90) % 180 - 90
+        smoothed['alpha'] = records['alpha'] - s * difference
+        
+        # Eckpunkte aus den geglätteten Werten neu berechnen
+        smoothed['box_points'] = _box_points(smoothed['u'], smoothed['v'], smoothed['w'], smoothed['h'], smoothed['alpha'])
+        return smoothed
+
+
+############################################################
+# Erkennungs-Engines                                       #
+############################################################
+
+# ContourDetectionEngine:
+# Sucht die Konturen aller Flecken im Binärbild und prüft sie
+# (Fläche für alle Konturen auf einmal, danach Polygon-Näherung
+# nur für die plausiblen Konturen).
+class ContourDetectionEngine:
+    
+    # Parameter, von denen find_contours abhängt (alle Konturen sind Kandidaten)
+    CONTOUR_PARAMETERS = ()
+    
+    def __init__(self, tile_processor=None):
+        # Streifen-Bearbeiter (optional) abspeichern
+        self._tile_processor = tile_processor
+    
+    def find_contours(self, img_binary, roi, parameters):
+        # Alle Konturen sind Kandidaten, vorab aussortiert wird nichts
+        return self.trace_contours(img_binary, roi), []
+    
+    def trace_contours(self, img_binary, roi):
+        # Nur im Ausschnitt suchen, Konturen aber in Koordinaten des ganzen Bildes angeben
+        img_binary = _crop_image(img_binary, roi)
+        offset = (roi[0], roi[1])
+        
+        # Mit Streifen -> Konturen pro Streifen suchen und an den Nahtstellen zusammenführen
+        if self._tile_processor is not None:
+            contours = self._tile_processor.find_contours(img_binary)
+            if offset == (0, 0):
+                return contours
+            return [contour + np.array(offset, dtype=contour.dtype) for contour in contours]
+        
+        contours, hierarchy = cv.findContours(img_binary, cv.RETR_EXTERNAL, cv.CHAIN_APPROX_SIMPLE, offset=offset)
+        return contours
+    
+    def analyse_contours(self, contours, parameters):
+        # Flächen aller Konturen auf einmal berechnen und offensichtlich unpassende Konturen aussortieren
+        areas, plausible = self._find_contour_features(contours, parameters)
+        
+        # Nur bei den plausiblen Konturen:
+        valid_contours = []
+        invalid_contours = []
+        rows = []
+        for index, contour in enumerate(contours):
+            # Kontur überprüfen (filtern)
+            if plausible[index] and self._check_if_contour_is_valid(contour, parameters):
+                # Kontur der "guten" Liste hinzufügen
+                valid_contours.append(contour)
+                
+                # Gefundenes Objekt und seine Parameter berechnen und an Liste anheften
+                rows.append(self._find_object_parameters_from_contour(contour, areas[index]))
+            else:
+                # Kontur der "schlechten" Liste hinzufügen
+                invalid_contours.append(contour)
+        
+        # Alle Objekte in einem Array zusammenfassen (ID = Reihenfolge, der Tracker vergibt stabile IDs)
+        records = np.array(rows, dtype=FOUND_OBJECT_DTYPE)
+        records['id'] = np.arange(len(records))
+        return valid_contours, invalid_contours, FoundObjects(records)
+    
+    def _find_contour_features(self, contours, parameters):
+        # Keine Konturen -> nichts zu tun
+        if len(contours) == 0:
+            return np.empty(0), np.empty(0, dtype=bool)
+        
+        # Punkte aller Konturen aneinanderhängen (Start-Index jeder Kontur merken)
+        lengths = np.array([len(contour) for contour in contours])
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        points = np.concatenate([contour.reshape(-1, 2) for contour in contours]).astype(np.float64)
+        x, y = points[:, 0], points[:, 1]
+        
+        # Index des jeweils nächsten Punkts (der letzte Punkt einer Kontur schließt an den ersten an)
+        next_index = np.arange(1, len(points) + 1)
+        next_index[starts + lengths - 1] = starts
+        
+        # Flächen aller Konturen mit der Gaußschen Trapezformel (entspricht cv.contourArea)
+        cross = x * y[next_index] - x[next_index] * y
+        areas = np.abs(np.add.reduceat(cross, starts)) / 2
+        
+        # Plausibel sind Konturen, deren Fläche passt und die mindestens 4 Eckpunkte haben können
+        plausible = (areas > parameters['contour_min_area']) & (areas < parameters['contour_max_area']) & (lengths >= 4)
+        return areas, plausible
+    
+    def is_object_contour(self, contour, parameters):
+        # Eine einzelne Kontur wie in analyse_contours prüfen (Fläche, mindestens 4 Punkte, Rechteck)
         area = cv.contourArea(contour)
-        if area <= parameters['contour_min_area'] or area >= parameters['contour_max_area']:
-            # Flächeninhalt zu klein oder zu groß -> aussortieren
-            return False
+        return parameters['contour_min_area'] < area < parameters['contour_max_area'] and len(contour) >= 4 and self._check_if_contour_is_valid(contour, parameters)
+    
+    def _check_if_contour_is_valid(self, contour, parameters):
+        # Flächeninhalt wurde bereits für alle Konturen überprüft (siehe _find_contour_features)
         
         # Polygon approximieren
         epsilon = parameters['polygon_epsilon'] * cv.arcLength(contour, True)
@@ -334,16 +1486,13 @@ class ImageCaptureAndProcessingThread(threading.Thread):
         
         return True
     
-    def _find_object_parameters_from_contour(self, contour):
+    def _find_object_parameters_from_contour(self, contour, area):
         # Kleinstes, umschließendes Rechteck finden
         rect = cv.minAreaRect(contour)
         
         # Parameter aus Box2D-Struktur auslesen
         (center_x, center_y), (width, height), angle = rect
         
-        # Mittelpunkt
-        center_point = np.array([center_x, center_y])
-        
         # Wenn nötig, das Rechteck drehen, dass der Winkel dem Winkel zur langen Seite entspricht
         if height > width:
             angle = angle + 90
@@ -353,39 +1502,693 @@ class ImageCaptureAndProcessingThread(threading.Thread):
         # Eckpunkte des Rechtecks finden
         box_points = np.intp(cv.boxPoints(rect))
         
-        # Fläche der Kontur bestimmen
-        area = cv.contourArea(contour)
+        # Daten als Zeile für FOUND_OBJECT_DTYPE zurückgeben (ID wird später vergeben)
+        return (0, center_x, center_y, angle, width, height, area, box_points)
+
+
+# ComponentsDetectionEngine:
+# Bestimmt Fläche und umschließendes Rechteck aller Flecken mit
+# einem einzigen Aufruf (connectedComponentsWithStats) und zeichnet
+# nur die Konturen der Flecken nach, deren Fläche passen kann.
+# Die Prüfung der Konturen ist dieselbe wie bei den Konturen.
+class ComponentsDetectionEngine(ContourDetectionEngine):
+    
+    # Flecken werden schon beim Suchen nach ihrer Fläche aussortiert
+    CONTOUR_PARAMETERS = ('contour_min_area', 'contour_max_area')
+    
+    def find_contours(self, img_binary, roi, parameters):
+        # Flecken im Ausschnitt beschriften (Label 0 ist der Hintergrund)
+        img_binary = _crop_image(img_binary, roi)
+        count, img_labels, stats, centroids = cv.connectedComponentsWithStats(img_binary, connectivity=8, ltype=cv.CV_32S)
         
-        obj = {
-            'u': center_x,
-            'v': center_y,
-            'alpha': angle,
-            'box_points': box_points,
-            'w': width,
-            'h': height,
-            'A': area
-        }
+        # Die Konturfläche ist kleiner als die Pixelanzahl (die Kontur läuft durch die Mittelpunkte der Randpixel)
+        # -> zu groß nur, wenn die Pixelanzahl auch abzüglich des (großzügig geschätzten) Rands noch zu groß ist
+        pixel_areas = stats[1:, cv.CC_STAT_AREA]
+        border = stats[1:, cv.CC_STAT_WIDTH] + stats[1:, cv.CC_STAT_HEIGHT]
+        plausible = (pixel_areas > parameters['contour_min_area']) & (pixel_areas - 2 * border < parameters['contour_max_area'])
         
-        # Daten zurückgeben
-        return obj
+        # Nur die plausiblen Flecken nachzeichnen (in Koordinaten des ganzen Bildes)
+        contours = []
+        for label in np.flatnonzero(plausible) + 1:
+            x, y, w, h = stats[label, :4]
+            img_blob = np.uint8(img_labels[y:y+h, x:x+w] == label)
+            blob_contours, hierarchy = cv.findContours(img_blob, cv.RETR_EXTERNAL, cv.CHAIN_APPROX_SIMPLE, offset=(int(x) + roi[0], int(y) + roi[1]))
+            contours.append(max(blob_contours, key=len))
+        
+        # Aussortierte Flecken werden nicht nachgezeichnet (erscheinen also nicht im Overlay)
+        return contours, []
+
+
+############################################################
+# Entzerrungs-Cache                                        #
+############################################################
+
+# UndistortionCache:
+# Berechnet die Entzerrungs-Karten (Fixpunkt-Format) einmalig pro
+# Kombination aus Intrinsics und Auflösung und wendet sie per
+# remap in einen vorab angelegten Puffer an. Die Maske liegt in
+# der Geometrie des entzerrten Bildes vor und wird ebenfalls
+# einmalig auf die Auflösung angepasst. Statt der Masken-Datei
+# können auch Rechtecke (relativ zur Bildgröße) angegeben werden.
+# Das umschließende Rechteck der Maske gibt den Ausschnitt vor,
+# der überhaupt bearbeitet werden muss.
+class UndistortionCache:
     
-    def _create_overlay(self, img_undist, invalid_contours, valid_contours, found_objects):
-        # Overlay-Bild erstellen
-        img_overlay = img_undist.copy()
+    def __init__(self, mask_path, mask_rois=None, buffer_count=1, tile_processor=None):
+        # Anzahl der abwechselnd genutzten Ausgabepuffer und Streifen-Bearbeiter abspeichern
+        self._buffer_count = buffer_count
+        self._tile_processor = tile_processor
         
-        # Aussortierte Konturen einzeichnen
-        cv.drawContours(img_overlay, invalid_contours, -1, (0, 0, 255), 2)
+        # Rechtecke statt Masken-Datei? -> Maske wird pro Auflösung gezeichnet
+        self._mask_rois = mask_rois
+        if mask_rois:
+            self._img_mask_source = None
+        else:
+            # Maske einmalig laden und binarisieren
+            ret, self._img_mask_source = cv.threshold(cv.imread(mask_path, cv.IMREAD_GRAYSCALE), 127, 255, cv.THRESH_BINARY)
         
-        # Gefundene Objekte einzeichnen
-        for i, object in enumerate(found_objects):
-            # Bounding Box einzeichnen
-            cv.polylines(img_overlay, [object['box_points']], True, (255, 0, 0), 2)
+        # Variablen initialisieren
+        self._key = None
+        self._width = 0
+        self._height = 0
+        self._mask_rect = None
+        self._mask_raw_rect = None
+        self._map1 = None
+        self._map2 = None
+        self._img_mask = None
+        self._img_mask_raw = None
+        self._img_mask_raw_levels = {}
+        self._img_undist_buffers = []
+        self._buffer_index = 0
+        self._camera_matrix = None
+        self._distortion_matrix = None
+    
+    def prepare(self, camera_matrix, distortion_matrix, width, height):
+        # Schlüssel aus Intrinsics und Auflösung bilden
+        key = (camera_matrix.tobytes(), distortion_matrix.tobytes(), width, height)
+        
+        # Cache noch gültig? -> Nichts zu tun
+        if key == self._key:
+            return False
+        
+        # Entzerrungs-Karten im schnellen Fixpunkt-Format berechnen
+        self._map1, self._map2 = cv.initUndistortRectifyMap(camera_matrix, distortion_matrix, None, camera_matrix, (width, height), cv.CV_16SC2)
+        
+        # Ausgabepuffer für das entzerrte Bild anlegen
+        self._img_undist_buffers = [np.empty((height, width, 3), dtype=np.uint8) for _ in range(self._buffer_count)]
+        
+        # Maske an die Geometrie des entzerrten Bildes anpassen
+        if self._mask_rois:
+            self._img_mask = np.zeros((height, width), dtype=np.uint8)
+            for x, y, w, h in self._mask_rois:
+                cv.rectangle(self._img_mask, (round(x * width), round(y * height)), (round((x + w) * width) - 1, round((y + h) * height) - 1), 255, cv.FILLED)
+        elif self._img_mask_source.shape == (height, width):
+            self._img_mask = self._img_mask_source
+        else:
+            self._img_mask = cv.resize(self._img_mask_source, (width, height), interpolation=cv.INTER_NEAREST)
+        
+        # Umschließendes Rechteck der Maske bestimmen
+        self._width = width
+        self._height = height
+        self._mask_rect = self._find_mask_rect(self._img_mask)
+        
+        # Maske für die verzerrte Geometrie (und deren Pyramidenstufen) wird erst bei Bedarf berechnet
+        self._img_mask_raw = None
+        self._img_mask_raw_levels = {}
+        self._mask_raw_rect = None
+        
+        # Schlüssel und Intrinsics abspeichern
+        self._key = key
+        self._camera_matrix = camera_matrix
+        self._distortion_matrix = distortion_matrix
+        return True
+    
+    def undistort(self, img_raw, camera_matrix, distortion_matrix, roi=None):
+        # Cache ggf. (neu) aufbauen
+        height, width = img_raw.shape[:2]
+        self.prepare(camera_matrix, distortion_matrix, width, height)
+        
+        # Ohne Ausschnitt -> ganzes Bild entzerren
+        if roi is None:
+            roi = (0, 0, width, height)
+        
+        # Nächsten Puffer auswählen (im Pipeline-Modus werden ältere Bilder evtl. noch verwendet)
+        self._buffer_index = (self._buffer_index + 1) % self._buffer_count
+        img_undist = _crop_image(self._img_undist_buffers[self._buffer_index], roi)
+        
+        # Bild in den Puffer entzerren
+        return self.undistort_into(img_raw, img_undist, roi)
+    
+    def undistort_into(self, img_raw, img_undist, roi):
+        # Ausschnitt der Karten liefert genau den gleichen Ausschnitt des entzerrten Bildes (img_undist hat die Größe des Ausschnitts)
+        map1 = _crop_image(self._map1, roi)
+        map2 = _crop_image(self._map2, roi)
+        
+        # Bild mit den vorberechneten Karten in den Puffer entzerren
+        if self._tile_processor is None:
+            cv.remap(img_raw, map1, map2, cv.INTER_LINEAR, dst=img_undist)
+        else:
+            # Jeder Streifen der Karten liefert genau den gleichen Streifen des entzerrten Bildes
+            def remap_tile(top, bottom, outer_top, outer_bottom):
+                cv.remap(img_raw, map1[top:bottom], map2[top:bottom], cv.INTER_LINEAR, dst=img_undist[top:bottom])
             
-            # Koordinatenachsen einzeichnen
-            main_axis_dir = 20 * np.array([math.cos(math.radians(object['alpha'])), -math.sin(math.radians(object['alpha']))])
-            sec_axis_dir = 12 * np.array([math.sin(math.radians(object['alpha'])), math.cos(math.radians(object['alpha']))])
-            cv.line(img_overlay, np.intp(np.array([object['u'], object['v']]) - main_axis_dir), np.intp(np.array([object['u'], object['v']]) + main_axis_dir), (255, 0, 0), 2)
-            cv.line(img_overlay, np.intp(np.array([object['u'], object['v']]) - sec_axis_dir), np.intp(np.array([object['u'], object['v']]) + sec_axis_dir), (255, 0, 0), 2)
+            self._tile_processor.run(remap_tile, img_undist.shape[0])
+        
+        return img_undist
+    
+    def get_mask(self):
+        return self._img_mask
+    
+    def get_raw_mask(self):
+        # Maske in die Geometrie des verzerrten Kamerabildes übertragen (nur einmal pro Schlüssel)
+        if self._img_mask_raw is None:
+            height, width = self._img_mask.shape
             
-        # Bild zurückgeben
-        return img_overlay
\ No newline at end of file
+            # Zu jedem verzerrten Pixel die entzerrte Position berechnen
+            xs, ys = np.meshgrid(np.arange(width, dtype=np.float32), np.arange(height, dtype=np.float32))
+            points = np.stack((xs, ys), axis=-1).reshape(-1, 1, 2)
+            points = cv.undistortPoints(points, self._camera_matrix, self._distortion_matrix, P=self._camera_matrix).reshape(height, width, 2)
+            
+            # Maske an diesen Positionen abtasten
+            self._img_mask_raw = cv.remap(self._img_mask, points[..., 0], points[..., 1], cv.INTER_NEAREST, borderMode=cv.BORDER_CONSTANT, borderValue=0)
+            self._mask_raw_rect = self._find_mask_rect(self._img_mask_raw)
+        
+        return self._img_mask_raw
+    
+    def get_raw_mask_level(self, scale):
+        # Maske der verzerrten Geometrie um den Faktor verkleinern (nur einmal pro Schlüssel und Faktor)
+        if scale not in self._img_mask_raw_levels:
+            height, width = self.get_raw_mask().shape
+            self._img_mask_raw_levels[scale] = cv.resize(self._img_mask_raw, (width // scale, height // scale), interpolation=cv.INTER_NEAREST)
+        
+        return self._img_mask_raw_levels[scale]
+    
+    def get_roi(self, margin=0):
+        # Umschließendes Rechteck der Maske plus Rand (x0, y0, x1, y1)
+        return self._expand_rect(self._mask_rect, margin)
+    
+    def get_raw_roi(self, margin=0):
+        # Wie get_roi, aber für die Maske in der verzerrten Geometrie
+        self.get_raw_mask()
+        return self._expand_rect(self._mask_raw_rect, margin)
+    
+    def get_maps(self):
+        return self._map1, self._map2
+    
+    def _find_mask_rect(self, img_mask):
+        # Leere Maske -> ganzes Bild (es wird ohnehin nichts gefunden)
+        x, y, w, h = cv.boundingRect(img_mask)
+        if w == 0 or h == 0:
+            return (0, 0, self._width, self._height)
+        return (x, y, x + w, y + h)
+    
+    def _expand_rect(self, rect, margin):
+        # Rechteck um den Rand vergrößern und auf das Bild begrenzen
+        return _expand_rect(rect, margin, self._width, self._height)
+
+
+
+############################################################
+# Streifen-Bearbeiter                                      #
+############################################################
+
+# TileProcessor:
+# Teilt ein Bild in horizontale Streifen, die auf einem Thread-Pool
+# parallel bearbeitet werden (OpenCV gibt dabei den GIL frei).
+# Jeder Streifen kann einen Rand der Nachbarstreifen mitbekommen,
+# damit z.B. der Weichzeichner exakt dasselbe Ergebnis liefert.
+# Konturen, die über eine Nahtstelle gehen, werden wieder zu
+# ganzen Konturen zusammengeführt.
+class TileProcessor:
+    
+    def __init__(self, tile_count):
+        # Anzahl der Streifen abspeichern und Thread-Pool (ein Thread pro Streifen) erstellen
+        self._tile_count = tile_count
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=tile_count, thread_name_prefix="Tile")
+        
+        # Hilfsbild zum Zusammenführen der Stücke (in Bildgröße, pro Gruppe wird nur ein Ausschnitt verwendet)
+        self._img_group_buffer = None
+    
+    def get_tiles(self, height, margin=0):
+        # Streifengrenzen (oben, unten) und die um den Rand erweiterten Grenzen berechnen
+        bounds = [round(i * height / self._tile_count) for i in range(self._tile_count + 1)]
+        return [(top, bottom, max(top - margin, 0), min(bottom + margin, height)) for top, bottom in zip(bounds[:-1], bounds[1:])]
+    
+    def run(self, tile_function, height, margin=0):
+        # Funktion für jeden Streifen parallel aufrufen und auf alle Ergebnisse warten
+        futures = [self._pool.submit(tile_function, *tile) for tile in self.get_tiles(height, margin)]
+        return [future.result() for future in futures]
+    
+    def find_contours(self, img_binary):
+        height, width = img_binary.shape
+        tiles = self.get_tiles(height)
+        
+        # Äußere Konturen in jedem Streifen suchen (in Koordinaten des ganzen Bildes)
+        def find_tile_contours(top, bottom, outer_top, outer_bottom):
+            contours, hierarchy = cv.findContours(img_binary[top:bottom], cv.RETR_EXTERNAL, cv.CHAIN_APPROX_SIMPLE, offset=(0, top))
+            return contours
+        
+        tile_contours = self.run(find_tile_contours, height)
+        
+        # Konturen aufteilen: komplett im Streifen oder an einer Nahtstelle abgeschnitten
+        contours = []
+        pieces = []
+        for tile_index, ((top, bottom, _, _), contours_in_tile) in enumerate(zip(tiles, tile_contours)):
+            for contour in contours_in_tile:
+                x, y, w, h = cv.boundingRect(contour)
+                at_top_seam = (y == top and top > 0)
+                at_bottom_seam = (y + h == bottom and bottom < height)
+                if at_top_seam or at_bottom_seam:
+                    pieces.append((tile_index, (x, y, w, h), at_top_seam, at_bottom_seam, contour))
+                else:
+                    contours.append(contour)
+        
+        # Keine Stücke -> nichts zusammenzuführen
+        if len(pieces) == 0:
+            return contours
+        
+        # Hilfsbild nur bei einer neuen Auflösung anlegen
+        if self._img_group_buffer is None or self._img_group_buffer.shape != img_binary.shape:
+            self._img_group_buffer = np.zeros(img_binary.shape, dtype=np.uint8)
+        
+        # Stücke gruppieren, die sich über eine Nahtstelle berühren könnten (x-Bereiche inkl. Diagonale überlappen)
+        groups = list(range(len(pieces)))
+        def find_group(i):
+            while groups[i] != i:
+                groups[i] = groups[groups[i]]
+                i = groups[i]
+            return i
+        
+        for i, (tile_i, (x_i, _, w_i, _), _, at_bottom_i, _) in enumerate(pieces):
+            if not at_bottom_i:
+                continue
+            for j, (tile_j, (x_j, _, w_j, _), at_top_j, _, _) in enumerate(pieces):
+                if tile_j == tile_i + 1 and at_top_j and x_i <= x_j + w_j and x_j <= x_i + w_i:
+                    groups[find_group(i)] = find_group(j)
+        
+        grouped_pieces = {}
+        for i, piece in enumerate(pieces):
+            grouped_pieces.setdefault(find_group(i), []).append(piece)
+        
+        # Jede Gruppe in ihrem Begrenzungsrechteck neu nachzeichnen
+        merged_contours = []
+        for group in grouped_pieces.values():
+            x0 = min(rect[0] for _, rect, _, _, _ in group)
+            y0 = min(rect[1] for _, rect, _, _, _ in group)
+            x1 = max(rect[0] + rect[2] for _, rect, _, _, _ in group)
+            y1 = max(rect[1] + rect[3] for _, rect, _, _, _ in group)
+            
+            # Nur die Pixel der Stücke übernehmen (andere Objekte im Rechteck ausblenden)
+            img_group = self._img_group_buffer[:y1 - y0, :x1 - x0]
+            img_group.fill(0)
+            cv.drawContours(img_group, [contour for _, _, _, _, contour in group], -1, 255, cv.FILLED, offset=(-x0, -y0))
+            cv.bitwise_and(img_group, img_binary[y0:y1, x0:x1], dst=img_group)
+            
+            group_contours, hierarchy = cv.findContours(img_group, cv.RETR_EXTERNAL, cv.CHAIN_APPROX_SIMPLE, offset=(x0, y0))
+            merged_contours.extend(group_contours)
+        
+        # Konturen verwerfen, die im ganzen Bild innerhalb einer zusammengeführten Kontur liegen
+        # (im Streifen war das umschließende Loch offen, im ganzen Bild ist es geschlossen)
+        merged_rects = [cv.boundingRect(contour) for contour in merged_contours]
+        def is_enclosed(contour):
+            x, y, w, h = cv.boundingRect(contour)
+            point = (float(contour[0][0][0]), float(contour[0][0][1]))
+            for merged_contour, (mx, my, mw, mh) in zip(merged_contours, merged_rects):
+                if merged_contour is contour:
+                    continue
+                if mx <= x and my <= y and x + w <= mx + mw and y + h <= my + mh and cv.pointPolygonTest(merged_contour, point, False) > 0:
+                    return True
+            return False
+        
+        return [contour for contour in contours + merged_contours if not is_enclosed(contour)]
+    
+    def shutdown(self):
+        # Thread-Pool beenden
+        self._pool.shutdown(wait=False)
+
+
+
+############################################################
+# Pipeline-Stufen-Thread                                   #
+############################################################
+
+# PipelineStageThread:
+# Holt das jeweils neueste Bild aus dem Eingangs-Postfach,
+# führt die Stufen-Funktion aus und gibt das Ergebnis weiter.
+# Die Wartezeit jedes Bildes im Eingangs-Postfach wird gemessen.
+class PipelineStageThread(threading.Thread):
+    
+    def __init__(self, name, stage_function, input_mailbox, output_function, stop_event, stage_timer):
+        # Variablen abspeichern
+        self._stage_function = stage_function
+        self._input_mailbox = input_mailbox
+        self._output_function = output_function
+        self._stop_event = stop_event
+        self._stage_timer = stage_timer
+        self._wait_stage = f"wait_{name.lower()}"
+        
+        # Thread initialisieren
+        super().__init__(daemon=True, name=f"PipelineStage{name}")
+    
+    def run(self):
+        # Wiederholen, solange das stop-Event nicht gesetzt wurde
+        while not self._stop_event.is_set():
+            # Auf ein neues Bild warten (mit Timeout, um das stop-Event prüfen zu können)
+            available, frame = self._input_mailbox.get(timeout=0.1)
+            if not available:
+                continue
+            
+            # Wartezeit im Postfach festhalten
+            self._stage_timer.add(self._wait_stage, time.perf_counter() - frame['queued_time'])
+            
+            # Stufe ausführen und Ergebnis weitergeben
+            frame = self._stage_function(frame)
+            frame['queued_time'] = time.perf_counter()
+            self._output_function(frame)
+
+
+
+############################################################
+# Bildauslese- und Bildbearbeitungs-Prozess                #
+############################################################
+
+# ImageCaptureAndProcessingProcess:
+# Lässt den Bildauslese- und Bildbearbeitungs-Thread in einem
+# eigenen Prozess laufen, damit die Python-Anteile der Bilderkennung
+# nicht mit der GUI um den GIL konkurrieren. Die Bilder werden über
+# einen Ringpuffer im gemeinsamen Speicher übergeben, nur die
+# gefundenen Objekte werden gepickelt. Die Schnittstelle entspricht
+# der von ImageCaptureAndProcessingThread.
+class ImageCaptureAndProcessingProcess:
+    
+    # Anzahl der Slots: einer wird gelesen, einer beschrieben, der Rest wartet
+    SLOT_COUNT = 4
+    
+    def __init__(self, camera_settings, camera_matrix, distortion_matrix, calibration_size, cv_parameters, detection_settings):
+        # Ringpuffer anlegen (Rohbild + Overlay in Farbe, Weichzeichnung + Binärbild in Graustufen)
+        slot_size = camera_settings['width'] * camera_settings['height'] * (3 + 1 + 1 + 3)
+        self._ring = SharedImageRing(self.SLOT_COUNT, slot_size)
+        
+        # Variablen initialisieren
+        self._held_slot = None
+        self._dropped_frames = {}
+        self._skipped_frames = 0
+        self._buffer_stats = {}
+        self._metrics = {'captured_frames': 0, 'processed_frames': 0, 'skipped_frames': 0, 'dropped_frames': {}, 'stages': {}}
+        self._parent_dropped = 0
+        self._result_callback = None
+        self._notify_thread = None
+        
+        # Prozess-Sicherheitsobjekte initialisieren
+        self._stop_event = multiprocessing.Event()
+        self._status = multiprocessing.Value('i', Status.UNKNOWN.value)
+        self._parameters_queue = multiprocessing.Queue()
+        self._intrinsics_queue = multiprocessing.Queue()
+        self._subscriptions_queue = multiprocessing.Queue()
+        self._resolution_queue = multiprocessing.Queue()
+        self._freeze_frame_queue = multiprocessing.Queue()
+        self._results_queue = multiprocessing.Queue()
+        self._free_slots_queue = multiprocessing.Queue()
+        self._result_event = multiprocessing.Event()
+        
+        # Prozess erstellen
+        self._process = multiprocessing.Process(target=_run_image_process, daemon=True, name="ImageCaptureAndProcessingProcess",
+                                                args=(camera_settings, camera_matrix, distortion_matrix, calibration_size, cv_parameters, detection_settings,
+                                                      self._ring.get_names(), self._stop_event, self._status,
+                                                      self._parameters_queue, self._intrinsics_queue, self._subscriptions_queue, self._resolution_queue, self._freeze_frame_queue, self._results_queue, self._free_slots_queue, self._result_event))
+    
+    def start(self):
+        # Prozess starten
+        self._process.start()
+    
+    def get_status(self):
+        # Abgestürzter Prozess -> Fehler
+        if self._process.exitcode is not None:
+            return Status.ERROR
+        return Status(self._status.value)
+    
+    def get_result(self):
+        # Nur die neueste Nachricht mit Ergebnis behalten, ältere Slots sofort zurückgeben
+        message = None
+        while True:
+            try:
+                newest_message = self._results_queue.get_nowait()
+            except queue.Empty:
+                break
+            
+            # Zähler und Messwerte bringt jede Nachricht mit
+            slot, layout, images, found_objects, dropped_frames, skipped_frames, buffer_stats, metrics = newest_message
+            self._dropped_frames = dropped_frames
+            self._skipped_frames = skipped_frames
+            self._buffer_stats = buffer_stats
+            if metrics is not None:
+                self._metrics = metrics
+            
+            # Nur Messwerte (kein neues Ergebnis, z.B. bei unveränderten Bildern)
+            if found_objects is None:
+                continue
+            
+            if message is not None:
+                self._release_slot(message[0])
+                self._parent_dropped += 1
+            message = newest_message
+        
+        # Kein neues Ergebnis
+        if message is None:
+            return False, None
+        
+        # Nachricht aufspalten
+        slot, layout, images, found_objects = message[:4]
+        
+        # Bilder aus dem gemeinsamen Speicher holen (falls sie nicht gepickelt wurden)
+        if slot is not None:
+            images = self._ring.read(slot, layout)
+        
+        # Den bisher gelesenen Slot freigeben und den neuen festhalten
+        self._release_slot(self._held_slot)
+        self._held_slot = slot
+        
+        return True, (tuple(images), found_objects)
+    
+    def get_dropped_frames(self):
+        return self._dropped_frames | {'process': self._parent_dropped}
+    
+    def get_skipped_frames(self):
+        return self._skipped_frames
+    
+    def get_buffer_stats(self):
+        return self._buffer_stats
+    
+    def get_metrics(self):
+        # Messwerte der letzten Nachricht, die welche mitgebracht hat (Verworfene inklusive dieses Prozesses)
+        return self._metrics | {'dropped_frames': self.get_dropped_frames()}
+    
+    def set_cv_parameters(self, parameters):
+        self._parameters_queue.put(parameters)
+    
+    def set_camera_intrinsics(self, camera_matrix, distortion_matrix, calibration_size):
+        self._intrinsics_queue.put((camera_matrix, distortion_matrix, calibration_size))
+    
+    def set_capture_resolution(self, width, height):
+        self._resolution_queue.put((width, height))
+    
+    def set_freeze_frame(self, enabled):
+        self._freeze_frame_queue.put(enabled)
+    
+    def set_result_callback(self, func):
+        # Ein Thread in diesem Prozess wartet auf das Ergebnis-Event des Bildbearbeitungs-Prozesses und ruft func auf
+        self._result_callback = func
+        if self._notify_thread is None:
+            self._notify_thread = threading.Thread(target=self._run_notify_thread, daemon=True, name="ImageCaptureAndProcessingNotify")
+            self._notify_thread.start()
+    
+    def set_image_subscriptions(self, products):
+        self._subscriptions_queue.put(frozenset(products))
+    
+    def stop(self):
+        # Stop-Event setzen -> Prozess wird beim nächsten Loop aufhören
+        self._stop_event.set()
+        
+        # Gemeinsamen Speicher zum Löschen freigeben
+        self._ring.unlink()
+    
+    def _run_notify_thread(self):
+        # Wiederholen, solange das stop-Event nicht gesetzt wurde (mit Timeout, um es prüfen zu können)
+        while not self._stop_event.is_set():
+            if self._result_event.wait(timeout=0.1):
+                # Vor dem Aufruf zurücksetzen -> ein währenddessen gesendetes Ergebnis löst erneut aus
+                self._result_event.clear()
+                self._result_callback()
+    
+    def _release_slot(self, slot):
+        # Slot an den Bildbearbeitungs-Prozess zurückgeben
+        if slot is not None:
+            self._free_slots_queue.put(slot)
+
+
+def _run_image_process(camera_settings, camera_matrix, distortion_matrix, calibration_size, cv_parameters, detection_settings,
+                       ring_names, stop_event, status, parameters_queue, intrinsics_queue, subscriptions_queue, resolution_queue, freeze_frame_queue, results_queue, free_slots_queue, result_event):
+    # Mit dem Ringpuffer verbinden
+    ring = SharedImageRing(names=ring_names)
+    free_slots = list(range(ring.get_slot_count()))
+    dropped = 0
+    metrics_time = 0
+    
+    # Bildauslese- und Bildbearbeitungs-Thread in diesem Prozess starten
+    image_thread = ImageCaptureAndProcessingThread(camera_settings, camera_matrix, distortion_matrix, calibration_size, cv_parameters, detection_settings)
+    image_thread.start()
+    
+    # Wiederholen, solange das stop-Event nicht gesetzt wurde
+    while not stop_event.is_set():
+        # Neue Parameter, Intrinsics, angeforderte Bilder, Auflösung, Standbild-Modus und freigegebene Slots übernehmen
+        for parameters in _drain_queue(parameters_queue)[-1:]:
+            image_thread.set_cv_parameters(parameters)
+        for camera_matrix, distortion_matrix, calibration_size in _drain_queue(intrinsics_queue)[-1:]:
+            image_thread.set_camera_intrinsics(camera_matrix, distortion_matrix, calibration_size)
+        for products in _drain_queue(subscriptions_queue)[-1:]:
+            image_thread.set_image_subscriptions(products)
+        for width, height in _drain_queue(resolution_queue)[-1:]:
+            image_thread.set_capture_resolution(width, height)
+        for enabled in _drain_queue(freeze_frame_queue)[-1:]:
+            image_thread.set_freeze_frame(enabled)
+        free_slots.extend(_drain_queue(free_slots_queue))
+        
+        # Status weitergeben
+        status.value = image_thread.get_status().value
+        
+        # Auf ein neues Ergebnis warten (mit Timeout, um das stop-Event prüfen zu können)
+        available, result = image_thread.get_result(timeout=0.1)
+        if not available:
+            # Thread beendet (z.B. Kamerafehler) -> Prozess beenden
+            if not image_thread.is_alive():
+                break
+            
+            # Ohne Ergebnisse (z.B. unveränderte Bilder) trotzdem Zähler und Messwerte senden (höchstens zweimal pro Sekunde)
+            if time.perf_counter() - metrics_time >= 0.5:
+                metrics = image_thread.get_metrics()
+                metrics_time = time.perf_counter()
+                results_queue.put((None, None, None, None, image_thread.get_dropped_frames() | {'shared_memory': dropped}, image_thread.get_skipped_frames(), image_thread.get_buffer_stats(), metrics))
+            continue
+        
+        # Ergebnis aufspalten
+        images, found_objects = result
+        
+        # Kein freier Slot (GUI kommt nicht hinterher) -> Bild verwerfen
+        if len(free_slots) == 0:
+            dropped += 1
+            continue
+        
+        # Bilder in den gemeinsamen Speicher schreiben (passt es nicht, werden sie gepickelt)
+        slot = free_slots.pop(0)
+        layout = ring.write(slot, images)
+        if layout is None:
+            free_slots.append(slot)
+            slot = None
+        else:
+            images = None
+        
+        # Messwerte höchstens zweimal pro Sekunde mitsenden (Perzentile zu berechnen kostet etwas Zeit)
+        metrics = None
+        if time.perf_counter() - metrics_time >= 0.5:
+            metrics = image_thread.get_metrics()
+            metrics_time = time.perf_counter()
+        
+        # Nachricht an den GUI-Prozess senden
+        results_queue.put((slot, layout, images, found_objects, image_thread.get_dropped_frames() | {'shared_memory': dropped}, image_thread.get_skipped_frames(), image_thread.get_buffer_stats(), metrics))
+        result_event.set()
+    
+    # Thread anhalten
+    image_thread.stop()
+    image_thread.join()
+    status.value = Status.ERROR.value
+
+
+def _drain_queue(q):
+    # Alle aktuell vorhandenen Einträge aus der Queue holen
+    items = []
+    while True:
+        try:
+            items.append(q.get_nowait())
+        except queue.Empty:
+            return items
+
+
+############################################################
+# Ausschnitt- und Auflösungs-Hilfsfunktionen               #
+############################################################
+
+def _crop_image(img, roi):
+    # Ausschnitt (x0, y0, x1, y1) als Sicht auf das Bild (keine Kopie)
+    x0, y0, x1, y1 = roi
+    return img[y0:y1, x0:x1]
+
+
+def create_hit_map(found_objects, width, height, hit_map=None):
+    # Verkleinerte Karte: jeder Eintrag enthält den Index des dort liegenden Objekts plus 1 (0: kein Objekt)
+    # (ein übergebener Puffer wird wiederverwendet)
+    if hit_map is None:
+        hit_map = np.zeros(_hit_map_shape(width, height), dtype=np.uint16)
+    else:
+        hit_map.fill(0)
+    
+    # Rückwärts einzeichnen, damit bei Überlappung (wie beim Durchsuchen der Liste) das erste Objekt gewinnt
+    # Die Eckpunkte werden über die Nachkommabits von fillPoly direkt verkleinert
+    for index in reversed(range(len(found_objects))):
+        box_points = found_objects[index]['box_points'].reshape(-1, 1, 2)
+        cv.fillPoly(hit_map, [box_points], index + 1, shift=HIT_MAP_SHIFT)
+    
+    return hit_map
+
+
+def _hit_map_shape(width, height):
+    # Größe der Trefferkarte (aufgerundet, damit jeder Pixel einen Eintrag hat)
+    return (-(-height // HIT_MAP_SCALE), -(-width // HIT_MAP_SCALE))
+
+
+def _box_points(u, v, w, h, alpha):
+    # Eckpunkte gedrehter Rechtecke (wie cv.boxPoints, aber für viele Rechtecke auf einmal; alpha = 180 - Winkel des Rechtecks)
+    angle = np.radians(180 - alpha)
+    a, b = np.sin(angle) * 0.5, np.cos(angle) * 0.5
+    p0 = np.stack((u - a * h - b * w, v + b * h - a * w), axis=-1)
+    p1 = np.stack((u + a * h - b * w, v - b * h - a * w), axis=-1)
+    p2 = np.stack((2 * u, 2 * v), axis=-1) - p0
+    p3 = np.stack((2 * u, 2 * v), axis=-1) - p1
+    return np.stack((p0, p1, p2, p3), axis=-2).astype(np.int32)
+
+
+def scale_camera_matrix(camera_matrix, calibration_size, width, height):
+    # Kalibrier-Auflösung -> nichts zu tun
+    scale_x = width / calibration_size[0]
+    scale_y = height / calibration_size[1]
+    if scale_x == 1 and scale_y == 1:
+        return camera_matrix
+    
+    # Brennweiten skalieren, Hauptpunkt bezogen auf Pixelmitten skalieren (Verzerrung bleibt gleich)
+    camera_matrix = camera_matrix.copy()
+    camera_matrix[0, 0] *= scale_x
+    camera_matrix[1, 1] *= scale_y
+    camera_matrix[0, 2] = (camera_matrix[0, 2] + 0.5) * scale_x - 0.5
+    camera_matrix[1, 2] = (camera_matrix[1, 2] + 0.5) * scale_y - 0.5
+    return camera_matrix
+
+
+def scale_cv_parameters(parameters, calibration_size, width, height):
+    # Kalibrier-Auflösung -> nichts zu tun
+    scale_x = width / calibration_size[0]
+    scale_y = height / calibration_size[1]
+    if scale_x == 1 and scale_y == 1:
+        return parameters
+    
+    # Flächen skalieren mit beiden Faktoren, die Kernelgröße (ungerade) mit dem mittleren Faktor
+    blur_kernel_size = max(int(round(parameters['blur_kernel_size'] * (scale_x + scale_y) / 2)) // 2 * 2 + 1, 1)
+    return parameters | {
+        'blur_kernel_size': blur_kernel_size,
+        'contour_min_area': parameters['contour_min_area'] * scale_x * scale_y,
+        'contour_max_area': parameters['contour_max_area'] * scale_x * scale_y
+    }
+
+
+def _expand_rect(rect, margin, width, height):
+    # Rechteck (x0, y0, x1, y1) um den Rand vergrößern und auf das Bild begrenzen
+    x0, y0, x1, y1 = rect
+    return (max(x0 - margin, 0), max(y0 - margin, 0), min(x1 + margin, width), min(y1 + margin, height))
@@ -12,6 +12,9 @@ import socket
 # Multithreading
 import threading
 import queue
+# Zeitstempel der Statuswechsel und Verlauf der Greifvorgänge
+import time
+import collections
 # Modul-Status-Enum
 from utils import Status, RobotStatus
 
@@ -23,6 +26,22 @@ HEADER_MSG_TYPE_SIZE = 3
 HEADER_MSG_LENGTH_SIZE = 2
 STATUS_MSG_SIZE = 1
 
+# Abschnitte eines Greifvorgangs: Name -> (Zeitpunkt von, Zeitpunkt bis)
+# (Zeitpunkte des Bildes, des Befehls und der Statuswechsel, alle mit time.perf_counter gemessen)
+PICK_LATENCY_SEGMENTS = {
+    'detection': ('capture_time', 'publish_time'),
+    'delivery': ('publish_time', 'receive_time'),
+    'selection': ('receive_time', 'click_time'),
+    'command': ('click_time', 'sent_time'),
+    'response': ('sent_time', 'GRABBING'),
+    'grabbing': ('GRABBING', 'MOVING_PLACE'),
+    'moving_place': ('MOVING_PLACE', 'PLACING'),
+    'placing': ('PLACING', 'MOVING_CAMERA'),
+    'moving_camera': ('MOVING_CAMERA', 'WAITING'),
+    'frame_age': ('capture_time', 'click_time'),
+    'total': ('capture_time', 'WAITING')
+}
+
 
 ############################################################
 # Exception-Klassen                                        #
@@ -41,6 +60,22 @@ class UnexpectedMessageError(Exception):
 # Code                                                     #
 ############################################################
 
+def pick_latencies(pick):
+    # Alle Zeitpunkte eines Greifvorgangs sammeln (fehlende, z.B. beim Standard-Bild, werden ausgelassen)
+    times = {key: value for key, value in pick['frame'].items() if value is not None}
+    times['click_time'] = pick['click_time']
+    if 'sent_time' in pick:
+        times['sent_time'] = pick['sent_time']
+    times |= pick['transitions']
+    
+    # Dauer aller Abschnitte, deren Anfang und Ende bekannt sind
+    latencies = {'sequence': pick['frame'].get('sequence')}
+    for segment, (start, end) in PICK_LATENCY_SEGMENTS.items():
+        if start in times and end in times:
+            latencies[segment] = times[end] - times[start]
+    return latencies
+
+
 class RobotController(threading.Thread):
     
     def __init__(self, server_ip, server_port, cam_position):
@@ -53,9 +88,16 @@ class RobotController(threading.Thread):
         self._status = RobotStatus.NOT_CONNECTED
         self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         
+        # Zeitpunkte der letzten Statuswechsel und die letzten abgeschlossenen Greifvorgänge
+        self._status_history = collections.deque(maxlen=100)
+        self._pick_log = collections.deque(maxlen=100)
+        self._current_pick = None
+        self._status_callback = None
+        
         # Thread-Sicherheitsobjekte initialisieren
         self._stop_event = threading.Event()
         self._status_lock = threading.Lock()
+        self._history_lock = threading.Lock()
         self._position_lock = threading.Lock()
         self._socket_lock = threading.Lock()
         self._command_queue = queue.Queue(1)
@@ -100,9 +142,33 @@ class RobotController(threading.Thread):
         # Befehl in Befehl-Queue packen (ggf. ersetzten)
         self._put_command_in_queue(command)
     
-    def grab_object(self, grab_data):
+    def set_status_callback(self, func):
+        # func wird aus dem Roboter-Thread nach jedem Statuswechsel aufgerufen (darf nur kurz dauern)
+        self._status_callback = func
+    
+    def get_status_history(self):
+        # Liste aus (Status, Zeitpunkt) der letzten Statuswechsel
+        with self._history_lock:
+            return list(self._status_history)
+    
+    def get_pick_log(self):
+        # Dauer der Abschnitte (Sekunden) der letzten abgeschlossenen Greifvorgänge, ältester zuerst
+        with self._history_lock:
+            return [pick_latencies(pick) for pick in self._pick_log]
+    
+    def get_last_pick(self):
+        # Dauer der Abschnitte des letzten abgeschlossenen Greifvorgangs (None, falls es noch keinen gab)
+        with self._history_lock:
+            if len(self._pick_log) == 0:
+                return None
+            return pick_latencies(self._pick_log[-1])
+    
+    def grab_object(self, grab_data, frame_timing=None, click_time=None):
+        # Greifvorgang festhalten: Bild, auf dem er beruht (Nummer und Zeitpunkte), und Zeitpunkt des Klicks
+        pick = {'frame': frame_timing or {}, 'click_time': click_time if click_time is not None else time.perf_counter(), 'transitions': {}}
+        
         # Befehl erstellen
-        command = lambda: self._send_grab_object_command(grab_data)
+        command = lambda: self._send_grab_object_command(grab_data, pick)
         
         # Befehl in Befehl-Queue packen (ggf. ersetzten)
         self._put_command_in_queue(command)
@@ -236,7 +302,7 @@ class RobotController(threading.Thread):
         with self._position_lock:
             self._position = position
     
-    def _send_grab_object_command(self, grab_data):
+    def _send_grab_object_command(self, grab_data, pick=None):
         # Gleichzeitiges Zugreifen verhindern
         with self._status_lock:
             # Ist der Roboter bereit zum Greifen?
@@ -246,6 +312,12 @@ class RobotController(threading.Thread):
             if not ready:
                 raise RobotStateError(f"Roboter-Status muss WAITING entsprechen.\nself._status = {self._status.name}")
         
+        # Ab jetzt werden die Statuswechsel diesem Greifvorgang zugeordnet
+        if pick is not None:
+            pick['sent_time'] = time.perf_counter()
+            with self._history_lock:
+                self._current_pick = pick
+        
         # Grab-Befehl senden
         try:
             # Befehls-Schlüssel senden
@@ -273,6 +345,12 @@ class RobotController(threading.Thread):
             raise
         except SocketError:
             raise
+        finally:
+            # Nur vollständige Greifvorgänge (zurück bei WAITING) in den Verlauf aufnehmen
+            with self._history_lock:
+                if pick is not None and 'WAITING' in pick['transitions']:
+                    self._pick_log.append(pick)
+                self._current_pick = None
     
     def _receive_status(self, expected_status, timeout=20):
         try:
@@ -303,6 +381,13 @@ class RobotController(threading.Thread):
                         with self._status_lock:
                             self._status = status
                         
+                        # Zeitpunkt des Statuswechsels festhalten (auch im laufenden Greifvorgang)
+                        now = time.perf_counter()
+                        with self._history_lock:
+                            self._status_history.append((status, now))
+                            if self._current_pick is not None:
+                                self._current_pick['transitions'][status.name] = now
+                        
                     case 'err':
                         # Nachrichtenlänge bestimmen
                         header = self._socket.recv(HEADER_MSG_LENGTH_SIZE).decode('utf-8')
@@ -320,6 +405,9 @@ class RobotController(threading.Thread):
                     case _:
                         # Fehler melden
                         raise UnexpectedMessageError(f"Der Typ '{msg_type}' im Nachrichten-Header konnte nicht erkannt werden.")
+            
+            # Erst nach dem Freigeben des Sockets benachrichtigen (nur eine Statusnachricht kommt bis hierher)
+            self._notify_status()
                 
         except socket.timeout:
             raise SocketError(f"Timeout beim Warten auf Status {expected_status.name}")
@@ -339,10 +427,17 @@ class RobotController(threading.Thread):
         except socket.error:
             raise
     
+    def _notify_status(self):
+        # Abnehmer über den Statuswechsel benachrichtigen (falls einer eingetragen ist)
+        callback = self._status_callback
+        if callback is not None:
+            callback()
+    
     def _shutdown(self):
         # Status auf ERROR setzten
         with self._status_lock:
             self._status = RobotStatus.ERROR
+        self._notify_status()
         
         # Socket schließen
         try:
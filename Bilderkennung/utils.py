@@ -9,6 +9,17 @@
 
 # Enums
 import enum
+# Multithreading
+import threading
+# Referenzzähler (für den Puffer-Pool)
+import sys
+# Zeitmessung und Messwert-Verlauf (für den Stufen-Zeitmesser)
+import time
+import collections
+# Gemeinsamer Speicher für mehrere Prozesse
+from multiprocessing import shared_memory
+# Numpy
+import numpy as np
 
 
 ############################################################
@@ -44,4 +55,255 @@ class RobotStatus(enum.Enum):
     # Roboter legt das Teil ab
     PLACING = 6
     # Roboter hat Fehler zurückgegeben
-    ERROR = 7
\ No newline at end of file
+    ERROR = 7
+
+
+############################################################
+# Übergabe-Postfach                                        #
+############################################################
+
+# Mailbox:
+# Ein Postfach mit genau einem Platz. Ein neuer Wert ersetzt einen
+# noch nicht abgeholten Wert, der dabei als verworfen gezählt wird.
+class Mailbox:
+    
+    def __init__(self):
+        # Variablen initialisieren
+        self._value = None
+        self._available = False
+        self._dropped = 0
+        
+        # Thread-Sicherheitsobjekte initialisieren
+        self._condition = threading.Condition()
+    
+    def put(self, value):
+        # Gleichzeitiges Zugreifen verhindern
+        with self._condition:
+            # Wurde der alte Wert noch nicht abgeholt? -> als verworfen zählen
+            if self._available:
+                self._dropped += 1
+            
+            # Neuen Wert ablegen und wartenden Thread wecken
+            self._value = value
+            self._available = True
+            self._condition.notify()
+    
+    def get(self, timeout=None):
+        # Gleichzeitiges Zugreifen verhindern
+        with self._condition:
+            # Auf einen Wert warten (timeout=0 -> nicht warten)
+            if not self._condition.wait_for(lambda: self._available, timeout):
+                return False, None
+            
+            # Wert herausnehmen
+            value = self._value
+            self._value = None
+            self._available = False
+            return True, value
+    
+    def get_dropped(self):
+        # Gleichzeitiges Zugreifen verhindern
+        with self._condition:
+            return self._dropped
+
+
+
+############################################################
+# Bild-Ringpuffer im gemeinsamen Speicher                  #
+############################################################
+
+# SharedImageRing:
+# Mehrere Speicherplätze (Slots) im gemeinsamen Speicher, in die
+# ein Prozess Bilder schreibt und aus denen ein anderer Prozess sie
+# ohne Pickeln/Kopieren als Numpy-Arrays liest.
+class SharedImageRing:
+    
+    def __init__(self, slot_count=0, slot_size=0, names=None):
+        if names is None:
+            # Neue Speicherbereiche anlegen
+            self._memories = [shared_memory.SharedMemory(create=True, size=slot_size) for _ in range(slot_count)]
+        else:
+            # Mit bestehenden Speicherbereichen verbinden
+            self._memories = [shared_memory.SharedMemory(name=name) for name in names]
+    
+    def get_names(self):
+        return [memory.name for memory in self._memories]
+    
+    def get_slot_count(self):
+        return len(self._memories)
+    
+    def write(self, slot, images):
+        # Platzbedarf prüfen
+        memory = self._memories[slot]
+        if sum(img.nbytes for img in images if img is not None) > memory.size:
+            return None
+        
+        # Bilder hintereinander in den Slot kopieren und deren Lage merken
+        layout = []
+        offset = 0
+        for img in images:
+            if img is None:
+                layout.append(None)
+                continue
+            
+            view = np.ndarray(img.shape, dtype=img.dtype, buffer=memory.buf, offset=offset)
+            view[...] = img
+            layout.append((offset, img.shape, img.dtype.str))
+            offset += img.nbytes
+        
+        return layout
+    
+    def read(self, slot, layout):
+        # Numpy-Arrays direkt auf den Slot legen (keine Kopie)
+        memory = self._memories[slot]
+        images = []
+        for entry in layout:
+            if entry is None:
+                images.append(None)
+                continue
+            
+            offset, shape, dtype = entry
+            images.append(np.ndarray(shape, dtype=np.dtype(dtype), buffer=memory.buf, offset=offset))
+        
+        return images
+    
+    def unlink(self):
+        # Speicherbereiche zum Löschen freigeben (werden gelöscht, sobald niemand mehr verbunden ist)
+        for memory in self._memories:
+            try:
+                memory.unlink()
+            except FileNotFoundError:
+                pass
+
+
+
+
+############################################################
+# Puffer-Pool                                              #
+############################################################
+
+# BufferPool:
+# Verwaltet wiederverwendbare Bildpuffer. Ein Puffer wird erst
+# wieder ausgegeben, wenn außer dem Pool niemand mehr auf ihn
+# verweist (z.B. wenn die GUI ein neueres Ergebnis geholt hat).
+# Neu angelegte Puffer werden gezählt, damit sich prüfen lässt,
+# dass im Dauerbetrieb keine großen Speicherbereiche mehr
+# angelegt werden.
+class BufferPool:
+    
+    def __init__(self):
+        # Variablen initialisieren
+        self._buffers = {}
+        self._allocations = 0
+        self._allocated_bytes = 0
+        self._reuses = 0
+        
+        # Thread-Sicherheitsobjekte initialisieren
+        self._lock = threading.Lock()
+    
+    def get(self, shape, dtype=np.uint8, tag=None):
+        # Puffer werden nach Form, Datentyp und Verwendungszweck getrennt
+        key = (tuple(shape), np.dtype(dtype).str, tag)
+        
+        # Gleichzeitiges Zugreifen verhindern
+        with self._lock:
+            buffers = self._buffers.setdefault(key, [])
+            
+            # Freien Puffer suchen (Verweise: Liste, Schleifenvariable und getrefcount selbst)
+            for buffer in buffers:
+                if sys.getrefcount(buffer) <= 3:
+                    self._reuses += 1
+                    return buffer
+            
+            # Kein freier Puffer -> neuen (schwarzen) Puffer anlegen
+            buffer = np.zeros(shape, dtype=dtype)
+            buffers.append(buffer)
+            self._allocations += 1
+            self._allocated_bytes += buffer.nbytes
+            return buffer
+    
+    def get_stats(self):
+        # Gleichzeitiges Zugreifen verhindern
+        with self._lock:
+            return {
+                'allocations': self._allocations,
+                'allocated_bytes': self._allocated_bytes,
+                'reuses': self._reuses,
+                'pooled_bytes': sum(buffer.nbytes for buffers in self._buffers.values() for buffer in buffers)
+            }
+
+
+
+############################################################
+# Stufen-Zeitmesser                                        #
+############################################################
+
+# StageTimer:
+# Misst die Dauer einzelner Bearbeitungsschritte und behält pro
+# Schritt die letzten Messwerte (gleitendes Fenster), aus denen
+# Mittelwert und Perzentile berechnet werden. Kann von mehreren
+# Threads gleichzeitig verwendet werden.
+class StageTimer:
+    
+    def __init__(self, window=1000):
+        # Variablen initialisieren
+        self._window = window
+        self._durations = {}
+        self._counts = {}
+        
+        # Thread-Sicherheitsobjekte initialisieren
+        self._lock = threading.Lock()
+    
+    def measure(self, stage):
+        # Verwendung: with timer.measure('blur'): ...
+        return _StageMeasurement(self, stage)
+    
+    def add(self, stage, duration):
+        # Gleichzeitiges Zugreifen verhindern
+        with self._lock:
+            if stage not in self._durations:
+                self._durations[stage] = collections.deque(maxlen=self._window)
+                self._counts[stage] = 0
+            self._durations[stage].append(duration)
+            self._counts[stage] += 1
+    
+    def reset(self):
+        # Gleichzeitiges Zugreifen verhindern
+        with self._lock:
+            self._durations = {}
+            self._counts = {}
+    
+    def get_samples(self):
+        # Kopie der Messwerte im Fenster (Sekunden) pro Schritt
+        with self._lock:
+            return {stage: list(durations) for stage, durations in self._durations.items()}
+    
+    def get_stats(self):
+        # Anzahl (gesamt), Mittelwert, Median und 99. Perzentil (Millisekunden) pro Schritt
+        with self._lock:
+            samples = {stage: np.array(durations) for stage, durations in self._durations.items()}
+            counts = dict(self._counts)
+        stats = {}
+        for stage, durations in samples.items():
+            p50, p99 = np.percentile(durations, (50, 99)) * 1000
+            stats[stage] = {'count': counts[stage], 'mean_ms': float(durations.mean() * 1000), 'p50_ms': float(p50), 'p99_ms': float(p99)}
+        return stats
+
+
+# _StageMeasurement:
+# Kontext-Manager einer einzelnen Messung von StageTimer.
+class _StageMeasurement:
+    
+    __slots__ = ('_timer', '_stage', '_start')
+    
+    def __init__(self, timer, stage):
+        self._timer = timer
+        self._stage = stage
+    
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._timer.add(self._stage, time.perf_counter() - self._start)
+        return False
\ No newline at end of file